@@ -0,0 +1,194 @@
+# data/processing/dataset_cache.py
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+
+import pandas as pd
+
+# Add the ollama_integration directory to path to import config
+AI_MODULE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(AI_MODULE_DIR, "ollama_integration"))
+
+import config
+
+# =========================================================
+# Cache Setup
+# =========================================================
+DEFAULT_CACHE_DIR = config.DATASET_CACHE_DIR
+
+# Bump when the on-disk layout changes so stale caches are rebuilt
+CACHE_FORMAT_VERSION = 1
+
+try:
+    import pyarrow.feather as feather
+    CACHE_EXTENSION = ".feather"
+except ImportError:
+    # Without pyarrow fall back to a pickled DataFrame: still binary and
+    # parse-free, just not columnar or memory-mapped
+    feather = None
+    CACHE_EXTENSION = ".pkl"
+
+
+def _content_hash(path, meta):
+    """
+    SHA-256 of the CSV bytes.
+
+    When size and mtime match the cached metadata the stored hash is reused,
+    so an unchanged file is never re-read just to be hashed.
+    """
+    stat = os.stat(path)
+    if (meta and meta.get("source_size") == stat.st_size
+            and meta.get("source_mtime_ns") == stat.st_mtime_ns):
+        return meta["content_hash"], stat
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest(), stat
+
+
+def schema_fingerprint(df, schema_key=""):
+    """Fingerprint of the parsed column names/dtypes plus the detector that used them"""
+    layout = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+    payload = json.dumps({"version": CACHE_FORMAT_VERSION, "key": schema_key, "columns": layout})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _read_meta(meta_path):
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format_version") == CACHE_FORMAT_VERSION else None
+
+
+def _write_atomic(path, write):
+    """Write through a unique temp file in the target directory, then rename it into place"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".",
+                                    suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_meta(meta_path, meta):
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=2)
+    _write_atomic(meta_path, write)
+
+
+def _read_frame(data_path, writable):
+    if feather is not None:
+        # Uncompressed Feather + memory map: numeric columns are read without
+        # copying, which leaves them read-only
+        table = feather.read_table(data_path, memory_map=not writable)
+        return table.to_pandas(split_blocks=not writable)
+    return pd.read_pickle(data_path)
+
+
+def _write_frame(df, data_path):
+    if feather is not None:
+        _write_atomic(data_path, lambda tmp: feather.write_feather(df, tmp, compression="uncompressed"))
+    else:
+        _write_atomic(data_path, lambda tmp: df.to_pickle(tmp, protocol=5))
+
+
+# =========================================================
+# Public API
+# =========================================================
+def load_dataset(csv_path, detect_schema=None, schema_key="", cache_dir=DEFAULT_CACHE_DIR, writable=False):
+    """
+    Load a CSV dataset through the columnar cache.
+
+    The first load parses the CSV and writes a binary copy keyed by the CSV's
+    content hash. Cache files are named after a hash of the CSV's absolute
+    path, so same-named CSVs in different directories never share metadata.
+    Later loads of the same content read the binary copy. When
+    `detect_schema` is given, its result (e.g. auto-detected feature and target
+    columns) is cached as well, keyed by the schema fingerprint, so detection
+    is not re-run either.
+
+    Args:
+        csv_path (str): Path to the CSV file
+        detect_schema (callable): Optional df -> JSON-serializable schema detector
+        schema_key (str): Name of the detector, part of the schema fingerprint
+        cache_dir (str): Directory holding cached datasets
+        writable (bool): Materialize writable columns for callers that modify
+            the frame in place (the default zero-copy columns are read-only;
+            assigning whole columns still works)
+
+    Returns:
+        tuple: (pd.DataFrame, schema or None)
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"❌ Dataset not found at {csv_path}")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    source = os.path.abspath(csv_path)
+    source_key = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+    stem = f"{os.path.splitext(os.path.basename(source))[0]}-{source_key}"
+    meta_path = os.path.join(cache_dir, f"{stem}.meta.json")
+
+    meta = _read_meta(meta_path)
+    content_hash, stat = _content_hash(csv_path, meta)
+    data_path = os.path.join(cache_dir, f"{stem}-{content_hash[:16]}{CACHE_EXTENSION}")
+
+    if meta and meta.get("content_hash") == content_hash and os.path.exists(data_path):
+        df = _read_frame(data_path, writable)
+        if meta.get("source_mtime_ns") != stat.st_mtime_ns:
+            # Same bytes, touched file: remember the new mtime to skip rehashing
+            meta.update(source_size=stat.st_size, source_mtime_ns=stat.st_mtime_ns)
+            _write_meta(meta_path, meta)
+    else:
+        df = pd.read_csv(csv_path)
+        _write_frame(df, data_path)
+
+        # Drop the binary copy of the previous CSV content
+        if meta and meta.get("data_file") and meta["data_file"] != os.path.basename(data_path):
+            stale_path = os.path.join(cache_dir, meta["data_file"])
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+        meta = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "source": source,
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "content_hash": content_hash,
+            "data_file": os.path.basename(data_path),
+            "schemas": {},
+        }
+        _write_meta(meta_path, meta)
+
+    schema = None
+    if detect_schema is not None:
+        fingerprint = schema_fingerprint(df, schema_key)
+        schema = meta["schemas"].get(fingerprint)
+        if schema is None:
+            schema = detect_schema(df)
+            meta["schemas"][fingerprint] = schema
+            _write_meta(meta_path, meta)
+
+    return df, schema
+
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """Remove every cached dataset and its metadata"""
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.endswith((".feather", ".pkl", ".meta.json")):
+            os.remove(os.path.join(cache_dir, name))
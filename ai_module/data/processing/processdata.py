@@ -12,6 +12,8 @@ warnings.filterwarnings('ignore')
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from data.processing.dataset_cache import load_dataset
+
 class OJTDataPreprocessor:
     """
     Comprehensive data preprocessor for OJT grading data
@@ -40,7 +42,7 @@ class OJTDataPreprocessor:
             raise FileNotFoundError(f"❌ Dataset not found at {data_path}")
         
         print("📁 Loading dataset...")
-        df = pd.read_csv(data_path)
+        df, _ = load_dataset(data_path, writable=True)
         
         print(f"📊 Original dataset shape: {df.shape}")
         print(f"📋 Columns: {list(df.columns)}")
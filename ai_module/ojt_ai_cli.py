@@ -0,0 +1,163 @@
+# ojt_ai_cli.py
+
+import os
+import sys
+import argparse
+import importlib
+
+# =========================================================
+# ojt-ai: one entry point for the AI module
+# =========================================================
+# Global options are written to the OJT_* variables that
+# ollama_integration/config.py reads, before the command's module is
+# imported, so every command sees the same paths, worker counts and sizes.
+# Each command's own options are passed through to its main(argv), e.g.
+#
+#   ojt-ai --models-dir /srv/models evaluate --headless --bootstrap 200
+#   ojt-ai --threads 1 serve --port 5001 --services predict
+#
+# Only source-tree installs are supported (`pip install -e ai_module`, or
+# `python ai_module/ojt_ai_cli.py`): the commands import scripts/ and
+# ollama_integration/ from next to this file. OJT_AI_MODULE_DIR points a
+# copied entry point back at a checkout.
+
+AI_MODULE_DIR = os.environ.get("OJT_AI_MODULE_DIR") or os.path.dirname(os.path.abspath(__file__))
+# Directories the commands import from
+SOURCE_DIRS = ("scripts", "ollama_integration")
+
+# Command -> (module, description)
+COMMANDS = {
+    "train": ("scripts.train_model", "Train the ensemble and write the model artifacts"),
+    "evaluate": ("scripts.evaluate_model", "Evaluate the saved models on a held-out split"),
+    "calibrate": ("scripts.calibrate", "Refit calibration, risk thresholds and drift reference"),
+    "cross-validate": ("scripts.cross_validate", "Stratified k-fold cross-validation"),
+    "serve": (None, "Run the Flask chat/prediction server"),
+    "serve-asgi": ("asgi_server", "Run the ASGI chat/prediction server (admission control, deadlines)"),
+    "serve-grpc": ("grpc_service", "Run the streaming gRPC prediction service"),
+    "score-batch": ("scripts.score_all", "Score every active student in bulk"),
+    "bench": ("scripts.bench", "Benchmark prediction latency in-process"),
+    "importtime": ("scripts.import_report", "Report cold-start import time per entry point"),
+}
+# Short name -> command
+ALIASES = {
+    "cv": "cross-validate",
+}
+
+# Global option -> environment variable read by config.py
+GLOBAL_OPTIONS = {
+    "models_dir": "OJT_MODELS_DIR",
+    "dataset": "OJT_DATASET_PATH",
+    "dataset_cache_dir": "OJT_DATASET_CACHE_DIR",
+    "reports_dir": "OJT_REPORTS_DIR",
+    "plots_dir": "OJT_PLOTS_DIR",
+    "jobs": "OJT_JOBS",
+    "threads": "OJT_THREADS",
+    "chunk_size": "OJT_SCORE_CHUNK_SIZE",
+    "cache_size": "OJT_EXPLANATION_CACHE_SIZE",
+    "scoring_backend": "OJT_SCORING_BACKEND",
+}
+# Native thread pools sized by --threads / OJT_THREADS
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def apply_environment(args):
+    """
+    Export the global options for config.py. Must run before numpy or any
+    ai_module code is imported, since both read the environment at import.
+    """
+    for option, variable in GLOBAL_OPTIONS.items():
+        value = getattr(args, option)
+        if value is not None:
+            os.environ[variable] = str(value)
+
+    threads = int(os.environ.get("OJT_THREADS", 0))
+    if threads > 0:
+        for variable in THREAD_VARIABLES:
+            os.environ.setdefault(variable, str(threads))
+
+
+def serve(argv):
+    parser = argparse.ArgumentParser(description=COMMANDS["serve"][1])
+    parser.add_argument("--host", help="Bind address (default: OJT_HOST or 0.0.0.0)")
+    parser.add_argument("--port", type=int, help="Port (default: OJT_PORT or 5000)")
+    parser.add_argument("--services", help="Comma-separated: chat, predict (default: OJT_SERVICES or both)")
+    args = parser.parse_args(argv)
+
+    if args.host is not None:
+        os.environ["OJT_HOST"] = args.host
+    if args.port is not None:
+        os.environ["OJT_PORT"] = str(args.port)
+    if args.services is not None:
+        os.environ["OJT_SERVICES"] = args.services
+
+    import config
+    import server
+    print(f"🚀 Serving {', '.join(sorted(config.SERVICES))} on {config.HOST}:{config.PORT}")
+    server.app.run(host=config.HOST, port=config.PORT)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="ojt-ai",
+        description="OJT AI module: training, evaluation, serving and batch scoring",
+        epilog="Commands:\n" + "\n".join(f"  {name:<16}{description}"
+                                          for name, (_, description) in COMMANDS.items())
+               + "\n\nAliases: " + ", ".join(f"{alias} = {name}" for alias, name in ALIASES.items())
+               + "\n\nRun 'ojt-ai COMMAND --help' for a command's own options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--models-dir", help="Model artifact directory (OJT_MODELS_DIR)")
+    parser.add_argument("--dataset", help="Training dataset CSV (OJT_DATASET_PATH)")
+    parser.add_argument("--dataset-cache-dir", help="Parsed dataset cache directory (OJT_DATASET_CACHE_DIR)")
+    parser.add_argument("--reports-dir", help="Evaluation report directory (OJT_REPORTS_DIR)")
+    parser.add_argument("--plots-dir", help="Evaluation plot directory (OJT_PLOTS_DIR)")
+    parser.add_argument("--jobs", type=int, help="Worker processes (OJT_JOBS)")
+    parser.add_argument("--threads", type=int, help="BLAS/OpenMP threads per process (OJT_THREADS)")
+    parser.add_argument("--chunk-size", type=int, help="Students per batch-scoring chunk (OJT_SCORE_CHUNK_SIZE)")
+    parser.add_argument("--cache-size", type=int, help="Explanation cache entries (OJT_EXPLANATION_CACHE_SIZE)")
+    parser.add_argument("--scoring-backend", choices=("inline", "process"),
+                        help="Score large batches in this process or across worker processes (OJT_SCORING_BACKEND)")
+    parser.add_argument("command", choices=[*COMMANDS, *ALIASES], metavar="COMMAND")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def check_source_tree():
+    """
+    Returns:
+        The source directories missing from AI_MODULE_DIR, e.g. after a
+        non-editable install copied only this file into site-packages
+    """
+    return [name for name in SOURCE_DIRS if not os.path.isdir(os.path.join(AI_MODULE_DIR, name))]
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.command = ALIASES.get(args.command, args.command)
+
+    missing = check_source_tree()
+    if missing:
+        print(f"❌ ojt-ai runs from the ai_module source tree, but {AI_MODULE_DIR} has no {', '.join(missing)}/")
+        print("   Install it with `pip install -e ai_module` (non-editable installs are not supported),")
+        print("   or set OJT_AI_MODULE_DIR to the ai_module checkout.")
+        return 2
+
+    apply_environment(args)
+
+    sys.path.insert(0, AI_MODULE_DIR)
+    sys.path.insert(1, os.path.join(AI_MODULE_DIR, "ollama_integration"))
+
+    # Usage lines of the command's own parser read "ojt-ai COMMAND"
+    sys.argv[0] = f"ojt-ai {args.command}"
+
+    if args.command == "serve":
+        return serve(args.args)
+
+    module = importlib.import_module(COMMANDS[args.command][0])
+    status = module.main(args.args)
+    return status if isinstance(status, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
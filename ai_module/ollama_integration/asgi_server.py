@@ -0,0 +1,468 @@
+import json
+import math
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import config
+
+# =========================================================
+# ASGI Server (/chat, /predict)
+# =========================================================
+# An asyncio counterpart of server.py for bursty traffic (e.g. report
+# generation fanning out predictions). The event loop only parses, admits
+# and answers requests; scoring runs on a bounded thread or process
+# executor, so a slow client or a large RF batch never holds the loop.
+#
+#   uvicorn asgi_server:app --app-dir ai_module/ollama_integration
+#
+# Admission control, per route: at most ASGI_CHAT_MAX_IN_FLIGHT /chat and
+# ASGI_PREDICT_MAX_IN_FLIGHT /predict requests run at once (default
+# ASGI_MAX_IN_FLIGHT, else one per worker) and at most ASGI_MAX_QUEUE of
+# each wait for a slot; beyond that the server answers 429 with a
+# Retry-After estimated from that route's recent service times. The
+# executor has a worker for every slot, so a burst on one route never
+# delays the other.
+# Deadlines: every request has one (ASGI_DEADLINE_MS, or less via the
+# X-Request-Deadline-Ms header). A request that cannot start or finish in
+# time gets 504; its slot is held until the executor job really ends, so
+# abandoned work still counts against capacity.
+# Side effects stay in this process: chat logs, /predict `save` rows, drift
+# observations and shadow samples are applied here on the loop's default
+# thread pool (never on the loop itself, since a full write-behind buffer
+# blocks), so /metrics sees every request and queued rows are flushed at
+# exit even with process workers.
+
+SERVICES = config.SERVICES
+EXECUTOR_KIND = config.ASGI_EXECUTOR
+WORKERS = max(1, config.ASGI_WORKERS)
+MAX_QUEUE = config.ASGI_MAX_QUEUE
+DEFAULT_DEADLINE = config.ASGI_DEADLINE_MS / 1000.0
+MAX_DEADLINE = config.ASGI_MAX_DEADLINE_MS / 1000.0
+MAX_BODY_BYTES = config.ASGI_MAX_BODY_BYTES
+
+DEADLINE_HEADER = b"x-request-deadline-ms"
+# Weight of the newest sample in the service-time average behind Retry-After
+SERVICE_TIME_ALPHA = 0.2
+
+
+class ClientDisconnected(Exception):
+    """The client went away before its body was read; nothing is sent"""
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, payload: Dict[str, Any], headers: Optional[list] = None):
+        super().__init__(payload.get("error", ""))
+        self.status = status
+        self.payload = payload
+        self.headers = headers or []
+
+
+# =========================================================
+# Work (runs on the executor; module-level so process workers can pickle it)
+# =========================================================
+def chat_job(message: str) -> str:
+    from chatbot_handler import chatbot_response
+    return chatbot_response(message)
+
+
+def predict_job(data: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """
+    Score one /predict body exactly as the Flask route does (snapshot or
+    `student_id`, `save`, `explain`, drift and shadow hooks). Used by the
+    thread executor, where the hooks already run in this process.
+
+    The ASGI server starts no trace, so the tracing spans inside the job are
+    no-ops and Server-Timing carries only `total`.
+
+    Returns:
+        (HTTP status, response body)
+    """
+    from prediction_api import predict_body
+    return predict_body(data)
+
+
+def predict_job_deferred(data: Dict[str, Any]) -> Tuple[int, Dict[str, Any], list]:
+    """
+    predict_job for the process executor: the drift, shadow and `save`
+    side effects come back with the response for apply_effects, instead of
+    landing in the worker's own monitor, evaluator and write-behind queue.
+
+    Returns:
+        (HTTP status, response body, side effects)
+    """
+    from prediction_api import predict_body_deferred
+    return predict_body_deferred(data)
+
+
+def apply_effects(effects: list):
+    """Apply a process worker's side effects in this process (blocks while the write-behind buffer is full)"""
+    for kind, *args in effects:
+        if kind == "insight":
+            import write_behind
+            write_behind.get_queue().enqueue_insight(*args)
+        elif kind == "drift":
+            import drift
+            monitor = drift.get_monitor()
+            if monitor is not None:
+                monitor.observe_features(*args)
+        elif kind == "shadow":
+            import shadow
+            evaluator = shadow.get_evaluator()
+            if evaluator is not None:
+                evaluator.submit(*args)
+
+
+def log_chat(user_id: int, message: str, reply: str):
+    import write_behind
+    write_behind.get_queue().enqueue_chat_log(user_id, message, reply)
+
+
+def _warm_worker():
+    # Import the stack (and unpickle the models) in each worker up front, not on its first request
+    if "chat" in SERVICES:
+        import chatbot_handler  # noqa: F401
+    if "predict" in SERVICES:
+        import prediction_api  # noqa: F401
+
+
+def _warm_side_effects():
+    # The write-behind queue, drift monitor and shadow candidate live in this process
+    # whatever the executor
+    if "chat" in SERVICES:
+        import write_behind  # noqa: F401
+    if "predict" in SERVICES:
+        import drift
+        drift.get_monitor()
+        if config.SHADOW_MODEL_DIR:
+            import shadow
+            shadow.get_evaluator()
+
+
+# =========================================================
+# Admission Control
+# =========================================================
+class AdmissionController:
+    """
+    Bounds concurrent work and the queue in front of it.
+
+    All methods run on the event loop, so the counters need no lock.
+    Executor jobs release their slot through a done-callback, which asyncio
+    also runs on the loop.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int = MAX_QUEUE):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.in_flight = 0
+        self.waiters: "list[asyncio.Future]" = []
+        self.service_time = 0.05
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the recent average service time"""
+        backlog = len(self.waiters) + self.in_flight
+        return max(1, math.ceil(self.service_time * backlog / self.max_in_flight))
+
+    async def acquire(self, deadline: float):
+        """Take a slot, wait in the bounded queue, or raise 429 / 504"""
+        if self.in_flight < self.max_in_flight and not self.waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+        if len(self.waiters) >= self.max_queue:
+            self.rejected += 1
+            raise HTTPError(429, {"error": "Server busy", "message": "Too many requests queued"},
+                            [(b"retry-after", str(self.retry_after()).encode())])
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=max(deadline - time.monotonic(), 0))
+        except BaseException as e:
+            if waiter.done():
+                # The slot arrived together with the timeout / cancellation; hand it on
+                self.release()
+            else:
+                waiter.cancel()
+                self.waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.expired += 1
+                raise HTTPError(504, {"error": "Deadline exceeded", "message": "Request expired while queued"})
+            raise
+        self.admitted += 1
+
+    def release(self, service_time: Optional[float] = None):
+        """Pass the slot straight to the oldest waiter, or free it (call on the event loop)"""
+        if service_time is not None:
+            self.service_time += SERVICE_TIME_ALPHA * (service_time - self.service_time)
+        while self.waiters:
+            waiter = self.waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "service_time_ms": round(self.service_time * 1000, 3),
+        }
+
+
+# =========================================================
+# Application
+# =========================================================
+def route_limits(workers: int) -> Dict[str, int]:
+    """In-flight limit per served route (default: one request per worker)"""
+    limits = {
+        "chat": config.ASGI_CHAT_MAX_IN_FLIGHT or config.ASGI_MAX_IN_FLIGHT or workers,
+        "predict": config.ASGI_PREDICT_MAX_IN_FLIGHT or config.ASGI_MAX_IN_FLIGHT or workers,
+    }
+    return {route: limit for route, limit in limits.items() if route in SERVICES}
+
+
+class PredictionApp:
+    """Raw ASGI application; no framework beyond an ASGI server is needed"""
+
+    def __init__(self, executor_kind: str = EXECUTOR_KIND, workers: int = WORKERS,
+                 limits: Optional[Dict[str, int]] = None, max_queue: int = MAX_QUEUE):
+        self.executor_kind = executor_kind
+        self.executor = None
+        # Each route is admitted on its own, so a burst of slow chat replies never
+        # takes /predict's slots
+        self.admission = {route: AdmissionController(limit, max_queue)
+                          for route, limit in (limits or route_limits(workers)).items()}
+        # One executor worker per slot, so admitted work never queues inside the executor
+        self.workers = sum(controller.max_in_flight for controller in self.admission.values()) or workers
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        if self.executor is None:
+            with self._executor_lock:
+                if self.executor is None:
+                    if self.executor_kind == "process":
+                        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+                        # Workers are spawned on demand; start them all (and load their models) now
+                        for future in [executor.submit(time.sleep, 0.1) for _ in range(self.workers)]:
+                            future.result()
+                        self.executor = executor
+                    else:
+                        _warm_worker()
+                        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="asgi")
+                    _warm_side_effects()
+        return self.executor
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    # -----------------------------------------------------
+    # ASGI entry point
+    # -----------------------------------------------------
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        started = time.monotonic()
+        try:
+            status, payload, headers = await self._dispatch(scope, receive, started)
+        except ClientDisconnected:
+            return
+        except HTTPError as e:
+            status, payload, headers = e.status, e.payload, e.headers
+        except Exception as e:
+            status, payload, headers = 500, {"error": str(e), "message": "Request failed"}, []
+
+        body = json.dumps(payload).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"server-timing", f"total;dur={(time.monotonic() - started) * 1000:.3f}".encode()),
+        ] + headers
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Load models / start workers before the first request
+                await asyncio.get_running_loop().run_in_executor(None, self._get_executor)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _dispatch(self, scope, receive, started):
+        path, method = scope["path"], scope["method"]
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok", "admission": {route: controller.stats()
+                                                       for route, controller in self.admission.items()}}, []
+        if path == "/metrics" and method == "GET" and "predict" in self.admission:
+            return 200, self._metrics(), []
+
+        routes = {"/chat": "chat", "/predict": "predict"}
+        if path not in routes or routes[path] not in self.admission:
+            raise HTTPError(404, {"error": "Not found"})
+        if method != "POST":
+            raise HTTPError(405, {"error": "Method not allowed"}, [(b"allow", b"POST")])
+
+        deadline = started + self._deadline(scope)
+        data = await self._read_json(receive)
+        if path == "/chat":
+            return await self._chat(data, deadline)
+        return await self._predict(data, deadline)
+
+    # -----------------------------------------------------
+    # Routes
+    # -----------------------------------------------------
+    async def _chat(self, data, deadline):
+        message = data.get("message", "")
+        if not message:
+            return 200, {"response": "Please enter a message."}, []
+        # An unusable user_id only skips the log, never the reply
+        import write_behind
+        user_id = write_behind.parse_user_id(data.get("user_id"))
+        try:
+            reply = await self._run("chat", deadline, chat_job, message)
+        except HTTPError:
+            raise
+        except Exception as e:
+            # Same contract as server.py: chat errors are a reply, not a status
+            return 200, {"response": f"⚠️ Error: {str(e)}"}, []
+
+        # Log the transcript off the request path when the caller identifies the user
+        if user_id is not None:
+            self._background(log_chat, user_id, message, reply)
+        return 200, {"response": reply}, []
+
+    async def _predict(self, data, deadline):
+        # predict_job maps model / database errors to statuses itself
+        if self.executor_kind != "process":
+            status, payload = await self._run("predict", deadline, predict_job, data)
+            return status, payload, []
+        status, payload, effects = await self._run("predict", deadline, predict_job_deferred, data)
+        if effects:
+            self._background(apply_effects, effects)
+        return status, payload, []
+
+    @staticmethod
+    def _metrics() -> Dict[str, Any]:
+        """Drift and shadow statistics, as the Flask /metrics route reports them"""
+        import drift
+        evaluator = None
+        if config.SHADOW_MODEL_DIR:
+            import shadow
+            evaluator = shadow.get_evaluator()
+        monitor = drift.get_monitor()
+        return {
+            "shadow": evaluator.stats() if evaluator is not None else None,
+            "drift": monitor.snapshot() if monitor is not None else None,
+        }
+
+    # -----------------------------------------------------
+    # Helpers
+    # -----------------------------------------------------
+    @staticmethod
+    def _background(fn, *args):
+        """Run a side effect on the loop's default thread pool; its failure never reaches the client"""
+        def run():
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"⚠️ ASGI side effect {fn.__name__} failed: {e}")
+        asyncio.get_running_loop().run_in_executor(None, run)
+
+    @staticmethod
+    def _deadline(scope) -> float:
+        for name, value in scope.get("headers", ()):
+            if name == DEADLINE_HEADER:
+                try:
+                    return min(max(float(value) / 1000.0, 0.0), MAX_DEADLINE)
+                except ValueError:
+                    raise HTTPError(400, {"error": "X-Request-Deadline-Ms must be a number"})
+        return DEFAULT_DEADLINE
+
+    @staticmethod
+    async def _read_json(receive) -> Dict[str, Any]:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ClientDisconnected()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes"})
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        try:
+            data = json.loads(b"".join(chunks) or b"{}")
+        except ValueError:
+            raise HTTPError(400, {"error": "Body must be JSON"})
+        if not isinstance(data, dict):
+            raise HTTPError(400, {"error": "Body must be a JSON object"})
+        return data
+
+    async def _run(self, route: str, deadline: float, fn, *args):
+        """Admit on the route's controller, then run fn on the executor within the request deadline"""
+        admission = self.admission[route]
+        await admission.acquire(deadline)
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        except BaseException:
+            admission.release()
+            raise
+        submitted = time.monotonic()
+        # The slot is freed when the job ends, even if the caller has given up on it
+        future.add_done_callback(lambda _: admission.release(time.monotonic() - submitted))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            admission.expired += 1
+            raise HTTPError(504, {"error": "Deadline exceeded", "message": "Request did not finish in time"})
+
+
+app = PredictionApp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ASGI chat/prediction server with admission control")
+    parser.add_argument("--host", default=config.HOST, help=f"Bind address (default: {config.HOST})")
+    parser.add_argument("--port", type=int, default=config.PORT, help=f"Port (default: {config.PORT})")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ The ASGI server needs uvicorn (pip install uvicorn)")
+        return 1
+
+    limits = ", ".join(f"/{route} ≤ {controller.max_in_flight}" for route, controller in app.admission.items())
+    print(f"🚀 ASGI server on {args.host}:{args.port} ({EXECUTOR_KIND} executor, {app.workers} workers, "
+          f"{limits} in flight, queue ≤ {MAX_QUEUE}, deadline {config.ASGI_DEADLINE_MS:.0f} ms)")
+    # One event loop process; parallelism comes from the executor
+    uvicorn.run(app, host=args.host, port=args.port, lifespan="on", log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import io
+import json
+from typing import List, Optional
+
+import numpy as np
+
+from risk_policy import RISK_LEVELS
+
+# =========================================================
+# Wire Formats for /predict/batch
+# =========================================================
+# JSON is the default. For large batches the feature matrix can be sent as a
+# raw .npy array or an Arrow IPC stream and the results come back in the same
+# format (or whatever Accept asks for), so neither side parses or builds
+# per-row objects:
+#
+#   .npy in:    float64 matrix (n, n_features). Columns follow FEATURE_NAMES,
+#               or the JSON list in the X-Feature-Names header
+#   .npy out:   calibrated probability matrix (n, n_classes), columns named
+#               by the JSON list in the X-Class-Labels header
+#   Arrow in:   one column per feature, named like the training feature, the
+#               snapshot field or its alias (nulls count as 0)
+#   Arrow out:  predicted_label, probability, risk_level (dictionary-encoded)
+#               and class_probabilities, a fixed-size list over one contiguous
+#               float64 buffer; class labels in the schema metadata
+#
+# pyarrow is optional and only imported when an Arrow body arrives.
+
+JSON_MIMETYPE = "application/json"
+NPY_MIMETYPE = "application/x-npy"
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+FORMAT_BY_MIMETYPE = {
+    JSON_MIMETYPE: "json",
+    NPY_MIMETYPE: "npy",
+    "application/octet-stream": "npy",
+    ARROW_MIMETYPE: "arrow",
+}
+MIMETYPE_BY_FORMAT = {"json": JSON_MIMETYPE, "npy": NPY_MIMETYPE, "arrow": ARROW_MIMETYPE}
+
+FEATURE_NAMES_HEADER = "X-Feature-Names"
+CLASS_LABELS_HEADER = "X-Class-Labels"
+
+
+class UnsupportedFormat(ValueError):
+    """Raised for a body or Accept type /predict/batch cannot handle"""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        return pyarrow
+    except ImportError:
+        raise UnsupportedFormat("Arrow payloads need pyarrow (pip install pyarrow)")
+
+
+# =========================================================
+# Negotiation
+# =========================================================
+def request_format(content_type: Optional[str]) -> str:
+    """Wire format of a request body from its Content-Type (JSON when absent)"""
+    mimetype = (content_type or JSON_MIMETYPE).split(";")[0].strip().lower()
+    if mimetype not in FORMAT_BY_MIMETYPE:
+        raise UnsupportedFormat(f"Unsupported Content-Type: {mimetype}")
+    return FORMAT_BY_MIMETYPE[mimetype]
+
+
+def response_format(accept: Optional[str], default: str) -> str:
+    """
+    Wire format of the response: the first supported type in Accept,
+    otherwise the request's own format.
+    """
+    for part in (accept or "").split(","):
+        mimetype = part.split(";")[0].strip().lower()
+        if mimetype in FORMAT_BY_MIMETYPE:
+            return FORMAT_BY_MIMETYPE[mimetype]
+    return default
+
+
+# =========================================================
+# .npy
+# =========================================================
+def decode_npy(body: bytes, feature_names: List[str], column_names: Optional[List[str]] = None):
+    """
+    Read a 2-D .npy matrix without copying the body.
+
+    Args:
+        body: Request bytes (.npy header followed by the raw array)
+        feature_names: The model's column order
+        column_names: Column order of the array, when it differs
+
+    Returns:
+        (array, columns): without column_names the array is the sanitized
+        float64 feature matrix and columns is None; with them the array is
+        the raw body view and columns maps each name to its 1-D column for
+        insight_engine.column_matrix
+    """
+    stream = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    except ValueError as e:
+        raise ValueError(f"Invalid .npy body: {e}")
+    if dtype.hasobject:
+        raise ValueError("Object arrays are not accepted")
+    if len(shape) != 2:
+        raise ValueError(f"Expected a 2-D feature matrix, got shape {shape}")
+
+    count = shape[0] * shape[1]
+    if len(body) - stream.tell() < count * dtype.itemsize:
+        raise ValueError("Truncated .npy body")
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    array = array.reshape(shape, order="F" if fortran_order else "C")
+
+    if column_names is not None:
+        if len(column_names) != shape[1]:
+            raise ValueError(f"{FEATURE_NAMES_HEADER} names {len(column_names)} columns, array has {shape[1]}")
+        return array, dict(zip(column_names, array.T))
+
+    if shape[1] != len(feature_names):
+        raise ValueError(f"Expected {len(feature_names)} feature columns, got {shape[1]}")
+    # Only convert / sanitize when needed; the common float64 body stays a view
+    if dtype != np.float64:
+        array = array.astype(np.float64)
+    if not np.isfinite(array).all():
+        array = np.nan_to_num(array, nan=0.0, posinf=0.0, neginf=0.0)
+    return array, None
+
+
+def encode_npy(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, np.ascontiguousarray(array), allow_pickle=False)
+    return buffer.getvalue()
+
+
+# =========================================================
+# Arrow IPC
+# =========================================================
+class _ArrowColumns:
+    """Column lookup for column_matrix; converts only the columns asked for"""
+
+    def __init__(self, table):
+        self._table = table
+        self._names = set(table.column_names)
+
+    def get(self, name):
+        if name not in self._names:
+            return None
+        pa = _pyarrow()
+        column = self._table.column(name)
+        if column.type != pa.float64():
+            column = column.cast(pa.float64())
+        # Zero-copy for a single null-free chunk; nulls become NaN
+        return column.to_numpy()
+
+
+def decode_arrow(body: bytes):
+    """
+    Read an Arrow IPC stream.
+
+    Returns:
+        (column lookup for insight_engine.column_matrix, number of rows)
+    """
+    pa = _pyarrow()
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Invalid Arrow stream: {e}")
+    return _ArrowColumns(table), table.num_rows
+
+
+def encode_arrow(probabilities: np.ndarray, predicted_indices: np.ndarray, risk_codes: np.ndarray,
+                 class_labels: List[str]) -> bytes:
+    pa = _pyarrow()
+    n_rows, n_classes = probabilities.shape
+    probabilities = np.ascontiguousarray(probabilities, dtype=np.float64)
+
+    table = pa.table({
+        "predicted_label": pa.DictionaryArray.from_arrays(
+            pa.array(predicted_indices.astype(np.int32)), pa.array([str(label) for label in class_labels])),
+        "probability": pa.array(probabilities[np.arange(n_rows), predicted_indices]),
+        "risk_level": pa.DictionaryArray.from_arrays(
+            pa.array(np.asarray(risk_codes, dtype=np.int8)), pa.array(list(RISK_LEVELS))),
+        # One flat view of the probability matrix; no per-row lists
+        "class_probabilities": pa.FixedSizeListArray.from_arrays(pa.array(probabilities.reshape(-1)), n_classes),
+    })
+    table = table.replace_schema_metadata({"class_labels": json.dumps([str(label) for label in class_labels])})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_results(fmt: str, probabilities: np.ndarray, predicted_indices: np.ndarray, risk_codes: np.ndarray,
+                   class_labels: List[str]) -> bytes:
+    """Binary response body ("npy" or "arrow") for predict_arrays output"""
+    if fmt == "npy":
+        return encode_npy(probabilities)
+    if fmt == "arrow":
+        return encode_arrow(probabilities, predicted_indices, risk_codes, class_labels)
+    raise UnsupportedFormat(f"Unsupported response format: {fmt}")
+
+
+def parse_names_header(value: Optional[str]) -> Optional[List[str]]:
+    """JSON list of column names from X-Feature-Names (None when absent)"""
+    if not value:
+        return None
+    try:
+        names = json.loads(value)
+    except json.JSONDecodeError:
+        names = None
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise ValueError(f"{FEATURE_NAMES_HEADER} must be a JSON list of column names")
+    return names
@@ -0,0 +1,187 @@
+import pickle
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+# =========================================================
+# Configuration
+# =========================================================
+# Points in the per-class lookup table over probability [0, 1]
+GRID_SIZE = 1001
+CALIBRATION_METHODS = ("temperature", "isotonic")
+
+
+# =========================================================
+# Quality Metrics
+# =========================================================
+def negative_log_likelihood(probabilities: np.ndarray, y_encoded: np.ndarray) -> float:
+    """Mean negative log-likelihood of the true classes"""
+    picked = probabilities[np.arange(len(y_encoded)), y_encoded]
+    return float(-np.mean(np.log(np.clip(picked, 1e-12, 1.0))))
+
+
+def expected_calibration_error(probabilities: np.ndarray, y_encoded: np.ndarray, bins: int = 10) -> float:
+    """
+    Expected calibration error of the top-class confidence.
+
+    Confidences are grouped into equal-width bins; the ECE is the
+    sample-weighted mean gap between confidence and accuracy per bin.
+    """
+    confidence = probabilities.max(axis=1)
+    correct = probabilities.argmax(axis=1) == y_encoded
+    bin_index = np.minimum((confidence * bins).astype(np.intp), bins - 1)
+
+    counts = np.bincount(bin_index, minlength=bins)
+    confidence_sums = np.bincount(bin_index, weights=confidence, minlength=bins)
+    correct_sums = np.bincount(bin_index, weights=correct, minlength=bins)
+    return float(np.abs(confidence_sums - correct_sums).sum() / len(y_encoded))
+
+
+# =========================================================
+# Fitting (training time)
+# =========================================================
+def fit_temperature(probabilities: np.ndarray, y_encoded: np.ndarray) -> float:
+    """Temperature T minimizing the NLL of softmax(log p / T)"""
+    from scipy.optimize import minimize_scalar
+
+    log_p = np.log(np.clip(probabilities, 1e-12, 1.0))
+
+    def nll(log_temperature):
+        scaled = log_p / np.exp(log_temperature)
+        scaled -= scaled.max(axis=1, keepdims=True)
+        log_norm = np.log(np.exp(scaled).sum(axis=1))
+        return -np.mean(scaled[np.arange(len(y_encoded)), y_encoded] - log_norm)
+
+    result = minimize_scalar(nll, bounds=(np.log(0.05), np.log(20.0)), method="bounded")
+    return float(np.exp(result.x))
+
+
+def fit_isotonic_table(probabilities: np.ndarray, y_encoded: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """One-vs-rest isotonic regression per class, evaluated on the grid"""
+    from sklearn.isotonic import IsotonicRegression
+
+    table = np.empty((probabilities.shape[1], len(grid)))
+    for c in range(probabilities.shape[1]):
+        isotonic = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip")
+        isotonic.fit(probabilities[:, c], (y_encoded == c).astype(np.float64))
+        table[c] = isotonic.predict(grid)
+    return table
+
+
+def fit_calibration(probabilities: np.ndarray, y_encoded: np.ndarray, method: str = "temperature",
+                    weights=None) -> Dict[str, Any]:
+    """
+    Fit a calibration map on held-out ensemble probabilities and compile it
+    into a per-class lookup table.
+
+    Both methods become a table f_c(p) sampled on a uniform grid, so inference
+    is one vectorized interpolation followed by renormalization:
+        temperature: f_c(p) = p ** (1 / T)   (softmax(log p / T))
+        isotonic:    f_c(p) = isotonic one-vs-rest fit for class c
+
+    Args:
+        probabilities: Held-out ensemble probabilities, shape (n_samples, n_classes)
+        y_encoded: Encoded true labels
+        method: "temperature" or "isotonic"
+        weights: Ensemble (LR, RF, NB) weights the probabilities were computed with
+
+    Returns:
+        Calibration dictionary (pickled as models/calibration.pkl)
+    """
+    if method not in CALIBRATION_METHODS:
+        raise ValueError(f"Unknown calibration method: {method}")
+
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    y_encoded = np.asarray(y_encoded, dtype=np.intp)
+    grid = np.linspace(0.0, 1.0, GRID_SIZE)
+
+    temperature = None
+    if method == "temperature":
+        temperature = fit_temperature(probabilities, y_encoded)
+        table = np.tile(grid ** (1.0 / temperature), (probabilities.shape[1], 1))
+    else:
+        table = fit_isotonic_table(probabilities, y_encoded, grid)
+
+    calibration = {
+        "method": method,
+        "temperature": temperature,
+        "table": table,
+        "weights": None if weights is None else [float(w) for w in weights],
+        "n_samples": int(len(y_encoded)),
+    }
+    calibrated = apply_calibration(probabilities, calibration)
+    calibration["metrics"] = {
+        "nll_before": negative_log_likelihood(probabilities, y_encoded),
+        "nll_after": negative_log_likelihood(calibrated, y_encoded),
+        "ece_before": expected_calibration_error(probabilities, y_encoded),
+        "ece_after": expected_calibration_error(calibrated, y_encoded),
+    }
+    return calibration
+
+
+def accept_calibration(calibration: Dict[str, Any], probabilities: np.ndarray, y_encoded: np.ndarray) -> bool:
+    """
+    Check a fitted map on a second held-out split, not the one it was fitted on.
+
+    The map is kept only when it lowers the ECE there; otherwise serving should
+    fall back to the raw (identity-calibrated) probabilities. The held-out ECEs
+    are recorded in calibration["metrics"].
+
+    Args:
+        calibration: Dictionary from fit_calibration
+        probabilities: Uncalibrated ensemble probabilities of the check split
+        y_encoded: Encoded true labels of the check split
+
+    Returns:
+        True when the calibration beats identity on the check split
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    y_encoded = np.asarray(y_encoded, dtype=np.intp)
+    metrics = calibration["metrics"]
+    metrics["holdout_ece_identity"] = expected_calibration_error(probabilities, y_encoded)
+    metrics["holdout_ece_calibrated"] = expected_calibration_error(
+        apply_calibration(probabilities, calibration), y_encoded)
+    metrics["holdout_samples"] = int(len(y_encoded))
+    return metrics["holdout_ece_calibrated"] < metrics["holdout_ece_identity"]
+
+
+# =========================================================
+# Inference
+# =========================================================
+def apply_calibration(probabilities: np.ndarray, calibration: Optional[Dict[str, Any]]) -> np.ndarray:
+    """
+    Calibrate a batch of probabilities with one table interpolation.
+
+    Args:
+        probabilities: Ensemble probabilities, shape (n_samples, n_classes)
+        calibration: Dictionary from fit_calibration, or None to pass through
+
+    Returns:
+        Calibrated probabilities (rows sum to 1)
+    """
+    if calibration is None:
+        return probabilities
+
+    table = calibration["table"]
+    last = table.shape[1] - 1
+
+    # Linear interpolation on the uniform grid for all classes at once
+    position = np.clip(probabilities, 0.0, 1.0) * last
+    lower = np.minimum(position.astype(np.intp), last - 1)
+    fraction = position - lower
+    classes = np.arange(table.shape[0])
+    mapped = table[classes, lower] * (1.0 - fraction) + table[classes, lower + 1] * fraction
+
+    totals = mapped.sum(axis=1, keepdims=True)
+    # Rows the table maps to all zeros keep their uncalibrated probabilities
+    return np.where(totals > 0, mapped / np.where(totals > 0, totals, 1.0), probabilities)
+
+
+def save_calibration(calibration: Dict[str, Any], path: str):
+    with open(path, "wb") as f:
+        pickle.dump(calibration, f)
+
+
+def load_calibration(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        return pickle.load(f)
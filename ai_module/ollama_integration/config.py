@@ -0,0 +1,126 @@
+import os
+
+# =========================================================
+# AI Module Configuration
+# =========================================================
+# Every path, worker count, batch size and cache size of the AI module is
+# read here, once, from OJT_* environment variables. Paths default to
+# locations inside ai_module/, so nothing depends on the working directory.
+# The ojt-ai CLI maps its global options onto these variables before it
+# imports a command.
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def _env_path(name: str, default: str) -> str:
+    return os.path.abspath(os.environ.get(name) or default)
+
+
+# =========================================================
+# Paths
+# =========================================================
+AI_MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = _env_path("OJT_MODELS_DIR", os.path.join(AI_MODULE_DIR, "models"))
+DATASET_PATH = _env_path("OJT_DATASET_PATH", os.path.join(AI_MODULE_DIR, "data", "datasets", "ojt_grading_data.csv"))
+DATASET_CACHE_DIR = _env_path("OJT_DATASET_CACHE_DIR", os.path.join(AI_MODULE_DIR, "data", "cache"))
+REPORTS_DIR = _env_path("OJT_REPORTS_DIR", os.path.join(AI_MODULE_DIR, "evaluation_reports"))
+PLOTS_DIR = _env_path("OJT_PLOTS_DIR", os.path.join(AI_MODULE_DIR, "evaluation_plots"))
+PROFILE_DIR = _env_path("OJT_PROFILE_DIR", os.path.join(AI_MODULE_DIR, "profiles"))
+TRACE_FILE = _env_path("OJT_TRACE_FILE", os.path.join(AI_MODULE_DIR, "logs", "traces.jsonl"))
+
+# =========================================================
+# Server
+# =========================================================
+HOST = os.environ.get("OJT_HOST", "0.0.0.0")
+PORT = _env_int("OJT_PORT", 5000)
+# "chat", "predict" or both; a chat-only server never loads the models
+SERVICES = {service.strip() for service in os.environ.get("OJT_SERVICES", "chat,predict").split(",")
+            if service.strip()}
+
+# ASGI server (asgi_server.py): scoring runs on a bounded executor behind admission control
+ASGI_EXECUTOR = os.environ.get("OJT_ASGI_EXECUTOR", "thread").lower()
+ASGI_WORKERS = _env_int("OJT_ASGI_WORKERS", 4)
+# Requests running at once per route (default: one per worker) and requests allowed to wait
+# for a slot; /chat and /predict are admitted separately and may each override the limit
+ASGI_MAX_IN_FLIGHT = _env_int("OJT_ASGI_MAX_IN_FLIGHT", 0)
+ASGI_CHAT_MAX_IN_FLIGHT = _env_int("OJT_ASGI_CHAT_MAX_IN_FLIGHT", 0)
+ASGI_PREDICT_MAX_IN_FLIGHT = _env_int("OJT_ASGI_PREDICT_MAX_IN_FLIGHT", 0)
+ASGI_MAX_QUEUE = _env_int("OJT_ASGI_MAX_QUEUE", 64)
+# Default and maximum request deadline; clients may ask for less with X-Request-Deadline-Ms
+ASGI_DEADLINE_MS = _env_float("OJT_ASGI_DEADLINE_MS", 2000)
+ASGI_MAX_DEADLINE_MS = _env_float("OJT_ASGI_MAX_DEADLINE_MS", 30000)
+ASGI_MAX_BODY_BYTES = _env_int("OJT_ASGI_MAX_BODY_BYTES", 1024 * 1024)
+
+# Streaming gRPC prediction service (grpc_service.py)
+GRPC_PORT = _env_int("OJT_GRPC_PORT", 50051)
+GRPC_WORKERS = _env_int("OJT_GRPC_WORKERS", 8)
+# Snapshots scored per ensemble pass, and how long a batch waits to fill
+GRPC_MAX_BATCH = _env_int("OJT_GRPC_MAX_BATCH", 256)
+GRPC_BATCH_LINGER_MS = _env_float("OJT_GRPC_BATCH_LINGER_MS", 2.0)
+# Received-but-unscored snapshots per stream before the server stops reading
+GRPC_STREAM_BUFFER = _env_int("OJT_GRPC_STREAM_BUFFER", 1024)
+
+# =========================================================
+# Parallelism
+# =========================================================
+# Worker processes for evaluation plots/bootstrap chunks and CV folds (0 leaves each tool's default)
+JOBS = _env_int("OJT_JOBS", 0)
+# BLAS/OpenMP threads per process (0 leaves the library defaults); applied by the CLI
+THREADS = _env_int("OJT_THREADS", 0)
+
+# Scoring backend for large batches: "inline" (this process) or "process" (scoring_pool.py)
+SCORING_BACKEND = os.environ.get("OJT_SCORING_BACKEND", "inline").lower()
+# Scoring worker processes (0 = one per CPU) and minimum rows per shard sent to one worker
+SCORING_WORKERS = _env_int("OJT_SCORING_WORKERS", 0)
+SCORING_SHARD_ROWS = _env_int("OJT_SCORING_SHARD_ROWS", 2000)
+
+# =========================================================
+# Batch Sizes
+# =========================================================
+SCORE_CHUNK_SIZE = _env_int("OJT_SCORE_CHUNK_SIZE", 1000)
+WRITE_BEHIND_CAPACITY = _env_int("OJT_WRITE_BEHIND_CAPACITY", 10000)
+WRITE_BEHIND_BATCH_SIZE = _env_int("OJT_WRITE_BEHIND_BATCH_SIZE", 200)
+WRITE_BEHIND_FLUSH_INTERVAL = _env_float("OJT_WRITE_BEHIND_FLUSH_INTERVAL", 1.0)
+WRITE_BEHIND_PUT_TIMEOUT = _env_float("OJT_WRITE_BEHIND_PUT_TIMEOUT", 0.05)
+
+# =========================================================
+# Cache Sizes
+# =========================================================
+EXPLANATION_CACHE_SIZE = _env_int("OJT_EXPLANATION_CACHE_SIZE", 4096)
+
+# =========================================================
+# Database
+# =========================================================
+DB_POOL_SIZE = _env_int("OJT_DB_POOL_SIZE", 5)
+DB_ACQUIRE_TIMEOUT = _env_float("OJT_DB_ACQUIRE_TIMEOUT", 5.0)
+FEATURE_STORE_ENABLED = os.environ.get("OJT_FEATURE_STORE", "0") == "1"
+
+# =========================================================
+# Training
+# =========================================================
+CALIBRATION_METHOD = os.environ.get("OJT_CALIBRATION_METHOD", "temperature")
+
+# =========================================================
+# Monitoring
+# =========================================================
+DRIFT_HALF_LIFE = _env_float("OJT_DRIFT_HALF_LIFE", 1000)
+DRIFT_MIN_SAMPLES = _env_float("OJT_DRIFT_MIN_SAMPLES", 100)
+
+SHADOW_MODEL_DIR = os.environ.get("OJT_SHADOW_MODEL_DIR", "")
+SHADOW_SAMPLE_RATE = _env_float("OJT_SHADOW_SAMPLE_RATE", 0.1)
+SHADOW_MAX_PENDING = _env_int("OJT_SHADOW_MAX_PENDING", 100)
+
+PROFILE_KEEP = _env_int("OJT_PROFILE_KEEP", 50)
+PROFILE_SAMPLE_RATE = _env_float("OJT_PROFILE_SAMPLE_RATE", 0)
+PROFILE_TOKEN = os.environ.get("OJT_PROFILE_TOKEN", "")
+
+TRACE_EXPORTER = os.environ.get("OJT_TRACE_EXPORTER", "").lower()
+OTLP_ENDPOINT = os.environ.get("OJT_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+SERVICE_NAME = os.environ.get("OJT_SERVICE_NAME", "ojt-ai-module")
+TRACE_QUEUE_SIZE = _env_int("OJT_TRACE_QUEUE_SIZE", 1000)
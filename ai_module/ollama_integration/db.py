@@ -0,0 +1,331 @@
+import os
+import re
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+import config
+
+# =========================================================
+# Configuration
+# =========================================================
+# Same DB_* variables as the Node backend (backend/config/env/.env).
+# OJT_DB_DSN overrides them and may also point at a SQLite file.
+DEFAULT_POOL_SIZE = config.DB_POOL_SIZE
+DEFAULT_ACQUIRE_TIMEOUT = config.DB_ACQUIRE_TIMEOUT
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up within the acquire timeout"""
+
+
+def default_dsn() -> str:
+    """Build a PostgreSQL DSN from the same DB_* variables the Node backend uses"""
+    return os.environ.get("OJT_DB_DSN") or (
+        f"host={os.environ.get('DB_HOST', 'localhost')} "
+        f"port={os.environ.get('DB_PORT', '5432')} "
+        f"dbname={os.environ.get('DB_NAME', 'ojt_ai_system')} "
+        f"user={os.environ.get('DB_USER', 'postgres')} "
+        f"password={os.environ.get('DB_PASSWORD', 'password')}"
+    )
+
+
+def is_sqlite_dsn(dsn: str) -> bool:
+    """True when the DSN points at a local SQLite stand-in instead of PostgreSQL"""
+    return dsn.startswith("sqlite:///") or dsn.endswith((".db", ".sqlite", ".sqlite3"))
+
+
+def connect(dsn: Optional[str] = None):
+    """
+    Open a single raw DB-API connection.
+
+    Args:
+        dsn: PostgreSQL DSN or SQLite path (defaults to default_dsn())
+
+    Returns:
+        tuple: (connection, is_sqlite)
+    """
+    dsn = dsn or default_dsn()
+
+    if is_sqlite_dsn(dsn):
+        path = dsn[len("sqlite:///"):] if dsn.startswith("sqlite:///") else dsn
+        # Pooled connections move between request threads, one user at a time
+        return sqlite3.connect(path, check_same_thread=False), True
+
+    try:
+        import psycopg2
+    except ImportError:
+        raise RuntimeError("psycopg2 is required for PostgreSQL access (pip install psycopg2-binary)")
+
+    return psycopg2.connect(dsn), False
+
+
+# =========================================================
+# Prepared Statements
+# =========================================================
+# Statements use PostgreSQL's $n placeholders, like the Node routes. On
+# PostgreSQL they are PREPAREd once per connection; on SQLite $n becomes ?n
+# and the driver's statement cache keeps the compiled statement around.
+STATEMENTS = {
+    # Same aggregates as the backend's GET /api/prediction/daily/:studentId
+    "student_snapshot": """
+        SELECT
+            (SELECT COALESCE(AVG(e.total_score), 0)
+             FROM evaluations e JOIN users s ON e.supervisor_id = s.user_id
+             WHERE e.student_id = $1 AND s.role = 'Coordinator') AS coord_eval_score,
+            (SELECT COALESCE(AVG(e.total_score), 0)
+             FROM evaluations e
+             WHERE e.student_id = $1) AS narrative_score,
+            (SELECT COALESCE(AVG(e.total_score), 0)
+             FROM evaluations e JOIN users s ON e.supervisor_id = s.user_id
+             WHERE e.student_id = $1 AND s.role = 'Supervisor') AS partner_eval_score,
+            (SELECT COUNT(DISTINCT a.date)
+             FROM attendance a
+             WHERE a.student_id = $1) AS attendance_days_present,
+            (SELECT COALESCE(SUM(a.total_hours), 0)
+             FROM attendance a
+             WHERE a.student_id = $1) AS total_hours_completed,
+            (SELECT COALESCE(SUM(CASE WHEN a.date = CURRENT_DATE THEN a.total_hours ELSE 0 END), 0)
+             FROM attendance a
+             WHERE a.student_id = $1) AS attendance_today_hours,
+            (SELECT COUNT(*) FROM users u WHERE u.user_id = $1) AS student_exists
+    """,
+    # Every attendance / evaluation row, used to hydrate the feature store
+    "attendance_rows": """
+        SELECT a.attendance_id, a.student_id, a.date, COALESCE(a.total_hours, 0)
+        FROM attendance a
+    """,
+    "evaluation_rows": """
+        SELECT e.eval_id, e.student_id, e.total_score, s.role
+        FROM evaluations e
+        JOIN users s ON e.supervisor_id = s.user_id
+    """,
+    "insert_insight": """
+        INSERT INTO ai_insights
+            (student_id, model_name, insight_type, result, confidence, input_data, processing_time_ms)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        RETURNING insight_id
+    """,
+    "insert_chat_log": """
+        INSERT INTO chatbot_logs (user_id, query, response, model_used)
+        VALUES ($1, $2, $3, $4)
+    """,
+}
+
+_DOLLAR_PARAM = re.compile(r"\$(\d+)")
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a pooled DB-API connection that runs named statements.
+    """
+
+    def __init__(self, raw, is_sqlite: bool):
+        self.raw = raw
+        self.is_sqlite = is_sqlite
+        self._prepared = set()
+
+    def _ensure_prepared(self, cursor, name: str):
+        if name not in self._prepared:
+            cursor.execute(f"PREPARE {name} AS {STATEMENTS[name]}")
+            self._prepared.add(name)
+
+    def execute(self, name: str, params=()):
+        """
+        Execute a statement from STATEMENTS by name and return the cursor.
+        """
+        cursor = self.raw.cursor()
+
+        if self.is_sqlite:
+            cursor.execute(_DOLLAR_PARAM.sub(r"?\1", STATEMENTS[name]), params)
+            return cursor
+
+        self._ensure_prepared(cursor, name)
+
+        if params:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+        return cursor
+
+    def execute_many(self, name: str, rows):
+        """
+        Execute a statement from STATEMENTS once per parameter tuple.
+
+        On PostgreSQL the EXECUTEs are sent in pages (execute_batch) instead of
+        one round trip per row.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        cursor = self.raw.cursor()
+
+        if self.is_sqlite:
+            cursor.executemany(_DOLLAR_PARAM.sub(r"?\1", STATEMENTS[name]), rows)
+            cursor.close()
+            return
+
+        from psycopg2.extras import execute_batch
+
+        self._ensure_prepared(cursor, name)
+
+        execute_batch(cursor, f"EXECUTE {name} ({', '.join(['%s'] * len(rows[0]))})", rows, page_size=len(rows))
+        cursor.close()
+
+    def fetch_one(self, name: str, params=()) -> Optional[Dict[str, Any]]:
+        """Execute a statement and return its first row as a dictionary"""
+        cursor = self.execute(name, params)
+        row = cursor.fetchone()
+        columns = [col[0] for col in cursor.description] if cursor.description else []
+        cursor.close()
+        return dict(zip(columns, row)) if row is not None else None
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    @property
+    def broken(self) -> bool:
+        """psycopg2 marks dead connections with a non-zero `closed` attribute"""
+        return bool(getattr(self.raw, "closed", 0))
+
+
+# =========================================================
+# Connection Pool
+# =========================================================
+class ConnectionPool:
+    """
+    Bounded, thread-safe connection pool.
+
+    At most `max_size` connections exist at once. Callers beyond that wait up
+    to `acquire_timeout` seconds and then get PoolTimeout, which keeps a burst
+    of requests from opening unbounded connections to PostgreSQL.
+    """
+
+    def __init__(self, dsn: Optional[str] = None, max_size: int = DEFAULT_POOL_SIZE,
+                 acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT):
+        self.dsn = dsn or default_dsn()
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = queue.LifoQueue()  # most recently used first keeps connections warm
+        self._closed = False
+
+    def _checkout(self) -> PooledConnection:
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise PoolTimeout(f"No database connection available within {self.acquire_timeout}s")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            raw, is_sqlite = connect(self.dsn)
+        except Exception:
+            self._slots.release()
+            raise
+        return PooledConnection(raw, is_sqlite)
+
+    def _checkin(self, conn: PooledConnection):
+        """
+        Return a connection to the pool. Any transaction the borrower left
+        open (including a read-only one) is rolled back first, so idle
+        connections never sit "idle in transaction" holding a snapshot or
+        locks; a connection that cannot be rolled back is closed instead.
+        """
+        try:
+            discard = conn.broken or self._closed
+            if not discard:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            if discard:
+                try:
+                    conn.raw.close()
+                except Exception:
+                    pass
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of the block.
+
+        Whatever the block did not commit is rolled back when the connection
+        is returned, whether or not the block raised.
+        """
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection and commit when the block succeeds"""
+        with self.connection() as conn:
+            yield conn
+            conn.commit()
+
+    def close(self):
+        """Close every idle connection; borrowed ones close when returned"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().raw.close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+# =========================================================
+# Queries used by the AI service
+# =========================================================
+def load_student_snapshot(conn: PooledConnection, student_id: int) -> Optional[Dict[str, float]]:
+    """
+    Load a student's daily snapshot in one round trip.
+
+    Returns:
+        Snapshot dictionary in the /predict schema, or None if the student does not exist
+    """
+    row = conn.fetch_one("student_snapshot", (student_id,))
+    if not row or not row.pop("student_exists"):
+        return None
+
+    snapshot = {key: float(value or 0) for key, value in row.items()}
+    # Use coordinator eval as daily progress if available, otherwise use narrative
+    snapshot["daily_progress_score"] = snapshot["coord_eval_score"] or snapshot["narrative_score"]
+    return snapshot
+
+
+def insert_insight(conn: PooledConnection, student_id: int, model_name: str, insight_type: str,
+                   result_json: str, confidence: float, input_json: str,
+                   processing_time_ms: Optional[int] = None) -> Optional[int]:
+    """Insert one ai_insights row and return its insight_id"""
+    row = conn.fetch_one("insert_insight", (
+        student_id, model_name, insight_type, result_json,
+        round(confidence, 2), input_json, processing_time_ms
+    ))
+    return row["insight_id"] if row else None
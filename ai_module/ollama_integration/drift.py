@@ -0,0 +1,269 @@
+import os
+import pickle
+import threading
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+import config
+
+# =========================================================
+# Configuration
+# =========================================================
+# Recent traffic dominates: a request's weight halves after this many newer requests
+DRIFT_HALF_LIFE = config.DRIFT_HALF_LIFE
+# No alerts until this many (decayed) observations have been seen
+DRIFT_MIN_SAMPLES = config.DRIFT_MIN_SAMPLES
+
+PSI_BINS = 10
+SKETCH_BINS = 100
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Alert thresholds
+PSI_MINOR = 0.1
+PSI_MAJOR = 0.25
+MEAN_SHIFT_STD = 3.0
+OUT_OF_RANGE_FRACTION = 0.05
+
+
+# =========================================================
+# Reference Statistics (training time)
+# =========================================================
+def build_reference_stats(X: np.ndarray, feature_names: List[str]) -> Dict[str, Any]:
+    """
+    Summarize the training features for drift monitoring.
+
+    Args:
+        X: Training feature matrix, columns ordered like feature_names
+        feature_names: Feature names
+
+    Returns:
+        Dictionary saved as models/reference_stats.pkl
+    """
+    X = np.asarray(X, dtype=np.float64)
+    lows, highs = X.min(axis=0), X.max(axis=0)
+
+    # Decile edges per feature; PSI compares live bin shares with these
+    inner_edges = np.quantile(X, np.linspace(0, 1, PSI_BINS + 1)[1:-1], axis=0).T
+    expected = np.stack([
+        np.bincount(np.searchsorted(inner_edges[j], X[:, j], side='right'), minlength=PSI_BINS)
+        for j in range(X.shape[1])
+    ]) / len(X)
+
+    return {
+        "feature_names": list(feature_names),
+        "n_samples": int(len(X)),
+        "mean": X.mean(axis=0),
+        "std": X.std(axis=0),
+        "min": lows,
+        "max": highs,
+        "quantiles": {str(q): np.quantile(X, q, axis=0) for q in QUANTILES},
+        "psi_edges": inner_edges,
+        "psi_expected": expected,
+    }
+
+
+def save_reference_stats(stats: Dict[str, Any], path: str):
+    with open(path, "wb") as f:
+        pickle.dump(stats, f)
+
+
+def load_reference_stats(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+# =========================================================
+# Streaming Monitor
+# =========================================================
+class DriftMonitor:
+    """
+    Constant-memory drift sketches over live feature vectors.
+
+    Per feature it keeps exponentially decayed running moments, counts in the
+    reference PSI bins, and a fixed histogram over the reference range (plus
+    underflow/overflow bins) that serves as a quantile sketch. Decay is done
+    with a growing observation weight instead of rescaling every count, so an
+    update touches one PSI bin and one sketch bin per feature: O(features).
+    The moments are weighted by the same weights and normalized by their
+    total, so they are unbiased from the first observation on rather than
+    pulled towards a starting value.
+    """
+
+    def __init__(self, reference: Dict[str, Any], half_life: float = DRIFT_HALF_LIFE,
+                 min_samples: float = DRIFT_MIN_SAMPLES):
+        self.reference = reference
+        self.feature_names = list(reference["feature_names"])
+        self.min_samples = min_samples
+        n_features = len(self.feature_names)
+
+        self._decay = 0.5 ** (1.0 / half_life)
+        self._psi_edges = np.asarray(reference["psi_edges"], dtype=np.float64)
+        self._psi_expected = np.asarray(reference["psi_expected"], dtype=np.float64)
+        self._ref_mean = np.asarray(reference["mean"], dtype=np.float64)
+        self._ref_std = np.asarray(reference["std"], dtype=np.float64)
+        self._low = np.asarray(reference["min"], dtype=np.float64)
+        self._high = np.asarray(reference["max"], dtype=np.float64)
+        self._width = np.where(self._high > self._low, (self._high - self._low) / SKETCH_BINS, 1.0)
+        self._rows = np.arange(n_features)
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        n_features = len(self.feature_names)
+        with self._lock:
+            self._count = 0
+            self._weight = 1.0
+            self._total_weight = 0.0
+            self._mean = np.zeros(n_features)
+            # Weighted sum of squared deviations from the mean (West's algorithm)
+            self._squares = np.zeros(n_features)
+            self._psi_counts = np.zeros((n_features, self._psi_edges.shape[1] + 1))
+            # Bin 0 is underflow, bin SKETCH_BINS + 1 overflow
+            self._sketch = np.zeros((n_features, SKETCH_BINS + 2))
+
+    # -----------------------------------------------------
+    # Updates
+    # -----------------------------------------------------
+    def observe(self, feature_vector: np.ndarray):
+        """Add one feature vector (ordered like feature_names)"""
+        x = np.asarray(feature_vector, dtype=np.float64)
+
+        # Same binning as build_reference_stats, so reference and live shares line up
+        psi_bin = np.array([np.searchsorted(edges, value, side='right')
+                            for edges, value in zip(self._psi_edges, x)])
+        sketch_bin = np.clip(np.floor((x - self._low) / self._width).astype(np.intp) + 1, 0, SKETCH_BINS + 1)
+        # Values exactly at the reference maximum belong to the last in-range bin
+        sketch_bin = np.where(x == self._high, SKETCH_BINS, sketch_bin)
+
+        with self._lock:
+            # Older observations lose weight because new ones weigh more
+            self._weight /= self._decay
+            if self._weight > 1e12:
+                self._rescale()
+            self._psi_counts[self._rows, psi_bin] += self._weight
+            self._sketch[self._rows, sketch_bin] += self._weight
+            self._total_weight += self._weight
+            self._count += 1
+
+            # Exponentially weighted mean / variance, normalized by the total weight
+            delta = x - self._mean
+            self._mean += (self._weight / self._total_weight) * delta
+            self._squares += self._weight * delta * (x - self._mean)
+
+    def observe_features(self, features: Dict[str, float]):
+        """Add one feature dictionary as built by build_features_from_snapshot"""
+        self.observe(np.array([features.get(name, 0.0) for name in self.feature_names]))
+
+    def _rescale(self):
+        self._psi_counts /= self._weight
+        self._sketch /= self._weight
+        self._squares /= self._weight
+        self._total_weight /= self._weight
+        self._weight = 1.0
+
+    # -----------------------------------------------------
+    # Reporting
+    # -----------------------------------------------------
+    def _quantiles(self, sketch: np.ndarray) -> Dict[str, np.ndarray]:
+        """Approximate quantiles per feature from the histogram sketch"""
+        cumulative = np.cumsum(sketch, axis=1)
+        totals = cumulative[:, -1:]
+        result = {}
+        for q in QUANTILES:
+            target = q * totals
+            bins = np.minimum((cumulative < target).sum(axis=1), SKETCH_BINS + 1)
+            below = np.where(bins > 0, cumulative[self._rows, np.maximum(bins - 1, 0)], 0.0)
+            inside = sketch[self._rows, bins]
+            fraction = np.divide(target[:, 0] - below, inside, out=np.zeros_like(below), where=inside > 0)
+            # Underflow/overflow bins report the reference bound
+            value = self._low + (bins - 1 + fraction) * self._width
+            result[str(q)] = np.clip(value, self._low, self._high)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current drift statistics and alerts per feature.
+
+        Returns:
+            {"observations", "effective_samples", "alerts": [...], "features": {name: {...}}}
+        """
+        with self._lock:
+            count = self._count
+            total = self._total_weight
+            psi_counts = self._psi_counts.copy()
+            sketch = self._sketch.copy()
+            mean = self._mean.copy()
+            std = np.sqrt(self._squares / total) if total else np.zeros_like(mean)
+            weight = self._weight
+
+        # Effective sample size of the decayed window (weights grow geometrically)
+        effective = total / weight if total else 0.0
+        features, alerts = {}, []
+        if total == 0:
+            return {"observations": 0, "effective_samples": 0.0, "alerts": [], "features": {}}
+
+        actual = np.clip(psi_counts / total, 1e-4, None)
+        expected = np.clip(self._psi_expected, 1e-4, None)
+        psi = ((actual - expected) * np.log(actual / expected)).sum(axis=1)
+        mean_shift = np.divide(mean - self._ref_mean, self._ref_std,
+                               out=np.zeros_like(mean), where=self._ref_std > 0)
+        below = sketch[:, 0] / total
+        above = sketch[:, -1] / total
+        quantiles = self._quantiles(sketch)
+
+        ready = effective >= self.min_samples
+        for j, name in enumerate(self.feature_names):
+            features[name] = {
+                "psi": float(psi[j]),
+                "mean": float(mean[j]),
+                "std": float(std[j]),
+                "reference_mean": float(self._ref_mean[j]),
+                "mean_shift_std": float(mean_shift[j]),
+                "below_reference_min": float(below[j]),
+                "above_reference_max": float(above[j]),
+                "quantiles": {q: float(values[j]) for q, values in quantiles.items()},
+            }
+            if not ready:
+                continue
+            if psi[j] >= PSI_MINOR:
+                alerts.append({"feature": name, "type": "psi", "value": float(psi[j]),
+                               "severity": "major" if psi[j] >= PSI_MAJOR else "minor"})
+            if abs(mean_shift[j]) >= MEAN_SHIFT_STD:
+                alerts.append({"feature": name, "type": "mean_shift", "value": float(mean_shift[j]),
+                               "severity": "major"})
+            if below[j] + above[j] >= OUT_OF_RANGE_FRACTION:
+                alerts.append({"feature": name, "type": "out_of_range", "value": float(below[j] + above[j]),
+                               "severity": "major"})
+
+        return {
+            "observations": count,
+            "effective_samples": float(effective),
+            "alerts": alerts,
+            "features": features,
+        }
+
+
+_monitor = None
+_monitor_loaded = False
+_monitor_lock = threading.Lock()
+
+
+def get_monitor(reference_path: Optional[str] = None) -> Optional[DriftMonitor]:
+    """
+    Return the process-wide drift monitor, or None when no reference
+    statistics were saved with the models.
+    """
+    global _monitor, _monitor_loaded
+    if not _monitor_loaded:
+        with _monitor_lock:
+            if not _monitor_loaded:
+                path = reference_path or os.path.join(config.MODELS_DIR, "reference_stats.pkl")
+                if os.path.exists(path):
+                    try:
+                        _monitor = DriftMonitor(load_reference_stats(path))
+                    except Exception as e:
+                        print(f"⚠️ Warning: Failed to load drift reference statistics: {e}")
+                _monitor_loaded = True
+    return _monitor
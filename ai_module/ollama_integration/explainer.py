@@ -0,0 +1,275 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+import config
+import insight_engine
+
+# =========================================================
+# Configuration
+# =========================================================
+EXPLANATION_CACHE_SIZE = config.EXPLANATION_CACHE_SIZE
+MODEL_NAMES = ["Logistic Regression", "Random Forest", "Naive Bayes"]
+
+# Units of each model's contributions
+CONTRIBUTION_UNITS = {
+    "Logistic Regression": "logit",
+    "Random Forest": "probability",
+    "Naive Bayes": "log_likelihood",
+}
+
+
+# =========================================================
+# Flattened Random Forest
+# =========================================================
+class FlatForest:
+    """
+    All trees of a RandomForestClassifier concatenated into flat node arrays.
+
+    Child pointers are global node indices, so the decision paths of every
+    (sample, tree) pair can be walked together, one vectorized step per depth
+    level, instead of visiting trees one by one in Python.
+    """
+
+    def __init__(self, forest):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            roots.append(offset)
+            is_leaf = tree.children_left == -1
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+            rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+            # Class distribution at every node (normalized, as predict_proba uses it)
+            value = tree.value[:, 0, :]
+            values.append(value / value.sum(axis=1, keepdims=True))
+            offset += tree.node_count
+
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts).astype(np.intp)
+        self.right = np.concatenate(rights).astype(np.intp)
+        self.value = np.concatenate(values)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.n_trees = len(roots)
+
+    def contributions(self, X: np.ndarray):
+        """
+        Tree-path (Saabas) contributions of every feature to every class probability.
+
+        Returns:
+            tuple: (bias of shape (n_classes,), contributions of shape
+            (n_samples, n_features, n_classes)); bias + contributions summed over
+            features equals predict_proba
+        """
+        # Trees compare float32 features, like sklearn's predict
+        X = np.asarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        n_classes = self.value.shape[1]
+
+        samples = np.repeat(np.arange(n_samples), self.n_trees)
+        nodes = np.tile(self.roots, n_samples)
+        totals = np.zeros((n_samples * n_features, n_classes))
+
+        active = self.left[nodes] != -1
+        while active.any():
+            samples, nodes = samples[active], nodes[active]
+            features = self.feature[nodes]
+            go_left = X[samples, features] <= self.threshold[nodes]
+            children = np.where(go_left, self.left[nodes], self.right[nodes])
+            # Each split moves the class distribution; credit the move to the split feature
+            np.add.at(totals, samples * n_features + features, self.value[children] - self.value[nodes])
+            nodes = children
+            active = self.left[nodes] != -1
+
+        bias = self.value[self.roots].mean(axis=0)
+        return bias, totals.reshape(n_samples, n_features, n_classes) / self.n_trees
+
+
+# =========================================================
+# Explainer
+# =========================================================
+class Explainer:
+    """
+    Per-feature contributions for the ensemble's base models.
+
+    - Logistic Regression: exact linear attribution of the class-centered logit
+      (coefficient x scaled feature), so contributions + base = logit.
+    - Naive Bayes: closed-form per-feature Gaussian log-likelihood terms,
+      centered across classes, so contributions + base = joint log-likelihood.
+    - Random Forest: tree-path contributions over the flattened forest, so
+      contributions + base = class probability.
+
+    Everything model-specific is precomputed once; a batch is explained with a
+    few array operations, and explanations are cached per feature vector.
+    """
+
+    def __init__(self, lr_model=None, rf_model=None, nb_model=None, scaler=None, label_encoder=None,
+                 feature_names=None, weights=None, cache_size: int = EXPLANATION_CACHE_SIZE):
+        self.scaler = scaler or insight_engine.SCALER
+        self.label_encoder = label_encoder or insight_engine.LABEL_ENCODER
+        self.feature_names = list(feature_names or insight_engine.FEATURE_NAMES or [])
+        self.weights = np.asarray(weights if weights is not None else insight_engine.MODEL_WEIGHTS, dtype=np.float64)
+        lr_model = lr_model or insight_engine.LR_MODEL
+        rf_model = rf_model or insight_engine.RF_MODEL
+        nb_model = nb_model or insight_engine.NB_MODEL
+        if lr_model is None or rf_model is None or nb_model is None:
+            raise ValueError("Models not loaded. Cannot explain predictions.")
+
+        self.class_labels = [str(label) for label in self.label_encoder.classes_]
+
+        # Logistic Regression: softmax is invariant to centering across classes
+        coef = np.asarray(lr_model.coef_, dtype=np.float64)
+        intercept = np.asarray(lr_model.intercept_, dtype=np.float64)
+        self._lr_coef = coef - coef.mean(axis=0)
+        self._lr_intercept = intercept - intercept.mean()
+
+        # Gaussian Naive Bayes: per (class, feature) mean and variance
+        self._nb_theta = np.asarray(nb_model.theta_, dtype=np.float64)
+        self._nb_var = np.asarray(nb_model.var_, dtype=np.float64)
+        self._nb_log_norm = -0.5 * np.log(2.0 * np.pi * self._nb_var)
+        log_prior = np.log(nb_model.class_prior_)
+        self._nb_log_prior = log_prior - log_prior.mean()
+
+        self._forest = FlatForest(rf_model)
+
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # Raw contributions
+    # -----------------------------------------------------
+    def contributions(self, feature_array: np.ndarray) -> Dict[str, Any]:
+        """
+        Contributions of all features to all classes for a batch.
+
+        Returns:
+            dict: model name -> (base of shape (n_samples, n_classes),
+                                 contributions of shape (n_samples, n_features, n_classes))
+        """
+        X = np.nan_to_num(np.asarray(feature_array, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+        X_scaled = self.scaler.transform(X)
+        n_samples = len(X)
+
+        lr = X_scaled[:, :, None] * self._lr_coef.T[None, :, :]
+        lr_base = np.broadcast_to(self._lr_intercept, (n_samples, len(self._lr_intercept)))
+
+        # (n_samples, n_features, n_classes) log-likelihood terms, centered across classes
+        diff = X_scaled[:, :, None] - self._nb_theta.T[None, :, :]
+        nb = self._nb_log_norm.T[None, :, :] - diff ** 2 / (2.0 * self._nb_var.T[None, :, :])
+        nb = nb - nb.mean(axis=2, keepdims=True)
+        nb_base = np.broadcast_to(self._nb_log_prior, (n_samples, len(self._nb_log_prior)))
+
+        rf_bias, rf = self._forest.contributions(X)
+        rf_base = np.broadcast_to(rf_bias, (n_samples, len(rf_bias)))
+
+        return {
+            "Logistic Regression": (lr_base, lr),
+            "Random Forest": (rf_base, rf),
+            "Naive Bayes": (nb_base, nb),
+        }
+
+    # -----------------------------------------------------
+    # Explanations
+    # -----------------------------------------------------
+    def explain_batch(self, feature_array: np.ndarray, class_indices: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Explain each row's prediction (or the given class per row).
+
+        Cached rows are returned from the cache; the remaining rows are
+        explained together in one vectorized pass.
+
+        Args:
+            feature_array: 2-D array ordered like FEATURE_NAMES
+            class_indices: Class to explain per row; defaults to the ensemble's prediction
+
+        Returns:
+            List of explanation dictionaries in row order
+        """
+        feature_array = np.atleast_2d(np.asarray(feature_array, dtype=np.float64))
+        if class_indices is None:
+            class_indices = np.argmax(insight_engine.predict_ensemble_proba(feature_array), axis=1).tolist()
+
+        keys = [row.tobytes() + int(class_index).to_bytes(2, "little")
+                for row, class_index in zip(feature_array, class_indices)]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    results[i] = cached
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = self._explain_rows(feature_array[missing], [class_indices[i] for i in missing])
+            with self._lock:
+                for i, explanation in zip(missing, computed):
+                    results[i] = explanation
+                    self._cache[keys[i]] = explanation
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+        return results
+
+    def explain(self, features_dict: Dict[str, float]) -> Dict[str, Any]:
+        """Explain a single prediction from a feature dictionary"""
+        feature_array = np.array([[features_dict.get(name, 0.0) for name in self.feature_names]])
+        return self.explain_batch(feature_array)[0]
+
+    def _explain_rows(self, feature_array: np.ndarray, class_indices: List[int]) -> List[Dict[str, Any]]:
+        per_model = self.contributions(feature_array)
+        rows = np.arange(len(feature_array))
+        classes = np.asarray(class_indices, dtype=np.intp)
+
+        # Contributions toward each row's explained class: (n_models, n_samples, n_features)
+        selected = np.stack([per_model[name][1][rows, :, classes] for name in MODEL_NAMES])
+        bases = np.stack([per_model[name][0][rows, classes] for name in MODEL_NAMES])
+
+        # Model units differ, so the ensemble view weights each model's L1-normalized contributions
+        norms = np.abs(selected).sum(axis=2, keepdims=True)
+        shares = np.divide(selected, norms, out=np.zeros_like(selected), where=norms > 0)
+        ensemble = np.tensordot(self.weights, shares, axes=1)
+
+        explanations = []
+        for r in range(len(feature_array)):
+            order = np.argsort(-np.abs(ensemble[r]))
+            explanations.append({
+                "class": self.class_labels[classes[r]],
+                "base": {name: float(bases[m, r]) for m, name in enumerate(MODEL_NAMES)},
+                "units": CONTRIBUTION_UNITS,
+                "contributions": {
+                    self.feature_names[j]: {
+                        **{name: float(selected[m, r, j]) for m, name in enumerate(MODEL_NAMES)},
+                        "ensemble": float(ensemble[r, j]),
+                    }
+                    for j in range(len(self.feature_names))
+                },
+                "top_features": [self.feature_names[j] for j in order],
+            })
+        return explanations
+
+    def cache_info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._cache), "capacity": self._cache_size}
+
+
+_explainer = None
+_explainer_lock = threading.Lock()
+
+
+def get_explainer() -> Explainer:
+    """Return the process-wide explainer, building its precomputed arrays on first use"""
+    global _explainer
+    if _explainer is None:
+        with _explainer_lock:
+            if _explainer is None:
+                if not insight_engine.MODELS_LOADED:
+                    raise ValueError("Models not loaded. Cannot explain predictions.")
+                _explainer = Explainer()
+    return _explainer
@@ -0,0 +1,328 @@
+import threading
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+import config
+import db
+import insight_engine
+
+# =========================================================
+# Configuration
+# =========================================================
+FEATURE_STORE_ENABLED = config.FEATURE_STORE_ENABLED
+DEFAULT_CAPACITY = 1024
+
+# Running aggregate columns kept per student
+(COORD_SUM, COORD_N, EVAL_SUM, EVAL_N, PARTNER_SUM, PARTNER_N,
+ DAYS_PRESENT, TOTAL_HOURS, TODAY_HOURS) = range(9)
+N_AGGREGATES = 9
+
+# Snapshot fields derived from the aggregates, in the order of the snapshot vector
+SNAPSHOT_FIELDS = [
+    "daily_progress_score",
+    "narrative_score",
+    "coord_eval_score",
+    "partner_eval_score",
+    "attendance_days_present",
+    "attendance_today_hours",
+    "total_hours_completed",
+]
+
+
+def _day_ordinal(value) -> int:
+    """Accept a date, datetime, or ISO string (SQLite) and return its ordinal"""
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+class FeatureStore:
+    """
+    Per-student running aggregates with ready-to-score feature vectors.
+
+    Attendance and evaluation events are applied incrementally to a compact
+    float64 table (one row per student, indexed through a dict), and the
+    student's feature row is refreshed in O(features) on every event. Serving a
+    feature vector is then a dict lookup and a row copy, with no re-aggregation
+    of raw attendance or evaluation rows.
+
+    Events are upserts keyed by the source row (attendance_id / eval_id): the
+    row's previous contribution is taken out before the new one is added, so
+    out-of-order, edited and replayed events all leave the same aggregates as
+    re-aggregating the tables. Today's hours are re-derived whenever the
+    calendar day changes, on writes and reads alike.
+    """
+
+    def __init__(self, feature_names: Optional[List[str]] = None, capacity: int = DEFAULT_CAPACITY):
+        self.feature_names = list(feature_names or insight_engine.FEATURE_NAMES or [])
+        if not self.feature_names:
+            raise ValueError("Feature names not loaded. Models may not be initialized.")
+
+        self._row_of: Dict[int, int] = {}
+        self._size = 0
+        self._aggregates = np.zeros((capacity, N_AGGREGATES), dtype=np.float64)
+        self._features = np.zeros((capacity, len(self.feature_names)), dtype=np.float64)
+        self._lock = threading.Lock()
+        self._today = date.today().toordinal()
+
+        # Last applied state of every source row, and per-student day totals
+        # ({day: [rows, hours]}) behind DAYS_PRESENT and TODAY_HOURS
+        self._attendance: Dict[int, tuple] = {}
+        self._evaluations: Dict[int, tuple] = {}
+        self._days: Dict[int, Dict[int, list]] = {}
+
+        # Feature column -> position in the snapshot vector; unknown features
+        # point at the trailing zero slot, like build_features_from_snapshot
+        source = []
+        for name in self.feature_names:
+            field = insight_engine.SNAPSHOT_FIELD_BY_FEATURE.get(name)
+            source.append(SNAPSHOT_FIELDS.index(field) if field in SNAPSHOT_FIELDS else len(SNAPSHOT_FIELDS))
+        self._feature_source = np.array(source, dtype=np.intp)
+
+    # -----------------------------------------------------
+    # Row management
+    # -----------------------------------------------------
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, student_id):
+        return student_id in self._row_of
+
+    def _row(self, student_id: int) -> int:
+        """Return the student's row, appending (and growing the table) if new"""
+        row = self._row_of.get(student_id)
+        if row is not None:
+            return row
+
+        if self._size == len(self._aggregates):
+            capacity = 2 * len(self._aggregates)
+            self._aggregates = np.resize(self._aggregates, (capacity, N_AGGREGATES))
+            self._aggregates[self._size:] = 0.0
+            self._features = np.resize(self._features, (capacity, len(self.feature_names)))
+            self._features[self._size:] = 0.0
+
+        row = self._size
+        self._row_of[student_id] = row
+        self._size += 1
+        return row
+
+    def _snapshot_vector(self, row: int) -> np.ndarray:
+        """Snapshot fields for one row, plus a trailing 0.0 for unknown features"""
+        agg = self._aggregates[row]
+        coord = agg[COORD_SUM] / agg[COORD_N] if agg[COORD_N] else 0.0
+        narrative = agg[EVAL_SUM] / agg[EVAL_N] if agg[EVAL_N] else 0.0
+        partner = agg[PARTNER_SUM] / agg[PARTNER_N] if agg[PARTNER_N] else 0.0
+        return np.array([
+            # Use coordinator eval as daily progress if available, otherwise use narrative
+            coord or narrative,
+            narrative,
+            coord,
+            partner,
+            agg[DAYS_PRESENT],
+            agg[TODAY_HOURS],
+            agg[TOTAL_HOURS],
+            0.0,
+        ])
+
+    def _refresh(self, row: int):
+        self._features[row] = self._snapshot_vector(row)[self._feature_source]
+
+    def _roll_day(self, today: int):
+        """Re-derive today's hours for everyone once the calendar day changes"""
+        if today > self._today:
+            self._today = today
+            for student_id, row in self._row_of.items():
+                entry = self._days.get(student_id, {}).get(today)
+                self._aggregates[row, TODAY_HOURS] = entry[1] if entry else 0.0
+                self._refresh(row)
+
+    def _add_attendance(self, student_id: int, day: int, hours: float, sign: int):
+        """Add (sign=1) or take out (sign=-1) one attendance row's contribution"""
+        row = self._row(student_id)
+        agg = self._aggregates[row]
+        days = self._days.setdefault(student_id, {})
+        entry = days.setdefault(day, [0, 0.0])
+        entry[0] += sign
+        entry[1] += sign * hours
+        if entry[0] == 0:
+            del days[day]
+        agg[DAYS_PRESENT] = len(days)
+        agg[TOTAL_HOURS] += sign * hours
+        if day == self._today:
+            agg[TODAY_HOURS] = days[day][1] if day in days else 0.0
+        self._refresh(row)
+
+    def _add_evaluation(self, student_id: int, score: float, evaluator_role: str, sign: int):
+        """Add (sign=1) or take out (sign=-1) one evaluation's contribution"""
+        row = self._row(student_id)
+        agg = self._aggregates[row]
+        agg[EVAL_SUM] += sign * score
+        agg[EVAL_N] += sign
+        if evaluator_role == "Coordinator":
+            agg[COORD_SUM] += sign * score
+            agg[COORD_N] += sign
+        elif evaluator_role == "Supervisor":
+            agg[PARTNER_SUM] += sign * score
+            agg[PARTNER_N] += sign
+        self._refresh(row)
+
+    def _upsert_attendance(self, attendance_id: int, student_id: int, day, hours, deleted: bool):
+        previous = self._attendance.pop(attendance_id, None)
+        if previous is not None:
+            self._add_attendance(*previous, sign=-1)
+        if not deleted:
+            current = (student_id, _day_ordinal(day), float(hours or 0.0))
+            self._add_attendance(*current, sign=1)
+            self._attendance[attendance_id] = current
+
+    def _upsert_evaluation(self, eval_id: int, student_id: int, score, evaluator_role: str, deleted: bool):
+        previous = self._evaluations.pop(eval_id, None)
+        if previous is not None:
+            self._add_evaluation(*previous, sign=-1)
+        # Like AVG(total_score), an evaluation without a score does not count
+        if not deleted and score is not None:
+            current = (student_id, float(score), evaluator_role or "")
+            self._add_evaluation(*current, sign=1)
+            self._evaluations[eval_id] = current
+
+    # -----------------------------------------------------
+    # Events
+    # -----------------------------------------------------
+    def apply_attendance(self, attendance_id: int, student_id: int, day, hours: float = 0.0,
+                         deleted: bool = False):
+        """
+        Apply the current state of one attendance (DTR) row.
+
+        Args:
+            attendance_id: Source row; a later event for the same row replaces this one
+            student_id: Student the row belongs to
+            day: The row's date
+            hours: The row's total_hours so far
+            deleted: True when the row was removed
+        """
+        with self._lock:
+            self._roll_day(date.today().toordinal())
+            self._upsert_attendance(attendance_id, student_id, day, hours, deleted)
+
+    def apply_evaluation(self, eval_id: int, student_id: int, score: Optional[float], evaluator_role: str,
+                         deleted: bool = False):
+        """
+        Apply the current state of one evaluation row.
+
+        Args:
+            eval_id: Source row; a later event for the same row replaces this one
+            student_id: Evaluated student
+            score: The evaluation's total_score
+            evaluator_role: Role of the evaluating user ('Coordinator' or 'Supervisor')
+            deleted: True when the row was removed
+        """
+        with self._lock:
+            self._upsert_evaluation(eval_id, student_id, score, evaluator_role, deleted)
+
+    def apply_events(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Apply a list of backend events, each carrying its row's current state, e.g.
+            {"type": "attendance", "attendance_id": 31, "student_id": 7, "date": "2025-01-15", "hours": 8}
+            {"type": "evaluation", "eval_id": 4, "student_id": 7, "score": 88, "evaluator_role": "Coordinator"}
+        Add "deleted": true when the row was removed.
+
+        Returns:
+            Number of events applied
+        """
+        for event in events:
+            deleted = bool(event.get("deleted", False))
+            if event["type"] == "attendance":
+                self.apply_attendance(int(event["attendance_id"]), int(event["student_id"]),
+                                      event["date"], event.get("hours", 0), deleted)
+            elif event["type"] == "evaluation":
+                self.apply_evaluation(int(event["eval_id"]), int(event["student_id"]), event.get("score"),
+                                      event.get("evaluator_role", ""), deleted)
+            else:
+                raise ValueError(f"Unknown event type: {event['type']}")
+        return len(events)
+
+    # -----------------------------------------------------
+    # Serving
+    # -----------------------------------------------------
+    def get_features(self, student_id: int) -> Optional[np.ndarray]:
+        """Feature vector ordered like FEATURE_NAMES, or None for unknown students"""
+        row = self._row_of.get(student_id)
+        if row is None:
+            return None
+        with self._lock:
+            self._roll_day(date.today().toordinal())
+            return self._features[row].copy()
+
+    def get_matrix(self, student_ids: List[int]):
+        """
+        Feature matrix for many students at once.
+
+        Returns:
+            tuple: (matrix of shape (len(student_ids), n_features), boolean mask of known students)
+        """
+        rows = np.array([self._row_of.get(sid, -1) for sid in student_ids], dtype=np.intp)
+        known = rows >= 0
+        with self._lock:
+            self._roll_day(date.today().toordinal())
+            matrix = self._features[np.where(known, rows, 0)]
+        matrix[~known] = 0.0
+        return matrix, known
+
+    def get_snapshot(self, student_id: int) -> Optional[Dict[str, float]]:
+        """The student's current daily snapshot in the /predict schema"""
+        row = self._row_of.get(student_id)
+        if row is None:
+            return None
+        with self._lock:
+            self._roll_day(date.today().toordinal())
+            values = self._snapshot_vector(row)
+        return dict(zip(SNAPSHOT_FIELDS, values.tolist()))
+
+    # -----------------------------------------------------
+    # Hydration
+    # -----------------------------------------------------
+    def load_from_db(self, pool: Optional[db.ConnectionPool] = None) -> int:
+        """
+        Seed the store from every attendance and evaluation row, so later
+        events for the same rows replace rather than add to them.
+
+        Returns:
+            Number of students loaded
+        """
+        pool = pool or db.get_pool()
+        with pool.connection() as conn:
+            cursor = conn.execute("attendance_rows")
+            attendance_rows = cursor.fetchall()
+            cursor.close()
+            cursor = conn.execute("evaluation_rows")
+            evaluation_rows = cursor.fetchall()
+            cursor.close()
+
+        with self._lock:
+            for attendance_id, student_id, day, hours in attendance_rows:
+                self._upsert_attendance(int(attendance_id), int(student_id), day, hours, False)
+            for eval_id, student_id, score, evaluator_role in evaluation_rows:
+                self._upsert_evaluation(int(eval_id), int(student_id), score, evaluator_role, False)
+
+        print(f"✅ Feature store loaded {len(self)} students")
+        return len(self)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> FeatureStore:
+    """Return the process-wide feature store, hydrating it from the database on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = FeatureStore()
+                store.load_from_db()
+                _store = store
+    return _store
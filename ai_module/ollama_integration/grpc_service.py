@@ -0,0 +1,259 @@
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent import futures
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import config
+import insight_engine
+
+# =========================================================
+# Streaming Prediction Service (gRPC)
+# =========================================================
+# Bulk clients (nightly scoring, the backend's fan-out) keep one HTTP/2
+# connection open and stream snapshots in; predictions stream back in the
+# same order. Messages are JSON objects carried in gRPC frames, so no
+# generated stubs are needed on either side:
+#
+#   service ojt.ai.Prediction {
+#     rpc PredictStream(stream Snapshot) returns (stream Prediction);
+#     rpc Predict(Snapshot) returns (Prediction);
+#   }
+#   Snapshot:   {"id": <optional, echoed>, "daily_progress_score": 82, ...}
+#               (the /predict snapshot keys or their aliases)
+#   Prediction: {"seq": <0-based position in the stream>, "id": ...,
+#                "prediction": {...}}  or  {"seq": ..., "id": ..., "error": "..."}
+#
+# Each stream gets a reader thread that feeds a bounded buffer. The handler
+# drains whatever has arrived (up to GRPC_MAX_BATCH, waiting at most
+# GRPC_BATCH_LINGER_MS) and scores it with one insight_engine.batch_predict
+# pass. When scoring falls behind, the buffer fills, the reader stops pulling
+# from the stream, and HTTP/2 flow control pauses the client.
+#
+# grpcio is optional and only imported when a server or client is created,
+# so the batching and scoring helpers import without it.
+
+SERVICE_NAME = "ojt.ai.Prediction"
+MAX_MESSAGE_BYTES = 4 * 1024 * 1024
+
+_END = object()
+
+
+def _grpc():
+    try:
+        import grpc
+        return grpc
+    except ImportError:
+        raise RuntimeError("The gRPC service needs grpcio (pip install grpcio)")
+
+
+def _deserialize(data: bytes) -> Optional[Any]:
+    # An unreadable message becomes an error response instead of failing the stream
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def _serialize(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message).encode("utf-8")
+
+
+# =========================================================
+# Micro-batching
+# =========================================================
+def _put(pending: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    # Wait for room, but give up once the handler has gone away
+    while not stop.is_set():
+        try:
+            pending.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _read_requests(request_iterator: Iterable, pending: queue.Queue, stop: threading.Event):
+    """Move incoming messages into the stream's bounded buffer (waits while it is full)"""
+    try:
+        for message in request_iterator:
+            if not _put(pending, message, stop):
+                return
+    except Exception:
+        # Cancelled or broken stream; the handler stops at _END
+        pass
+    _put(pending, _END, stop)
+
+
+def next_batch(pending: queue.Queue, max_batch: int, linger: float):
+    """
+    Wait for one message, then take what else arrives within `linger`
+    seconds, up to max_batch.
+
+    Returns:
+        (messages, stream_ended)
+    """
+    first = pending.get()
+    if first is _END:
+        return [], True
+    batch = [first]
+    deadline = time.perf_counter() + linger
+    while len(batch) < max_batch:
+        remaining = deadline - time.perf_counter()
+        try:
+            message = pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait()
+        except queue.Empty:
+            break
+        if message is _END:
+            return batch, True
+        batch.append(message)
+    return batch, False
+
+
+def score_messages(messages: List[Any], first_seq: int = 0) -> List[Dict[str, Any]]:
+    """
+    Score a batch of snapshot messages with a single ensemble pass.
+
+    Args:
+        messages: Decoded messages; anything but a JSON object gets an error response
+        first_seq: Stream position of the first message
+
+    Returns:
+        One response per message, in order
+    """
+    snapshots = [message for message in messages if isinstance(message, dict)]
+    try:
+        predictions = iter(insight_engine.batch_predict(snapshots))
+        failure = None
+    except ValueError as e:
+        predictions, failure = None, str(e)
+
+    responses = []
+    for offset, message in enumerate(messages):
+        response = {"seq": first_seq + offset}
+        if not isinstance(message, dict):
+            response["error"] = "Message must be a JSON object"
+        else:
+            response["id"] = message.get("id")
+            if failure is not None:
+                response["error"] = failure
+            else:
+                response["prediction"] = next(predictions)
+        responses.append(response)
+    return responses
+
+
+# =========================================================
+# Service
+# =========================================================
+class PredictionService:
+    """gRPC handlers over the insight_engine scoring core"""
+
+    def __init__(self, max_batch: int = config.GRPC_MAX_BATCH,
+                 linger_ms: float = config.GRPC_BATCH_LINGER_MS,
+                 stream_buffer: int = config.GRPC_STREAM_BUFFER):
+        self.max_batch = max(1, max_batch)
+        self.linger = max(0.0, linger_ms) / 1000.0
+        self.stream_buffer = max(1, stream_buffer)
+
+    def predict_stream(self, request_iterator: Iterator, context) -> Iterator[Dict[str, Any]]:
+        pending = queue.Queue(maxsize=self.stream_buffer)
+        stop = threading.Event()
+        reader = threading.Thread(target=_read_requests, args=(request_iterator, pending, stop),
+                                  name="grpc-stream-reader", daemon=True)
+        reader.start()
+
+        seq = 0
+        ended = False
+        try:
+            while not ended and context.is_active():
+                batch, ended = next_batch(pending, self.max_batch, self.linger)
+                if batch:
+                    yield from score_messages(batch, seq)
+                    seq += len(batch)
+        finally:
+            # Release a reader blocked on a full buffer
+            stop.set()
+
+    def predict(self, request: Any, context) -> Dict[str, Any]:
+        return score_messages([request])[0]
+
+    def handler(self) -> "grpc.GenericRpcHandler":
+        grpc = _grpc()
+        return grpc.method_handlers_generic_handler(SERVICE_NAME, {
+            "PredictStream": grpc.stream_stream_rpc_method_handler(
+                self.predict_stream, request_deserializer=_deserialize, response_serializer=_serialize),
+            "Predict": grpc.unary_unary_rpc_method_handler(
+                self.predict, request_deserializer=_deserialize, response_serializer=_serialize),
+        })
+
+
+def create_server(host: str = config.HOST, port: int = config.GRPC_PORT,
+                  workers: int = config.GRPC_WORKERS) -> "grpc.Server":
+    """
+    Build (but do not start) the gRPC server. Each open stream holds one
+    worker thread, so `workers` bounds the number of concurrent streams.
+    """
+    grpc = _grpc()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grpc"),
+        options=[
+            ("grpc.max_receive_message_length", MAX_MESSAGE_BYTES),
+            ("grpc.max_send_message_length", MAX_MESSAGE_BYTES),
+        ]
+    )
+    server.add_generic_rpc_handlers((PredictionService().handler(),))
+    server.add_insecure_port(f"{host}:{port}")
+    return server
+
+
+# =========================================================
+# Client
+# =========================================================
+def predict_stream(target: str, snapshots: Iterable[Dict[str, Any]],
+                   timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream snapshots to a running service and yield its responses in order.
+
+    Args:
+        target: "host:port" of the gRPC service
+        snapshots: Snapshot dictionaries (consumed lazily, so generators work)
+        timeout: Optional deadline in seconds for the whole stream
+    """
+    with _grpc().insecure_channel(target) as channel:
+        call = channel.stream_stream(f"/{SERVICE_NAME}/PredictStream",
+                                     request_serializer=_serialize, response_deserializer=json.loads)
+        yield from call(iter(snapshots), timeout=timeout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming gRPC prediction service")
+    parser.add_argument("--host", default=config.HOST, help=f"Bind address (default: {config.HOST})")
+    parser.add_argument("--port", type=int, default=config.GRPC_PORT, help=f"Port (default: {config.GRPC_PORT})")
+    parser.add_argument("--workers", type=int, default=config.GRPC_WORKERS,
+                        help=f"Concurrent streams (default: {config.GRPC_WORKERS})")
+    args = parser.parse_args(argv)
+
+    if not insight_engine.MODELS_LOADED:
+        print("❌ Models not loaded. Run 'ojt-ai train' first.")
+        return 1
+
+    try:
+        server = create_server(args.host, args.port, args.workers)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    server.start()
+    print(f"🚀 gRPC prediction service on {args.host}:{args.port} "
+          f"(batch ≤ {config.GRPC_MAX_BATCH}, linger {config.GRPC_BATCH_LINGER_MS} ms)")
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(grace=5)
+    return 0
+
+
+if __name__ == "__main__":
+    main()
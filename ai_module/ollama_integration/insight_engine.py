@@ -1,57 +1,352 @@
 import os
 import pickle
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+import config
+from calibration import apply_calibration, load_calibration
+from risk_policy import RISK_LEVELS, build_risk_policy, label_risk_code, load_risk_policy
+from tracing import span
 
 # =========================================================
 # Directory Setup
 # =========================================================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_DIR = os.path.join(BASE_DIR, "../models")
+MODEL_DIR = config.MODELS_DIR
+
+# Ensemble weights (LR, RF, NB)
+MODEL_WEIGHTS = np.array([0.4, 0.4, 0.2])
+
+
+# =========================================================
+# Model Bundle
+# =========================================================
+class ModelBundle:
+    """
+    One trained model version: the three base models, preprocessing
+    artifacts, and the optional calibration table and risk policy saved next
+    to them. The server scores with the primary bundle; a candidate bundle can
+    be loaded alongside it for shadow evaluation.
+    """
+
+    def __init__(self, lr_model, rf_model, nb_model, scaler, label_encoder, feature_names,
+                 weights=MODEL_WEIGHTS, calibration=None, risk_policy=None, model_dir=None):
+        self.lr_model = lr_model
+        self.rf_model = rf_model
+        self.nb_model = nb_model
+        self.scaler = scaler
+        self.label_encoder = label_encoder
+        self.feature_names = feature_names
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.calibration = calibration
+        self.risk_policy = risk_policy or build_risk_policy(label_encoder.classes_)
+        self.model_dir = model_dir
+
+    @classmethod
+    def load(cls, model_dir: str, weights=MODEL_WEIGHTS, name: str = "Models") -> "ModelBundle":
+        """
+        Load a bundle from a models directory (as written by train_model.py).
+
+        Missing or inconsistent calibration / risk policy files only produce a
+        warning; missing base models or preprocessing artifacts raise.
+        """
+        artifacts = {}
+        for key in ("logistic_regression", "random_forest", "naive_bayes",
+                    "scaler", "label_encoder", "feature_names"):
+            with open(os.path.join(model_dir, f"{key}.pkl"), 'rb') as f:
+                artifacts[key] = pickle.load(f)
+        weights = np.asarray(weights, dtype=np.float64)
+        label_encoder = artifacts["label_encoder"]
+        print(f"✅ {name} loaded successfully. Features: {artifacts['feature_names']}")
+
+        # Optional calibration table fitted on held-out data (scripts/calibrate.py or train_model.py)
+        calibration = None
+        calibration_path = os.path.join(model_dir, "calibration.pkl")
+        if os.path.exists(calibration_path):
+            try:
+                calibration = load_calibration(calibration_path)
+                if calibration.get("weights") is not None and not np.allclose(calibration["weights"], weights):
+                    print(f"⚠️ Warning: Calibration was fitted for weights {calibration['weights']}, "
+                          f"serving {weights.tolist()}; using uncalibrated probabilities")
+                    calibration = None
+                else:
+                    print(f"✅ Calibration loaded ({calibration['method']})")
+            except Exception as e:
+                print(f"⚠️ Warning: Failed to load calibration: {e}")
+                calibration = None
+
+        # Risk policy: label -> risk codes plus probability thresholds fitted on held-out
+        # data; without a saved policy, the label mapping is compiled from the classes
+        risk_policy = None
+        risk_policy_path = os.path.join(model_dir, "risk_policy.pkl")
+        try:
+            if os.path.exists(risk_policy_path):
+                risk_policy = load_risk_policy(risk_policy_path)
+                if risk_policy.classes != [str(c) for c in label_encoder.classes_]:
+                    raise ValueError("risk policy classes do not match the label encoder")
+                if risk_policy.uses_thresholds and risk_policy.metrics.get("calibrated", True) != (calibration is not None):
+                    raise ValueError("risk thresholds were fitted on "
+                                     f"{'calibrated' if calibration is None else 'uncalibrated'} probabilities")
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to load risk policy ({e}); using label mapping only")
+            risk_policy = None
+
+        return cls(artifacts["logistic_regression"], artifacts["random_forest"], artifacts["naive_bayes"],
+                   artifacts["scaler"], label_encoder, artifacts["feature_names"],
+                   weights, calibration, risk_policy, model_dir)
+
+    def predict_ensemble_proba(self, feature_array: np.ndarray) -> np.ndarray:
+        """
+        Weighted (and, when a calibration table is loaded, calibrated) ensemble
+        probabilities for a whole feature matrix in one pass.
+
+        Args:
+            feature_array: 2-D array of shape (n_students, n_features), columns
+                ordered like feature_names
+
+        Returns:
+            Array of shape (n_students, n_classes)
+        """
+        # Ensure all values are numeric
+        feature_array = np.nan_to_num(
+            np.asarray(feature_array, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0
+        )
+
+        # Scale features for LR and NB
+        with span("scale"):
+            feature_array_scaled = self.scaler.transform(feature_array)
+
+        # Get probabilities from each model (one span each; no-ops outside a traced request)
+        with span("lr"):
+            lr_proba = self.lr_model.predict_proba(feature_array_scaled)
+        with span("rf"):
+            rf_proba = self.rf_model.predict_proba(feature_array)
+        with span("nb"):
+            nb_proba = self.nb_model.predict_proba(feature_array_scaled)
+
+        # Combine via weighted average (weights: 0.4, 0.4, 0.2)
+        ensemble_proba = (
+            self.weights[0] * lr_proba +
+            self.weights[1] * rf_proba +
+            self.weights[2] * nb_proba
+        )
+
+        # Map raw scores to calibrated probabilities with one table interpolation
+        with span("calibrate"):
+            return apply_calibration(ensemble_proba, self.calibration)
+
+    def predict_arrays(self, feature_array: np.ndarray):
+        """
+        Score a batch and keep the results as arrays (no per-row objects).
+
+        Returns:
+            (probabilities (n, n_classes) float64, predicted class indices (n,),
+            risk codes (n,) indexing RISK_LEVELS)
+        """
+        if len(feature_array) == 0:
+            return np.zeros((0, len(self.risk_policy.classes))), np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        ensemble_proba = self.predict_ensemble_proba(feature_array)
+
+        # Get predicted class index for every row
+        predicted_indices = np.argmax(ensemble_proba, axis=1)
+
+        # Risk for the whole batch via integer lookups in the precompiled policy
+        risk_codes = self.risk_policy.assign(ensemble_proba, predicted_indices)
+        return ensemble_proba, predicted_indices, risk_codes
+
+    def predict_performance_batch(self, feature_array: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Predict performance for many students with a single ensemble pass.
+
+        Args:
+            feature_array: 2-D array of shape (n_students, n_features), columns
+                ordered like feature_names
+
+        Returns:
+            List of prediction dictionaries in the same format and row order as
+            predict_performance
+        """
+        return self.results_from_arrays(*self.predict_arrays(feature_array))
+
+    def results_from_arrays(self, ensemble_proba: np.ndarray, predicted_indices: np.ndarray,
+                            risk_codes: np.ndarray) -> List[Dict[str, Any]]:
+        """Prediction dictionaries (see predict_performance) from predict_arrays output"""
+        risk_levels = RISK_LEVELS[risk_codes]
+        class_labels = self.risk_policy.classes
+
+        results = []
+        for row, predicted_index, risk_level in zip(ensemble_proba.tolist(), predicted_indices.tolist(), risk_levels):
+            results.append({
+                "predicted_label": class_labels[predicted_index],
+                "probability": row[predicted_index],
+                "class_probabilities": dict(zip(class_labels, row)),
+                "risk_level": risk_level
+            })
+
+        return results
+
+    def feature_vector(self, features_dict: Dict[str, float]) -> np.ndarray:
+        """Order a feature dictionary like this bundle's feature_names (missing features are 0)"""
+        return np.array([[features_dict.get(feature_name, 0.0) for feature_name in self.feature_names]])
+
 
 # =========================================================
 # Model Loading (Load once at module import)
 # =========================================================
 try:
-    # Load individual models
-    with open(os.path.join(MODEL_DIR, "logistic_regression.pkl"), 'rb') as f:
-        LR_MODEL = pickle.load(f)
-    
-    with open(os.path.join(MODEL_DIR, "random_forest.pkl"), 'rb') as f:
-        RF_MODEL = pickle.load(f)
-    
-    with open(os.path.join(MODEL_DIR, "naive_bayes.pkl"), 'rb') as f:
-        NB_MODEL = pickle.load(f)
-    
-    # Load preprocessing artifacts
-    with open(os.path.join(MODEL_DIR, "scaler.pkl"), 'rb') as f:
-        SCALER = pickle.load(f)
-    
-    with open(os.path.join(MODEL_DIR, "label_encoder.pkl"), 'rb') as f:
-        LABEL_ENCODER = pickle.load(f)
-    
-    with open(os.path.join(MODEL_DIR, "feature_names.pkl"), 'rb') as f:
-        FEATURE_NAMES = pickle.load(f)
-    
+    PRIMARY_BUNDLE = ModelBundle.load(MODEL_DIR)
     MODELS_LOADED = True
-    print(f"✅ Models loaded successfully. Features: {FEATURE_NAMES}")
 except Exception as e:
+    PRIMARY_BUNDLE = None
     MODELS_LOADED = False
     print(f"⚠️ Warning: Failed to load models: {e}")
+
+# Module-level views of the primary bundle
+if MODELS_LOADED:
+    LR_MODEL = PRIMARY_BUNDLE.lr_model
+    RF_MODEL = PRIMARY_BUNDLE.rf_model
+    NB_MODEL = PRIMARY_BUNDLE.nb_model
+    SCALER = PRIMARY_BUNDLE.scaler
+    LABEL_ENCODER = PRIMARY_BUNDLE.label_encoder
+    FEATURE_NAMES = PRIMARY_BUNDLE.feature_names
+    CALIBRATION = PRIMARY_BUNDLE.calibration
+    RISK_POLICY = PRIMARY_BUNDLE.risk_policy
+else:
     LR_MODEL = None
     RF_MODEL = None
     NB_MODEL = None
     SCALER = None
     LABEL_ENCODER = None
     FEATURE_NAMES = None
-
-# Ensemble weights (LR, RF, NB)
-MODEL_WEIGHTS = np.array([0.4, 0.4, 0.2])
+    CALIBRATION = None
+    RISK_POLICY = None
 
 
 # =========================================================
 # Feature Mapping from Snapshot
 # =========================================================
+# Training feature name -> daily snapshot field sent by the backend
+SNAPSHOT_FIELD_BY_FEATURE = {
+    'Weekly Progress Report (Score)': "daily_progress_score",
+    'Practicum Narrative Report (Score)': "narrative_score",
+    'Practicum Coordinator Evaluation (Score)': "coord_eval_score",
+    'Practicum Partner Supervisor Evaluation (Score)': "partner_eval_score",
+    'Attendance (Days Present out of 25)': "attendance_days_present",
+}
+
+# Alternative snapshot keys (the score-sheet names used by scripts/predict_test.py)
+# -> backend snapshot field. batch_predict accepts either schema.
+SNAPSHOT_FIELD_ALIASES = {
+    "weekly_progress": "daily_progress_score",
+    "narrative_report": "narrative_score",
+    "coordinator_evaluation": "coord_eval_score",
+    "partner_evaluation": "partner_eval_score",
+    "attendance": "attendance_days_present",
+}
+
+
+def compile_snapshot_columns(feature_names: List[str]) -> tuple:
+    """
+    Precompile the snapshot -> feature column map for a column order.
+
+    Returns:
+        Tuple of (column index, accepted snapshot keys) for every feature
+        that has a snapshot field, backend field first, then its aliases.
+        Columns without a field are left out (they stay 0).
+    """
+    aliases_by_field: Dict[str, List[str]] = {}
+    for alias, field in SNAPSHOT_FIELD_ALIASES.items():
+        aliases_by_field.setdefault(field, []).append(alias)
+
+    columns = []
+    for column, feature_name in enumerate(feature_names):
+        field = SNAPSHOT_FIELD_BY_FEATURE.get(feature_name)
+        if field is not None:
+            columns.append((column, (field, *aliases_by_field.get(field, ()))))
+    return tuple(columns)
+
+
+# Compiled once, when the models load, for the primary bundle's column order
+SNAPSHOT_COLUMNS = compile_snapshot_columns(FEATURE_NAMES) if MODELS_LOADED else ()
+
+
+def write_snapshot_row(snapshot: Dict[str, Any], row: np.ndarray):
+    """
+    Write one snapshot's values into a zeroed float64 row in FEATURE_NAMES
+    order. None becomes NaN and non-numeric values are skipped (left 0);
+    callers sanitize NaN/inf for the whole buffer in one call.
+    """
+    for column, keys in SNAPSHOT_COLUMNS:
+        for key in keys:
+            value = snapshot.get(key)
+            if value is not None:
+                try:
+                    row[column] = value
+                except (ValueError, TypeError):
+                    pass
+                break
+
+
+def snapshot_matrix(snapshots: List[Dict[str, Any]], out: np.ndarray = None) -> np.ndarray:
+    """
+    Feature matrix for many snapshots in either key schema (see
+    SNAPSHOT_FIELD_ALIASES), in FEATURE_NAMES column order.
+
+    Args:
+        snapshots: Daily snapshots
+        out: Optional preallocated float64 buffer of shape
+            (len(snapshots), len(FEATURE_NAMES)) to write into
+
+    Returns:
+        The filled matrix; missing, non-numeric, NaN and infinite values are 0
+    """
+    if not FEATURE_NAMES:
+        raise ValueError("Feature names not loaded. Models may not be initialized.")
+    if out is None:
+        out = np.zeros((len(snapshots), len(FEATURE_NAMES)))
+    else:
+        out.fill(0.0)
+    for row, snapshot in enumerate(snapshots):
+        write_snapshot_row(snapshot, out[row])
+    return np.nan_to_num(out, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def column_matrix(columns: Dict[str, np.ndarray], n_rows: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Feature matrix from columnar input (e.g. an Arrow table), one vectorized
+    copy per feature column.
+
+    Args:
+        columns: Column name -> 1-D array of n_rows values. A column may be
+            named like the training feature, the backend snapshot field or
+            one of its aliases; nulls should arrive as NaN
+        n_rows: Number of rows
+        out: Optional preallocated float64 buffer of shape (n_rows, n_features)
+
+    Returns:
+        The filled matrix; missing columns and NaN/infinite values are 0
+    """
+    if not FEATURE_NAMES:
+        raise ValueError("Feature names not loaded. Models may not be initialized.")
+    if out is None:
+        out = np.zeros((n_rows, len(FEATURE_NAMES)))
+    else:
+        out.fill(0.0)
+    keys_by_column = dict(SNAPSHOT_COLUMNS)
+    for column, feature_name in enumerate(FEATURE_NAMES):
+        for key in (feature_name, *keys_by_column.get(column, ())):
+            values = columns.get(key)
+            if values is not None:
+                out[:, column] = values
+                break
+    return np.nan_to_num(out, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def snapshot_vector(snapshot: Dict[str, Any]) -> np.ndarray:
+    """Feature row of shape (1, n_features) for one snapshot (see snapshot_matrix)"""
+    return snapshot_matrix((snapshot,))
+
+
 def build_features_from_snapshot(snapshot: Dict[str, Any]) -> Dict[str, float]:
     """
     Convert daily student snapshot to model feature dictionary.
@@ -67,45 +362,10 @@ def build_features_from_snapshot(snapshot: Dict[str, Any]) -> Dict[str, float]:
             }
     
     Returns:
-        Dictionary mapping feature names to numeric values
+        Dictionary mapping feature names to numeric values (missing, invalid,
+        NaN and infinite values are 0)
     """
-    if not FEATURE_NAMES:
-        raise ValueError("Feature names not loaded. Models may not be initialized.")
-    
-    # Map snapshot fields to feature names
-    # Feature names from training:
-    # ['Weekly Progress Report (Score)', 'Practicum Narrative Report (Score)', 
-    #  'Practicum Coordinator Evaluation (Score)', 'Practicum Partner Supervisor Evaluation (Score)', 
-    #  'Attendance (Days Present out of 25)']
-    
-    features = {}
-    
-    # Map each expected feature name to snapshot value
-    for feature_name in FEATURE_NAMES:
-        if feature_name == 'Weekly Progress Report (Score)':
-            features[feature_name] = float(snapshot.get("daily_progress_score", 0))
-        elif feature_name == 'Practicum Narrative Report (Score)':
-            features[feature_name] = float(snapshot.get("narrative_score", 0))
-        elif feature_name == 'Practicum Coordinator Evaluation (Score)':
-            features[feature_name] = float(snapshot.get("coord_eval_score", 0))
-        elif feature_name == 'Practicum Partner Supervisor Evaluation (Score)':
-            features[feature_name] = float(snapshot.get("partner_eval_score", 0))
-        elif feature_name == 'Attendance (Days Present out of 25)':
-            features[feature_name] = float(snapshot.get("attendance_days_present", 0))
-        else:
-            # Default to 0 for any unknown features
-            features[feature_name] = 0.0
-    
-    # Ensure all values are numeric and handle None/NaN
-    for key, value in features.items():
-        try:
-            features[key] = float(value) if value is not None else 0.0
-            if np.isnan(features[key]) or np.isinf(features[key]):
-                features[key] = 0.0
-        except (ValueError, TypeError):
-            features[key] = 0.0
-    
-    return features
+    return dict(zip(FEATURE_NAMES, snapshot_vector(snapshot)[0].tolist()))
 
 
 # =========================================================
@@ -115,47 +375,16 @@ def map_label_to_risk_level(predicted_label: str) -> str:
     """
     Map predicted label to risk level (HIGH, MEDIUM, LOW).
     
+    Predictions are assigned risk through RISK_POLICY; this helper applies the
+    same label rules to a single arbitrary label.
+    
     Args:
         predicted_label: The predicted class label from the model
     
     Returns:
         Risk level string: "HIGH", "MEDIUM", or "LOW"
     """
-    label_lower = str(predicted_label).lower()
-    
-    # Common patterns for high risk
-    high_risk_keywords = ['poor', 'failing', 'at risk', 'low', 'unsatisfactory', 'needs improvement']
-    # Common patterns for medium risk
-    medium_risk_keywords = ['average', 'satisfactory', 'fair', 'moderate', 'needs attention']
-    # Common patterns for low risk
-    low_risk_keywords = ['excellent', 'good', 'satisfactory', 'high', 'outstanding', 'above average']
-    
-    if any(keyword in label_lower for keyword in high_risk_keywords):
-        return "HIGH"
-    elif any(keyword in label_lower for keyword in medium_risk_keywords):
-        return "MEDIUM"
-    elif any(keyword in label_lower for keyword in low_risk_keywords):
-        return "LOW"
-    else:
-        # Default mapping based on label value
-        # If label is numeric or can be compared, use that
-        try:
-            # Try to extract numeric value if label contains numbers
-            import re
-            numbers = re.findall(r'\d+', label_lower)
-            if numbers:
-                num = int(numbers[0])
-                if num < 50:
-                    return "HIGH"
-                elif num < 75:
-                    return "MEDIUM"
-                else:
-                    return "LOW"
-        except:
-            pass
-        
-        # Default to MEDIUM if we can't determine
-        return "MEDIUM"
+    return str(RISK_LEVELS[label_risk_code(predicted_label)])
 
 
 # =========================================================
@@ -179,52 +408,75 @@ def predict_performance(features_dict: Dict[str, float]) -> Dict[str, Any]:
     """
     if not MODELS_LOADED:
         raise ValueError("Models not loaded. Cannot make predictions.")
-    
+
     if not FEATURE_NAMES:
         raise ValueError("Feature names not available.")
-    
+
     # Order feature values according to FEATURE_NAMES
-    feature_array = np.array([[features_dict.get(feature_name, 0.0) for feature_name in FEATURE_NAMES]])
-    
-    # Ensure all values are numeric
-    feature_array = np.nan_to_num(feature_array, nan=0.0, posinf=0.0, neginf=0.0)
-    
-    # Scale features for LR and NB
-    feature_array_scaled = SCALER.transform(feature_array)
-    
-    # Get probabilities from each model
-    lr_proba = LR_MODEL.predict_proba(feature_array_scaled)
-    rf_proba = RF_MODEL.predict_proba(feature_array)
-    nb_proba = NB_MODEL.predict_proba(feature_array_scaled)
-    
-    # Combine via weighted average (weights: 0.4, 0.4, 0.2)
-    ensemble_proba = (
-        MODEL_WEIGHTS[0] * lr_proba +
-        MODEL_WEIGHTS[1] * rf_proba +
-        MODEL_WEIGHTS[2] * nb_proba
-    )
-    
-    # Get predicted class index
-    predicted_index = np.argmax(ensemble_proba[0])
-    
-    # Decode label with LABEL_ENCODER
-    predicted_label = LABEL_ENCODER.inverse_transform([predicted_index])[0]
-    
-    # Get probability of predicted class
-    probability = float(ensemble_proba[0][predicted_index])
-    
-    # Build class probabilities dictionary
-    class_probabilities = {}
-    for i, class_label in enumerate(LABEL_ENCODER.classes_):
-        class_probabilities[str(class_label)] = float(ensemble_proba[0][i])
-    
-    # Map to risk level
-    risk_level = map_label_to_risk_level(predicted_label)
-    
-    return {
-        "predicted_label": str(predicted_label),
-        "probability": probability,
-        "class_probabilities": class_probabilities,
-        "risk_level": risk_level
-    }
+    return predict_performance_batch(PRIMARY_BUNDLE.feature_vector(features_dict))[0]
+
 
+# =========================================================
+# Vectorized Batch Prediction
+# =========================================================
+def batch_predict(snapshots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Predict performance for a batch of snapshots with a single ensemble pass.
+
+    Args:
+        snapshots: Daily snapshots keyed like build_features_from_snapshot
+            ("daily_progress_score", "narrative_score", ...) or with the
+            aliases in SNAPSHOT_FIELD_ALIASES ("weekly_progress",
+            "narrative_report", ...)
+
+    Returns:
+        List of prediction dictionaries (see predict_performance), one per
+        snapshot and in the same order
+    """
+    if not MODELS_LOADED:
+        raise ValueError("Models not loaded. Cannot make predictions.")
+    if not snapshots:
+        return []
+    return PRIMARY_BUNDLE.results_from_arrays(*score_arrays(snapshot_matrix(snapshots)))
+
+
+def score_arrays(feature_array: np.ndarray):
+    """
+    predict_arrays on the primary bundle, in this process or, with
+    OJT_SCORING_BACKEND=process and at least two shards of rows, sharded
+    across the scoring_pool worker processes (same results, same row order).
+    """
+    if config.SCORING_BACKEND == "process" and len(feature_array) >= 2 * config.SCORING_SHARD_ROWS:
+        import scoring_pool
+        return scoring_pool.predict_arrays(feature_array, PRIMARY_BUNDLE)
+    return PRIMARY_BUNDLE.predict_arrays(feature_array)
+
+
+def predict_ensemble_proba(feature_array: np.ndarray) -> np.ndarray:
+    """
+    Calibrated ensemble probabilities from the primary bundle
+    (see ModelBundle.predict_ensemble_proba).
+    """
+    if not MODELS_LOADED:
+        raise ValueError("Models not loaded. Cannot make predictions.")
+    return PRIMARY_BUNDLE.predict_ensemble_proba(feature_array)
+
+
+def predict_arrays(feature_array: np.ndarray):
+    """
+    Probabilities, predicted class indices and risk codes for a batch from
+    the primary bundle (see ModelBundle.predict_arrays).
+    """
+    if not MODELS_LOADED:
+        raise ValueError("Models not loaded. Cannot make predictions.")
+    return score_arrays(feature_array)
+
+
+def predict_performance_batch(feature_array: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Predict performance for many students with the primary bundle
+    (see ModelBundle.predict_performance_batch).
+    """
+    if not MODELS_LOADED:
+        raise ValueError("Models not loaded. Cannot make predictions.")
+    return PRIMARY_BUNDLE.results_from_arrays(*score_arrays(feature_array))
@@ -0,0 +1,357 @@
+import json
+import time
+import numpy as np
+from flask import Blueprint, Response, request, jsonify
+import insight_engine
+from insight_engine import predict_performance_batch, snapshot_vector, FEATURE_NAMES
+import batch_formats
+import db
+import drift
+import explainer
+import feature_store
+import shadow
+import tracing
+import write_behind
+
+# Prediction routes (/predict, /predict/batch, /features/events, /metrics). Kept out of
+# server.py so a chat-only server never imports numpy or unpickles models.
+prediction_api = Blueprint("prediction_api", __name__)
+
+# Side effects of a prediction (drift, shadow, write-behind insight) collected
+# by predict_body_deferred instead of applied; None applies them in place.
+# Only process-pool workers defer, and they run one job at a time.
+_deferred = None
+
+@prediction_api.route('/predict', methods=['POST'])
+def predict():
+    """
+    Daily risk prediction endpoint.
+    Accepts a daily snapshot of student performance and returns AI prediction.
+
+    Instead of a snapshot the body may carry only a `student_id`; the snapshot
+    is then loaded from the database in one round trip.
+
+    With a `student_id` and `"save": true` the ai_insights row is queued on the
+    write-behind queue, so the response never waits on the insert. Use
+    `"save": "sync"` to write it in the same transaction as the snapshot read.
+
+    Add `"explain": true` to also get per-feature contributions for the
+    predicted class from each base model.
+    """
+    try:
+        with tracing.span("parse"):
+            data = request.get_json() or {}
+    except Exception as e:
+        return jsonify({
+            "error": str(e),
+            "message": "Prediction failed"
+        }), 500
+    status, payload = predict_body(data)
+    with tracing.span("serialize"):
+        return jsonify(payload), status
+
+def predict_body(data):
+    """
+    The /predict handler without a web framework, shared by the Flask route
+    and asgi_server.py.
+
+    Args:
+        data: Parsed JSON body
+
+    Returns:
+        tuple: (HTTP status, response body)
+    """
+    try:
+        start = time.time()
+        student_id = data.get("student_id")
+        save = data.get("save", False)
+        explain = bool(data.get("explain", False))
+
+        if student_id is not None and "daily_progress_score" not in data:
+            return predict_for_student(int(student_id), save, explain)
+
+        # Build features from snapshot
+        # Snapshot written straight into a feature row; the dict is only for the response
+        with tracing.span("features"):
+            feature_row = snapshot_vector(data)
+            features = dict(zip(FEATURE_NAMES, feature_row[0].tolist()))
+        observe_drift(features)
+
+        # Get prediction
+        predict_start = time.perf_counter()
+        with tracing.span("predict"):
+            result = predict_performance_batch(feature_row)[0]
+        submit_shadow(features, result, predict_start)
+
+        if student_id is not None and save:
+            snapshot = {key: value for key, value in data.items() if key not in ("student_id", "save", "explain")}
+            queue_insight(int(student_id), snapshot, result, start)
+
+        response = {
+            "features_used": features,
+            "prediction": result
+        }
+        if explain:
+            with tracing.span("explain"):
+                response["explanation"] = explain_prediction(features, result)
+        return 200, response
+    except db.PoolTimeout as e:
+        return 503, {
+            "error": str(e),
+            "message": "Database busy"
+        }
+    except ValueError as e:
+        return 400, {
+            "error": str(e),
+            "message": "Model not loaded or invalid input"
+        }
+    except Exception as e:
+        return 500, {
+            "error": str(e),
+            "message": "Prediction failed"
+        }
+
+def predict_body_deferred(data):
+    """
+    predict_body for a process-pool worker (asgi_server.py): the drift, shadow
+    and write-behind side effects are returned instead of applied. A worker's
+    own monitor, evaluator and queue are invisible to the serving process, and
+    rows left in its queue are lost when it exits (atexit does not run in
+    multiprocessing children).
+
+    Returns:
+        tuple: (HTTP status, response body, effects for asgi_server.apply_effects)
+    """
+    global _deferred
+    _deferred = []
+    try:
+        status, payload = predict_body(data)
+        return status, payload, _deferred
+    finally:
+        _deferred = None
+
+def queue_insight(student_id, snapshot, result, start):
+    """Hand a prediction to the write-behind queue instead of inserting it inline"""
+    row = (
+        student_id,
+        'Daily Risk Prediction Ensemble',
+        'daily_risk_prediction',
+        json.dumps(result),
+        result["probability"],
+        json.dumps(snapshot),
+        int((time.time() - start) * 1000)
+    )
+    if _deferred is not None:
+        _deferred.append(("insight", *row))
+        return
+    write_behind.get_queue().enqueue_insight(*row)
+
+def observe_drift(features):
+    """Feed one feature vector to the drift monitor (O(features), no-op without reference stats)"""
+    if _deferred is not None:
+        _deferred.append(("drift", features))
+        return
+    monitor = drift.get_monitor()
+    if monitor is not None:
+        monitor.observe_features(features)
+
+def submit_shadow(features, result, predict_start):
+    """Offer a served prediction to the shadow candidate (sampled, scored off the request path)"""
+    latency = time.perf_counter() - predict_start
+    if _deferred is not None:
+        # The serving process samples and submits; workers never start a candidate
+        if shadow.SHADOW_MODEL_DIR:
+            _deferred.append(("shadow", features, result, latency))
+        return
+    evaluator = shadow.get_evaluator()
+    if evaluator is not None:
+        evaluator.submit(features, result, latency)
+
+def explain_prediction(features, result):
+    """Per-feature contributions toward the predicted class (cached per feature vector)"""
+    engine_explainer = explainer.get_explainer()
+    feature_vector = np.array([[features.get(name, 0.0) for name in engine_explainer.feature_names]])
+    class_index = engine_explainer.class_labels.index(result["predicted_label"])
+    return engine_explainer.explain_batch(feature_vector, [class_index])[0]
+
+def predict_for_student(student_id, save, explain=False):
+    """
+    Load a student's snapshot from the database, predict, and optionally persist
+
+    Returns:
+        tuple: (HTTP status, response body)
+    """
+    start = time.time()
+
+    # Serve straight from the feature store's running aggregates when enabled
+    if feature_store.FEATURE_STORE_ENABLED and save != "sync":
+        store = feature_store.get_store()
+        with tracing.span("features", source="feature_store"):
+            feature_vector = store.get_features(student_id)
+        if feature_vector is not None:
+            predict_start = time.perf_counter()
+            with tracing.span("predict"):
+                result = predict_performance_batch(feature_vector[np.newaxis, :])[0]
+            features = dict(zip(store.feature_names, feature_vector.tolist()))
+            submit_shadow(features, result, predict_start)
+            snapshot = store.get_snapshot(student_id)
+            if save:
+                queue_insight(student_id, snapshot, result, start)
+            observe_drift(features)
+            response = {
+                "student_id": student_id,
+                "snapshot": snapshot,
+                "features_used": features,
+                "prediction": result,
+                "insight_id": None
+            }
+            if explain:
+                with tracing.span("explain"):
+                    response["explanation"] = explain_prediction(features, result)
+            return 200, response
+
+    with db.get_pool().transaction() as conn:
+        with tracing.span("db", statement="load_student_snapshot"):
+            snapshot = db.load_student_snapshot(conn, student_id)
+        if snapshot is None:
+            return 404, {"error": "No data for this student"}
+
+        with tracing.span("features"):
+            feature_row = snapshot_vector(snapshot)
+            features = dict(zip(FEATURE_NAMES, feature_row[0].tolist()))
+        observe_drift(features)
+        predict_start = time.perf_counter()
+        with tracing.span("predict"):
+            result = predict_performance_batch(feature_row)[0]
+        submit_shadow(features, result, predict_start)
+
+        insight_id = None
+        if save == "sync":
+            with tracing.span("db", statement="insert_insight"):
+                insight_id = db.insert_insight(
+                    conn, student_id,
+                    'Daily Risk Prediction Ensemble',
+                    'daily_risk_prediction',
+                    json.dumps(result),
+                    result["probability"],
+                    json.dumps(snapshot),
+                    int((time.time() - start) * 1000)
+                )
+
+    if save and save != "sync":
+        queue_insight(student_id, snapshot, result, start)
+
+    response = {
+        "student_id": student_id,
+        "snapshot": snapshot,
+        "features_used": features,
+        "prediction": result,
+        "insight_id": insight_id
+    }
+    if explain:
+        with tracing.span("explain"):
+            response["explanation"] = explain_prediction(features, result)
+    return 200, response
+
+@prediction_api.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Score many snapshots with one ensemble pass.
+
+    JSON body: {"snapshots": [{...}, ...]} (backend keys or the score-sheet
+    aliases) -> {"count": n, "predictions": [...]}.
+
+    For large batches send the feature matrix as `application/x-npy` or
+    `application/vnd.apache.arrow.stream` instead; the response uses the same
+    format unless Accept names another one (see batch_formats.py).
+    """
+    try:
+        with tracing.span("parse"):
+            in_format = batch_formats.request_format(request.content_type)
+            out_format = batch_formats.response_format(request.headers.get("Accept"), in_format)
+
+        with tracing.span("features", format=in_format):
+            if in_format == "json":
+                snapshots = (request.get_json() or {}).get("snapshots", [])
+                if not isinstance(snapshots, list):
+                    raise ValueError("snapshots must be a list")
+                feature_array = insight_engine.snapshot_matrix(snapshots)
+            elif in_format == "npy":
+                column_names = batch_formats.parse_names_header(
+                    request.headers.get(batch_formats.FEATURE_NAMES_HEADER))
+                feature_array, columns = batch_formats.decode_npy(request.get_data(), FEATURE_NAMES, column_names)
+                if columns is not None:
+                    feature_array = insight_engine.column_matrix(columns, len(feature_array))
+            else:
+                columns, n_rows = batch_formats.decode_arrow(request.get_data())
+                feature_array = insight_engine.column_matrix(columns, n_rows)
+
+        with tracing.span("predict", rows=len(feature_array)):
+            arrays = insight_engine.predict_arrays(feature_array)
+
+        with tracing.span("serialize", format=out_format):
+            class_labels = insight_engine.RISK_POLICY.classes
+            if out_format == "json":
+                predictions = insight_engine.PRIMARY_BUNDLE.results_from_arrays(*arrays)
+                return jsonify({"count": len(predictions), "predictions": predictions})
+            body = batch_formats.encode_results(out_format, *arrays, class_labels)
+            response = Response(body, mimetype=batch_formats.MIMETYPE_BY_FORMAT[out_format])
+            response.headers[batch_formats.CLASS_LABELS_HEADER] = json.dumps([str(label) for label in class_labels])
+            response.headers[batch_formats.FEATURE_NAMES_HEADER] = json.dumps(list(FEATURE_NAMES))
+            return response
+    except batch_formats.UnsupportedFormat as e:
+        return jsonify({
+            "error": str(e),
+            "message": "Unsupported payload format"
+        }), 415
+    except ValueError as e:
+        return jsonify({
+            "error": str(e),
+            "message": "Model not loaded or invalid input"
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "error": str(e),
+            "message": "Prediction failed"
+        }), 500
+
+@prediction_api.route('/features/events', methods=['POST'])
+def feature_events():
+    """
+    Apply attendance/evaluation events to the feature store. Each event is the
+    current state of one row, so the backend can resend it after every write.
+    Body: {"events": [{"type": "attendance", "attendance_id": 31, "student_id": 7,
+                       "date": "2025-01-15", "hours": 8}, ...]}
+    """
+    if not feature_store.FEATURE_STORE_ENABLED:
+        return jsonify({"error": "Feature store disabled (set OJT_FEATURE_STORE=1)"}), 404
+    try:
+        data = request.get_json() or {}
+        applied = feature_store.get_store().apply_events(data.get("events", []))
+        return jsonify({"applied": applied})
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({
+            "error": str(e),
+            "message": "Invalid event"
+        }), 400
+
+@prediction_api.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Live feature drift against the training distribution.
+    Alerts fire per feature on PSI, mean shift (in training std units) and
+    the share of values outside the training range.
+
+    With a shadow candidate loaded, `shadow` reports its agreement with the
+    primary and both models' latencies.
+    """
+    evaluator = shadow.get_evaluator()
+    response = {"shadow": evaluator.stats() if evaluator is not None else None}
+
+    monitor = drift.get_monitor()
+    if monitor is None:
+        response["drift"] = None
+        response["message"] = "No reference statistics (models/reference_stats.pkl); retrain or run scripts/calibrate.py"
+    else:
+        response["drift"] = monitor.snapshot()
+    return jsonify(response)
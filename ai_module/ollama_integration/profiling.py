@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import random
+import cProfile
+import threading
+from collections import Counter
+from typing import Optional
+
+from flask import g, request, Response, jsonify
+
+import config
+
+# =========================================================
+# Configuration
+# =========================================================
+# Rotating directory for per-request profiles and stack samples
+PROFILE_DIR = config.PROFILE_DIR
+# Newest files kept in PROFILE_DIR
+PROFILE_KEEP = config.PROFILE_KEEP
+# Fraction of requests profiled without being asked (0 disables sampling)
+PROFILE_SAMPLE_RATE = config.PROFILE_SAMPLE_RATE
+# Shared secret for the X-Profile header and /debug/profile; both are disabled when unset
+PROFILE_TOKEN = config.PROFILE_TOKEN
+
+PROFILE_HEADER = "X-Profile"
+MAX_SAMPLE_SECONDS = 60.0
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Only one cProfile may be active per process (sys.setprofile / sys.monitoring)
+_profile_lock = threading.Lock()
+_sampler_lock = threading.Lock()
+
+
+# =========================================================
+# Profile Files
+# =========================================================
+def write_profile_file(name: str, write) -> str:
+    """
+    Write one file into PROFILE_DIR and drop the oldest files beyond PROFILE_KEEP.
+
+    Args:
+        name: File name (timestamp-prefixed by the caller)
+        write: Callable receiving the destination path
+
+    Returns:
+        Path of the written file
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, name)
+    write(path)
+
+    entries = sorted(
+        (entry for entry in os.scandir(PROFILE_DIR) if entry.is_file()),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in entries[:max(len(entries) - PROFILE_KEEP, 0)]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+    return path
+
+
+def _timestamp() -> str:
+    return time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+
+
+def _authorized(token: Optional[str]) -> bool:
+    return bool(PROFILE_TOKEN) and token == PROFILE_TOKEN
+
+
+# =========================================================
+# Per-request cProfile
+# =========================================================
+def _start_request_profile():
+    requested = _authorized(request.headers.get(PROFILE_HEADER))
+    if not requested and not (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE):
+        return
+    # Skip rather than wait when another request is being profiled
+    if not _profile_lock.acquire(blocking=False):
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        _profile_lock.release()
+        return
+    g.profiler = profiler
+    g.profile_start = time.perf_counter()
+
+
+def _finish_request_profile(response):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+    try:
+        profiler.disable()
+    finally:
+        _profile_lock.release()
+
+    elapsed_ms = int((time.perf_counter() - g.pop("profile_start")) * 1000)
+    endpoint = (request.endpoint or "unknown").replace("/", "_")
+    try:
+        path = write_profile_file(f"{_timestamp()}-{endpoint}-{elapsed_ms}ms.prof", profiler.dump_stats)
+        response.headers["X-Profile-File"] = os.path.basename(path)
+    except OSError as e:
+        print(f"⚠️ Warning: Failed to write profile: {e}")
+    return response
+
+
+def _abandon_request_profile(exc):
+    # after_request does not run when a view raises
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+
+
+# =========================================================
+# Statistical Stack Sampling
+# =========================================================
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+
+def sample_stacks(seconds: float, interval: float = DEFAULT_SAMPLE_INTERVAL) -> Counter:
+    """
+    Sample the Python stacks of every other thread for a while.
+
+    Args:
+        seconds: How long to sample
+        interval: Seconds between samples
+
+    Returns:
+        Counter of folded stacks ("thread;outer;...;inner") -> sample count,
+        the input format of flamegraph.pl / speedscope
+    """
+    own = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    stacks = Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+            frames.append(names.get(ident, str(ident)))
+            stacks[";".join(reversed(frames))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def debug_profile():
+    """
+    GET /debug/profile?seconds=N[&interval=S]
+    Sample the running server's stacks for N seconds and return them folded,
+    one "stack count" line each (flamegraph-ready). Requires the X-Profile
+    header (or ?token=) to match OJT_PROFILE_TOKEN.
+    """
+    if not _authorized(request.headers.get(PROFILE_HEADER) or request.args.get("token")):
+        return jsonify({"error": "Profiling disabled or token missing"}), 404
+    try:
+        seconds = min(float(request.args.get("seconds", "5")), MAX_SAMPLE_SECONDS)
+        interval = max(float(request.args.get("interval", DEFAULT_SAMPLE_INTERVAL)), 0.001)
+    except ValueError:
+        return jsonify({"error": "seconds and interval must be numbers"}), 400
+
+    if not _sampler_lock.acquire(blocking=False):
+        return jsonify({"error": "A stack sample is already running"}), 409
+    try:
+        stacks = sample_stacks(seconds, interval)
+    finally:
+        _sampler_lock.release()
+
+    folded = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def write(path):
+        with open(path, "w") as f:
+            f.write(folded)
+
+    response = Response(folded, mimetype="text/plain")
+    try:
+        path = write_profile_file(f"{_timestamp()}-stacks-{int(seconds)}s.folded", write)
+        response.headers["X-Profile-File"] = os.path.basename(path)
+    except OSError as e:
+        print(f"⚠️ Warning: Failed to write stack sample: {e}")
+    return response
+
+
+# =========================================================
+# Installation
+# =========================================================
+def install(app):
+    """
+    Register the profiling hooks and /debug/profile on a Flask app.
+
+    Per-request hooks are only registered when something can trigger them
+    (OJT_PROFILE_TOKEN or OJT_PROFILE_SAMPLE_RATE), so an unconfigured server
+    pays nothing.
+    """
+    if PROFILE_TOKEN or PROFILE_SAMPLE_RATE > 0:
+        app.before_request(_start_request_profile)
+        app.after_request(_finish_request_profile)
+        app.teardown_request(_abandon_request_profile)
+    app.add_url_rule('/debug/profile', 'debug_profile', debug_profile, methods=['GET'])
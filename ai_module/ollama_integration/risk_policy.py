@@ -0,0 +1,202 @@
+import re
+import pickle
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+# =========================================================
+# Risk Levels
+# =========================================================
+# Integer codes index this array
+RISK_LEVELS = np.array(["LOW", "MEDIUM", "HIGH"], dtype=object)
+LOW, MEDIUM, HIGH = 0, 1, 2
+
+# Keyword patterns, checked in this order (high risk first, so that
+# "unsatisfactory" is not read as "satisfactory")
+HIGH_RISK_KEYWORDS = ['poor', 'failing', 'at risk', 'low', 'unsatisfactory', 'needs improvement']
+MEDIUM_RISK_KEYWORDS = ['average', 'satisfactory', 'fair', 'moderate', 'needs attention']
+LOW_RISK_KEYWORDS = ['excellent', 'good', 'high', 'outstanding', 'above average']
+
+# Letter grades as produced by the "(Grade)" target columns
+LETTER_GRADE_RISK = {'A': LOW, 'B': LOW, 'C': MEDIUM, 'D': HIGH, 'E': HIGH, 'F': HIGH}
+
+# Fitted thresholds are only kept when they separate high-risk students
+# (Youden's J) and leave a MEDIUM band at least this wide
+MIN_YOUDEN_J = 0.2
+MIN_BAND_WIDTH = 0.05
+
+
+def label_risk_code(label) -> int:
+    """
+    Risk code for one class label. Only called when a policy is built, never per prediction.
+
+    Letter grades map directly (A/B low, C medium, D/E/F high), then keyword
+    patterns are tried, then a numeric score in the label (<50 high, <75
+    medium, otherwise low). Anything else is medium.
+    """
+    text = str(label).strip()
+    letter = text.rstrip('+-').upper()
+    if letter in LETTER_GRADE_RISK:
+        return LETTER_GRADE_RISK[letter]
+
+    lowered = text.lower()
+    if any(keyword in lowered for keyword in HIGH_RISK_KEYWORDS):
+        return HIGH
+    if any(keyword in lowered for keyword in MEDIUM_RISK_KEYWORDS):
+        return MEDIUM
+    if any(keyword in lowered for keyword in LOW_RISK_KEYWORDS):
+        return LOW
+
+    numbers = re.findall(r'\d+', lowered)
+    if numbers:
+        number = int(numbers[0])
+        return HIGH if number < 50 else MEDIUM if number < 75 else LOW
+    return MEDIUM
+
+
+# =========================================================
+# Policy
+# =========================================================
+class RiskPolicy:
+    """
+    Risk assignment compiled from the label set (and optionally held-out data).
+
+    `label_risk` holds one risk code per class index. When thresholds are
+    present, the probability mass on high-risk classes can lower that level:
+    HIGH at or above `high_threshold`, MEDIUM at or above `medium_threshold`,
+    otherwise LOW, capped at the predicted label's level (a predicted "A" is
+    never HIGH). Either way a whole batch is assigned with integer array
+    operations.
+    """
+
+    def __init__(self, classes, label_risk, medium_threshold: Optional[float] = None,
+                 high_threshold: Optional[float] = None, metrics: Optional[Dict[str, Any]] = None):
+        self.classes = [str(label) for label in classes]
+        self.label_risk = np.asarray(label_risk, dtype=np.intp)
+        self.medium_threshold = medium_threshold
+        self.high_threshold = high_threshold
+        self.metrics = metrics or {}
+        self._high_mask = self.label_risk == HIGH
+        self._thresholds = (
+            np.array([medium_threshold, high_threshold]) if self.uses_thresholds else None
+        )
+
+    @property
+    def uses_thresholds(self) -> bool:
+        return (self.medium_threshold is not None and self.high_threshold is not None
+                and self._high_mask.any())
+
+    def risk_scores(self, probabilities: np.ndarray) -> np.ndarray:
+        """Probability mass on the high-risk classes, per row"""
+        return probabilities[:, self._high_mask].sum(axis=1)
+
+    def assign(self, probabilities: np.ndarray, predicted_indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Risk codes for a batch.
+
+        Args:
+            probabilities: (Calibrated) ensemble probabilities, shape (n, n_classes)
+            predicted_indices: Argmax class per row (computed if omitted)
+
+        Returns:
+            Integer risk codes indexing RISK_LEVELS
+        """
+        if predicted_indices is None:
+            predicted_indices = np.argmax(probabilities, axis=1)
+        label_codes = self.label_risk[predicted_indices]
+        if self.uses_thresholds:
+            codes = np.searchsorted(self._thresholds, self.risk_scores(probabilities), side='right')
+            return np.minimum(codes, label_codes)
+        return label_codes
+
+    def levels(self, probabilities: np.ndarray, predicted_indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Risk level strings for a batch"""
+        return RISK_LEVELS[self.assign(probabilities, predicted_indices)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "classes": self.classes,
+            "label_risk": self.label_risk.tolist(),
+            "medium_threshold": self.medium_threshold,
+            "high_threshold": self.high_threshold,
+            "metrics": self.metrics,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RiskPolicy":
+        return cls(data["classes"], data["label_risk"], data.get("medium_threshold"),
+                   data.get("high_threshold"), data.get("metrics"))
+
+
+def build_risk_policy(classes, probabilities: Optional[np.ndarray] = None,
+                      y_encoded: Optional[np.ndarray] = None, calibrated: bool = True) -> RiskPolicy:
+    """
+    Compile a risk policy for a label set.
+
+    With held-out (calibrated) probabilities and true labels the thresholds are
+    fitted too: HIGH starts at the risk score that maximizes Youden's J
+    (TPR - FPR) for detecting truly high-risk students, which unlike F1 never
+    favours flagging everyone, and MEDIUM at the held-out prevalence of
+    high-risk classes (more risk than an average student), capped at HIGH.
+    A fit with J below MIN_YOUDEN_J or a MEDIUM band narrower than
+    MIN_BAND_WIDTH is noise; it is rejected and the label mapping is used.
+
+    Args:
+        classes: LABEL_ENCODER.classes_
+        probabilities: Held-out (calibrated) ensemble probabilities
+        y_encoded: Encoded true labels for those rows
+        calibrated: Whether `probabilities` went through the served calibration
+            table; serving only uses the thresholds on the same kind
+
+    Returns:
+        RiskPolicy
+    """
+    label_risk = [label_risk_code(label) for label in classes]
+    policy = RiskPolicy(classes, label_risk)
+    if probabilities is None or y_encoded is None or not policy._high_mask.any():
+        return policy
+
+    scores = policy.risk_scores(np.asarray(probabilities, dtype=np.float64))
+    actual_high = policy._high_mask[np.asarray(y_encoded, dtype=np.intp)]
+    prevalence = float(actual_high.mean())
+
+    # TPR - FPR of "score >= t" for every candidate t at once: sort scores descending
+    order = np.argsort(-scores)
+    sorted_scores = scores[order]
+    true_positives = np.cumsum(actual_high[order])
+    false_positives = np.cumsum(~actual_high[order])
+    youden = (true_positives / max(actual_high.sum(), 1)
+              - false_positives / max((~actual_high).sum(), 1))
+    # Only thresholds at the last row of each tied score are reachable
+    distinct = np.append(sorted_scores[1:] != sorted_scores[:-1], True)
+    best = np.flatnonzero(distinct)[np.argmax(youden[distinct])]
+    high_threshold = float(sorted_scores[best])
+    medium_threshold = min(prevalence, high_threshold)
+
+    metrics = {
+        "n_samples": int(len(scores)),
+        "calibrated": bool(calibrated),
+        "high_risk_prevalence": prevalence,
+        "high_youden_j": float(youden[best]),
+        "fitted_thresholds": [medium_threshold, high_threshold],
+    }
+    if youden[best] < MIN_YOUDEN_J or high_threshold - medium_threshold < MIN_BAND_WIDTH:
+        metrics["rejected"] = (f"Youden's J {youden[best]:.3f} (min {MIN_YOUDEN_J}), "
+                               f"MEDIUM band {high_threshold - medium_threshold:.4f} (min {MIN_BAND_WIDTH})")
+        return RiskPolicy(classes, label_risk, metrics=metrics)
+
+    policy = RiskPolicy(classes, label_risk, medium_threshold, high_threshold, metrics)
+    codes = policy.assign(np.asarray(probabilities, dtype=np.float64))
+    metrics["assigned"] = {str(RISK_LEVELS[c]): int((codes == c).sum()) for c in (LOW, MEDIUM, HIGH)}
+    return policy
+
+
+def save_risk_policy(policy: RiskPolicy, path: str):
+    # Stored as a plain dict so loading never depends on where this module was imported from
+    with open(path, "wb") as f:
+        pickle.dump(policy.to_dict(), f)
+
+
+def load_risk_policy(path: str) -> RiskPolicy:
+    with open(path, "rb") as f:
+        return RiskPolicy.from_dict(pickle.load(f))
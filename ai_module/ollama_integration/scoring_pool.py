@@ -0,0 +1,203 @@
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import config
+
+# =========================================================
+# Process-Pool Scoring Backend
+# =========================================================
+# Random forest inference dominates large batches, and under a threaded
+# server concurrent batches compete for the GIL. With
+# OJT_SCORING_BACKEND=process, batches of at least two shards
+# (OJT_SCORING_SHARD_ROWS rows each) are split into contiguous row ranges
+# and scored by a persistent pool of OJT_SCORING_WORKERS processes, each
+# holding its own copy of the model bundle:
+#
+#   parent:  feature matrix -> shared input block, one task per row range
+#   worker:  score rows [start, stop) -> same rows of the shared output block
+#   parent:  copy probabilities / class indices / risk codes out, unlink
+#
+# Only block names and row ranges are pickled, never arrays, and every
+# shard writes its own rows, so results keep the input order. Workers are
+# spawned (not forked) so a threaded server's locks are never inherited.
+# If a worker dies the executor is broken for good: the batch is scored
+# inline and the next batch starts a fresh pool.
+
+SHARD_ROWS = max(1, config.SCORING_SHARD_ROWS)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Bundle of this worker process (set by _init_worker)
+_worker_bundle = None
+
+
+# =========================================================
+# Worker
+# =========================================================
+def _init_worker(model_dir: str):
+    global _worker_bundle
+    import insight_engine
+    if insight_engine.MODELS_LOADED and insight_engine.MODEL_DIR == model_dir:
+        _worker_bundle = insight_engine.PRIMARY_BUNDLE
+    else:
+        _worker_bundle = insight_engine.ModelBundle.load(model_dir, name="Scoring worker models")
+
+
+def _output_views(buffer, n_rows: int, n_classes: int):
+    """(probabilities, predicted indices, risk codes) laid out in one output block"""
+    probabilities = np.ndarray((n_rows, n_classes), dtype=np.float64, buffer=buffer)
+    offset = probabilities.nbytes
+    predicted_indices = np.ndarray((n_rows,), dtype=np.intp, buffer=buffer, offset=offset)
+    risk_codes = np.ndarray((n_rows,), dtype=np.intp, buffer=buffer, offset=offset + predicted_indices.nbytes)
+    return probabilities, predicted_indices, risk_codes
+
+
+def _write_outputs(buffer, n_rows: int, n_classes: int, start: int, results):
+    for view, values in zip(_output_views(buffer, n_rows, n_classes), results):
+        view[start:start + len(values)] = values
+
+
+def _score_shard(input_name: str, output_name: str, n_rows: int, n_features: int, n_classes: int,
+                 start: int, stop: int):
+    """Score rows [start, stop) of the shared input into the same rows of the shared output"""
+    # Shared views never outlive one call: a view left in a traceback would keep close() from
+    # releasing the block. The shard is copied out (a few floats per row next to the model cost).
+    input_block = shared_memory.SharedMemory(name=input_name)
+    try:
+        shard = np.ndarray((n_rows, n_features), dtype=np.float64, buffer=input_block.buf)[start:stop].copy()
+    finally:
+        input_block.close()
+
+    results = _worker_bundle.predict_arrays(shard)
+
+    output_block = shared_memory.SharedMemory(name=output_name)
+    try:
+        _write_outputs(output_block.buf, n_rows, n_classes, start, results)
+    finally:
+        output_block.close()
+
+
+# =========================================================
+# Pool
+# =========================================================
+class ScoringPool:
+    """
+    Persistent worker processes that score row shards of one batch in
+    parallel (same results as ModelBundle.predict_arrays).
+    """
+
+    def __init__(self, model_dir: str = config.MODELS_DIR, workers: int = config.SCORING_WORKERS,
+                 shard_rows: int = SHARD_ROWS):
+        self.model_dir = model_dir
+        self.workers = max(1, workers or multiprocessing.cpu_count())
+        self.shard_rows = max(1, shard_rows)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_dir,),
+        )
+
+    def shards(self, n_rows: int):
+        """Contiguous (start, stop) row ranges: at most one per worker, each ≥ shard_rows"""
+        count = max(1, min(self.workers, n_rows // self.shard_rows))
+        bounds = np.linspace(0, n_rows, count + 1).astype(int)
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def warm_up(self):
+        """Start every worker (and load its models) now rather than on the first batch"""
+        for future in [self.executor.submit(int) for _ in range(self.workers)]:
+            future.result()
+
+    def predict_arrays(self, feature_array: np.ndarray, n_classes: int):
+        """
+        Score a batch across the pool.
+
+        Args:
+            feature_array: 2-D array of shape (n_students, n_features)
+            n_classes: Number of classes of the bundle the workers serve
+
+        Returns:
+            (probabilities (n, n_classes) float64, predicted class indices (n,),
+            risk codes (n,) indexing RISK_LEVELS), in input row order
+        """
+        n_rows, n_features = feature_array.shape
+        input_block = shared_memory.SharedMemory(create=True, size=max(1, n_rows * n_features * 8))
+        output_block = shared_memory.SharedMemory(
+            create=True, size=max(1, n_rows * (n_classes * 8 + 2 * np.dtype(np.intp).itemsize)))
+        try:
+            np.ndarray((n_rows, n_features), dtype=np.float64, buffer=input_block.buf)[:] = feature_array
+
+            futures = [
+                self.executor.submit(_score_shard, input_block.name, output_block.name,
+                                     n_rows, n_features, n_classes, start, stop)
+                for start, stop in self.shards(n_rows)
+            ]
+            # Every shard must be done before the blocks are unlinked, even when one fails
+            wait(futures)
+            for future in futures:
+                future.result()
+
+            # Copy out so the blocks can be released right away
+            return tuple([view.copy() for view in _output_views(output_block.buf, n_rows, n_classes)])
+        finally:
+            input_block.close()
+            input_block.unlink()
+            output_block.close()
+            output_block.unlink()
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def get_pool() -> ScoringPool:
+    """The process-wide pool, started on first use and shut down at exit"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ScoringPool()
+                pool.warm_up()
+                atexit.register(pool.shutdown)
+                _pool = pool
+    return _pool
+
+
+def discard_pool(pool: ScoringPool):
+    """Forget a broken pool so the next get_pool() starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def predict_arrays(feature_array: np.ndarray, bundle):
+    """
+    Score a batch across the process-wide pool, falling back to `bundle` in
+    this process when a worker has died (the broken pool is replaced on the
+    next call).
+
+    Args:
+        feature_array: 2-D array of shape (n_students, n_features)
+        bundle: ModelBundle the workers serve, used for the inline fallback
+
+    Returns:
+        Same as ModelBundle.predict_arrays
+    """
+    pool = None
+    try:
+        pool = get_pool()
+        return pool.predict_arrays(feature_array, len(bundle.risk_policy.classes))
+    except BrokenProcessPool as e:
+        print(f"⚠️ Warning: Scoring pool broken ({e}); scoring this batch inline and restarting the pool")
+        if pool is not None:
+            discard_pool(pool)
+    return bundle.predict_arrays(feature_array)
@@ -1,10 +1,20 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from chatbot_handler import chatbot_response
-from insight_engine import predict_performance, build_features_from_snapshot
+import config
+import profiling
+import tracing
+import write_behind
+
+# Services this process serves: "chat", "predict" or both (default). A
+# chat-only server skips the prediction stack (numpy, sklearn, model
+# unpickling) entirely, so it cold-starts in a fraction of the time.
+SERVICES = config.SERVICES
 
 app = Flask(__name__)
 CORS(app)  # ✅ Enables communication with Flutter (web or mobile)
+profiling.install(app)  # Opt-in per-request cProfile and /debug/profile (OJT_PROFILE_TOKEN)
+tracing.install(app)  # traceparent in, Server-Timing out, spans to OJT_TRACE_EXPORTER
 
 @app.route('/chat', methods=['POST'])
 def chat():
@@ -14,39 +24,23 @@ def chat():
         if not user_message:
             return jsonify({"response": "Please enter a message."})
         bot_reply = chatbot_response(user_message)
+
+        # Log the transcript off the request path when the caller identifies the user
+        # (an unusable user_id only skips the log, never the reply)
+        user_id = write_behind.parse_user_id(data.get("user_id"))
+        if user_id is not None:
+            write_behind.get_queue().enqueue_chat_log(user_id, user_message, bot_reply)
+
         return jsonify({"response": bot_reply})
     except Exception as e:
         return jsonify({"response": f"⚠️ Error: {str(e)}"})
 
-@app.route('/predict', methods=['POST'])
-def predict():
-    """
-    Daily risk prediction endpoint.
-    Accepts a daily snapshot of student performance and returns AI prediction.
-    """
-    try:
-        data = request.get_json() or {}
-        
-        # Build features from snapshot
-        features = build_features_from_snapshot(data)
-        
-        # Get prediction
-        result = predict_performance(features)
-        
-        return jsonify({
-            "features_used": features,
-            "prediction": result
-        })
-    except ValueError as e:
-        return jsonify({
-            "error": str(e),
-            "message": "Model not loaded or invalid input"
-        }), 400
-    except Exception as e:
-        return jsonify({
-            "error": str(e),
-            "message": "Prediction failed"
-        }), 500
+if "predict" in SERVICES:
+    from prediction_api import prediction_api
+    import shadow
+    app.register_blueprint(prediction_api)
+    # Load the shadow candidate (OJT_SHADOW_MODEL_DIR) at startup rather than on a request
+    shadow.get_evaluator()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    app.run(host=config.HOST, port=config.PORT)
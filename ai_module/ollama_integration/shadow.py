@@ -0,0 +1,249 @@
+import time
+import atexit
+import random
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+import config
+import insight_engine
+
+# =========================================================
+# Configuration
+# =========================================================
+# Directory of the candidate bundle; shadow scoring is off when unset
+SHADOW_MODEL_DIR = config.SHADOW_MODEL_DIR
+# Fraction of /predict requests the candidate also scores
+SHADOW_SAMPLE_RATE = config.SHADOW_SAMPLE_RATE
+# Sampled requests waiting for the candidate; beyond this they are skipped
+SHADOW_MAX_PENDING = config.SHADOW_MAX_PENDING
+# Latency samples kept for percentiles
+LATENCY_WINDOW = 1024
+
+# Candidate bundle of the shadow worker process (set by _init_candidate)
+_candidate = None
+
+
+# =========================================================
+# Worker process
+# =========================================================
+def _init_candidate(model_dir: str):
+    global _candidate
+    _candidate = insight_engine.ModelBundle.load(model_dir, name="Shadow candidate")
+
+
+def _score_candidate(features: Dict[str, float]):
+    """Score one feature dictionary with the candidate; returns (result, seconds)"""
+    start = time.perf_counter()
+    result = _candidate.predict_performance_batch(_candidate.feature_vector(features))[0]
+    return result, time.perf_counter() - start
+
+
+class ShadowEvaluator:
+    """
+    Scores a sampled fraction of live requests with a candidate model bundle
+    and compares it with the primary's answers.
+
+    The candidate lives in its own spawned worker process, so its inference
+    never competes with the primary for this process's GIL. The request
+    thread only draws a random number and sends the feature dictionary (a
+    few floats); the comparison with the primary result runs when the
+    worker answers. When the worker falls behind by `max_pending` requests,
+    new samples are skipped (and counted) instead of queueing without bound.
+    A worker that dies is replaced on the next sample.
+    """
+
+    def __init__(self, model_dir: str, sample_rate: float = SHADOW_SAMPLE_RATE,
+                 max_pending: int = SHADOW_MAX_PENDING):
+        self.model_dir = model_dir
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._restarting = False
+        self._executor = self._start_worker()
+
+        self.sampled = 0
+        self.skipped = 0
+        self.compared = 0
+        self.errors = 0
+        self.label_agreements = 0
+        self.risk_agreements = 0
+        self._probability_gap_sum = 0.0
+        self._total_variation_sum = 0.0
+        self._primary_latency = deque(maxlen=LATENCY_WINDOW)
+        self._candidate_latency = deque(maxlen=LATENCY_WINDOW)
+
+    def _start_worker(self) -> ProcessPoolExecutor:
+        """Spawn the candidate worker and wait until its models are loaded (raises if they fail)"""
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_candidate,
+            initargs=(self.model_dir,),
+        )
+        try:
+            executor.submit(int).result()
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return executor
+
+    # -----------------------------------------------------
+    # Request side
+    # -----------------------------------------------------
+    def submit(self, features: Dict[str, float], primary_result: Dict[str, Any],
+               primary_latency: Optional[float] = None) -> bool:
+        """
+        Maybe score this request with the candidate in the background.
+
+        Args:
+            features: Feature dictionary the primary scored
+            primary_result: The primary's prediction dictionary
+            primary_latency: Seconds the primary prediction took
+
+        Returns:
+            True if the request was handed to the candidate
+        """
+        if random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.skipped += 1
+                return False
+            self._pending += 1
+            self.sampled += 1
+            executor = self._executor
+        try:
+            future = executor.submit(_score_candidate, dict(features))
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._worker_failed(executor, e)
+            with self._lock:
+                self._pending -= 1
+            return False
+        future.add_done_callback(lambda done: self._compare(done, executor, primary_result, primary_latency))
+        return True
+
+    def _worker_failed(self, executor, error):
+        """Count the failure and replace a dead worker, once per broken executor and off the caller's thread"""
+        with self._lock:
+            self.errors += 1
+            if self._executor is not executor or self._restarting:
+                return
+            self._restarting = True
+        print(f"⚠️ Shadow worker failed ({error}); restarting it")
+        threading.Thread(target=self._restart, args=(executor,), name="shadow-restart", daemon=True).start()
+
+    def _restart(self, executor):
+        executor.shutdown(wait=False, cancel_futures=True)
+        replacement = None
+        try:
+            replacement = self._start_worker()
+        except Exception as e:
+            print(f"⚠️ Warning: Failed to restart the shadow worker: {e}")
+        with self._lock:
+            if replacement is not None:
+                self._executor = replacement
+            self._restarting = False
+
+    # -----------------------------------------------------
+    # Comparison (runs when the worker answers)
+    # -----------------------------------------------------
+    def _compare(self, future, executor, primary_result, primary_latency):
+        try:
+            try:
+                candidate_result, candidate_latency = future.result()
+            except BrokenProcessPool as e:
+                self._worker_failed(executor, e)
+                return
+
+            labels = set(primary_result["class_probabilities"]) | set(candidate_result["class_probabilities"])
+            total_variation = 0.5 * sum(
+                abs(primary_result["class_probabilities"].get(label, 0.0)
+                    - candidate_result["class_probabilities"].get(label, 0.0))
+                for label in labels
+            )
+            with self._lock:
+                self.compared += 1
+                self.label_agreements += primary_result["predicted_label"] == candidate_result["predicted_label"]
+                self.risk_agreements += primary_result["risk_level"] == candidate_result["risk_level"]
+                self._probability_gap_sum += abs(primary_result["probability"] - candidate_result["probability"])
+                self._total_variation_sum += total_variation
+                self._candidate_latency.append(candidate_latency)
+                if primary_latency is not None:
+                    self._primary_latency.append(primary_latency)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"⚠️ Shadow prediction failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    # -----------------------------------------------------
+    # Reporting
+    # -----------------------------------------------------
+    @staticmethod
+    def _latency_summary(samples) -> Optional[Dict[str, float]]:
+        if not samples:
+            return None
+        values = np.array(samples) * 1000.0
+        return {
+            "mean_ms": float(values.mean()),
+            "p50_ms": float(np.percentile(values, 50)),
+            "p95_ms": float(np.percentile(values, 95)),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Agreement and latency of the candidate against the primary so far"""
+        with self._lock:
+            compared = self.compared
+            result = {
+                "candidate_dir": self.model_dir,
+                "sample_rate": self.sample_rate,
+                "sampled": self.sampled,
+                "skipped": self.skipped,
+                "compared": compared,
+                "pending": self._pending,
+                "errors": self.errors,
+                "label_agreement": self.label_agreements / compared if compared else None,
+                "risk_agreement": self.risk_agreements / compared if compared else None,
+                "mean_probability_gap": self._probability_gap_sum / compared if compared else None,
+                "mean_total_variation": self._total_variation_sum / compared if compared else None,
+                "primary_latency": self._latency_summary(list(self._primary_latency)),
+                "candidate_latency": self._latency_summary(list(self._candidate_latency)),
+            }
+        return result
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_evaluator = None
+_evaluator_loaded = False
+_evaluator_lock = threading.Lock()
+
+
+def get_evaluator() -> Optional[ShadowEvaluator]:
+    """
+    Return the process-wide shadow evaluator, or None when no candidate is
+    configured (OJT_SHADOW_MODEL_DIR) or it failed to load.
+    """
+    global _evaluator, _evaluator_loaded
+    if not _evaluator_loaded:
+        with _evaluator_lock:
+            if not _evaluator_loaded:
+                if SHADOW_MODEL_DIR and insight_engine.MODELS_LOADED:
+                    try:
+                        _evaluator = ShadowEvaluator(SHADOW_MODEL_DIR)
+                        atexit.register(_evaluator.shutdown, False)
+                    except Exception as e:
+                        print(f"⚠️ Warning: Failed to load shadow candidate: {e}")
+                _evaluator_loaded = True
+    return _evaluator
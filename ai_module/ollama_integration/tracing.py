@@ -0,0 +1,339 @@
+import os
+import re
+import json
+import time
+import queue
+import atexit
+import secrets
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+import config
+
+# =========================================================
+# Configuration
+# =========================================================
+# "" (Server-Timing only), "file" (JSON lines) or "otlp" (OTLP/HTTP JSON)
+TRACE_EXPORTER = config.TRACE_EXPORTER
+TRACE_FILE = config.TRACE_FILE
+OTLP_ENDPOINT = config.OTLP_ENDPOINT
+SERVICE_NAME = config.SERVICE_NAME
+# Finished traces waiting for the exporter; beyond this they are dropped
+EXPORT_QUEUE_SIZE = config.TRACE_QUEUE_SIZE
+EXPORT_BATCH_SIZE = 100
+
+# W3C trace context: version-traceid-parentid-flags
+TRACEPARENT_PATTERN = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+SAMPLED_FLAG = 0x01
+
+_current = contextvars.ContextVar("ojt_trace", default=None)
+
+
+# =========================================================
+# Trace Context
+# =========================================================
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+def parse_traceparent(header: Optional[str]):
+    """
+    Parse a W3C traceparent header.
+
+    Returns:
+        (trace_id, parent_span_id, sampled), or None when absent or invalid
+    """
+    if not header:
+        return None
+    match = TRACEPARENT_PATTERN.match(header.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, parent_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & SAMPLED_FLAG)
+
+
+class Trace:
+    """
+    Spans of one request inside this service.
+
+    The request itself is the root span; its parent is the caller's span from
+    the incoming traceparent (a new trace is started without one).
+    """
+
+    def __init__(self, name: str, traceparent: Optional[str] = None):
+        parsed = parse_traceparent(traceparent)
+        if parsed is None:
+            self.trace_id, self.parent_span_id, self.sampled = new_trace_id(), None, True
+        else:
+            self.trace_id, self.parent_span_id, self.sampled = parsed
+        self.span_id = new_span_id()
+        self.name = name
+        self.attributes: Dict[str, Any] = {}
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.spans: List[Dict[str, Any]] = []
+        self._stack = [self.span_id]
+
+    def traceparent(self) -> str:
+        """traceparent naming this service's root span, for downstream calls and the response"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+
+    def stage_durations(self) -> Dict[str, float]:
+        """Milliseconds per span name (repeated spans are summed)"""
+        totals: Dict[str, float] = {}
+        for span_record in self.spans:
+            totals[span_record["name"]] = totals.get(span_record["name"], 0.0) + span_record["duration_ms"]
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one metric per stage plus the total"""
+        metrics = [f"{name};dur={duration:.3f}" for name, duration in self.stage_durations().items()]
+        if self.duration is not None:
+            metrics.append(f"total;dur={self.duration * 1000:.3f}")
+        return ", ".join(metrics)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """The root span followed by its children, as exported"""
+        root = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_unix_nano": self.start_ns,
+            "duration_ms": (self.duration or 0.0) * 1000,
+            "attributes": self.attributes,
+        }
+        return [root] + self.spans
+
+
+def start_trace(name: str, traceparent: Optional[str] = None) -> Trace:
+    """Start a trace and make it current for this thread / context"""
+    trace = Trace(name, traceparent)
+    trace._token = _current.set(trace)
+    return trace
+
+
+def end_trace(trace: Trace):
+    trace.finish()
+    try:
+        _current.reset(trace._token)
+    except ValueError:
+        # Reset from a different context (e.g. Flask teardown); just clear it
+        _current.set(None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a stage of the current request as a child span.
+
+    A no-op outside a traced request, so library code (insight_engine) can
+    use it unconditionally.
+    """
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    span_id = new_span_id()
+    parent_span_id = trace._stack[-1]
+    trace._stack.append(span_id)
+    start_ns = time.time_ns()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        trace._stack.pop()
+        trace.spans.append({
+            "trace_id": trace.trace_id,
+            "span_id": span_id,
+            "parent_span_id": parent_span_id,
+            "name": name,
+            "start_unix_nano": start_ns,
+            "duration_ms": duration_ms,
+            "attributes": attributes,
+        })
+
+
+# =========================================================
+# Exporters
+# =========================================================
+def _otlp_value(value) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON body (ExportTraceServiceRequest) for span records"""
+    spans = []
+    for record in records:
+        end_ns = record["start_unix_nano"] + int(record["duration_ms"] * 1e6)
+        otlp_span = {
+            "traceId": record["trace_id"],
+            "spanId": record["span_id"],
+            "name": record["name"],
+            # 2 = SERVER for request roots, 1 = INTERNAL for stages
+            "kind": 2 if record.get("root") else 1,
+            "startTimeUnixNano": str(record["start_unix_nano"]),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)}
+                           for key, value in record["attributes"].items()],
+        }
+        if record["parent_span_id"]:
+            otlp_span["parentSpanId"] = record["parent_span_id"]
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "ojt-ai-tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class SpanExporter:
+    """
+    Writes finished traces on a background thread so requests never wait on
+    the file system or the collector. The queue is bounded; when it is full
+    traces are dropped and counted.
+    """
+
+    def __init__(self, kind: str, path: str = TRACE_FILE, endpoint: str = OTLP_ENDPOINT,
+                 capacity: int = EXPORT_QUEUE_SIZE):
+        if kind not in ("file", "otlp"):
+            raise ValueError(f"Unknown trace exporter: {kind}")
+        self.kind = kind
+        self.path = path
+        self.endpoint = endpoint
+        self._queue = queue.Queue(maxsize=capacity)
+        self.exported = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def export(self, trace: Trace) -> bool:
+        records = trace.records()
+        records[0]["root"] = True
+        try:
+            self._queue.put_nowait(records)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = list(item)
+            # Drain whatever else is waiting into the same write
+            while len(batch) < EXPORT_BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write(batch)
+                    return
+                batch.extend(item)
+            self._write(batch)
+
+    def _write(self, records: List[Dict[str, Any]]):
+        try:
+            if self.kind == "file":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, "a") as f:
+                    for record in records:
+                        f.write(json.dumps({k: v for k, v in record.items() if k != "root"}) + "\n")
+            else:
+                import urllib.request
+                body = json.dumps(to_otlp(records)).encode("utf-8")
+                otlp_request = urllib.request.Request(self.endpoint, data=body, method="POST",
+                                                      headers={"Content-Type": "application/json"})
+                with urllib.request.urlopen(otlp_request, timeout=5):
+                    pass
+            self.exported += len(records)
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"⚠️ Warning: Failed to export {len(records)} spans: {e}")
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """Process-wide exporter, or None when OJT_TRACE_EXPORTER is unset"""
+    global _exporter
+    if _exporter is None and TRACE_EXPORTER:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = SpanExporter(TRACE_EXPORTER)
+    return _exporter
+
+
+# =========================================================
+# Flask Integration
+# =========================================================
+def install(app):
+    """
+    Trace every request: accept the caller's traceparent, return per-stage
+    timings in Server-Timing and the trace context in traceresponse, and hand
+    sampled traces to the configured exporter.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_trace():
+        g.trace = start_trace(f"{request.method} {request.path}", request.headers.get("traceparent"))
+        g.trace.attributes.update({"http.method": request.method, "http.route": request.path})
+
+    @app.after_request
+    def _finish_request_trace(response):
+        trace = g.pop("trace", None)
+        if trace is None:
+            return response
+        end_trace(trace)
+        trace.attributes["http.status_code"] = response.status_code
+        response.headers["Server-Timing"] = trace.server_timing()
+        response.headers["traceresponse"] = trace.traceparent()
+
+        exporter = get_exporter()
+        if exporter is not None and trace.sampled:
+            exporter.export(trace)
+        return response
+
+    @app.teardown_request
+    def _abandon_request_trace(exc):
+        # after_request does not run when a view raises
+        trace = g.pop("trace", None)
+        if trace is not None:
+            end_trace(trace)
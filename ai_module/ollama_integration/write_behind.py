@@ -0,0 +1,233 @@
+import time
+import atexit
+import threading
+from collections import deque
+from typing import Optional
+
+import config
+import db
+
+# =========================================================
+# Configuration
+# =========================================================
+DEFAULT_CAPACITY = config.WRITE_BEHIND_CAPACITY
+DEFAULT_BATCH_SIZE = config.WRITE_BEHIND_BATCH_SIZE
+DEFAULT_FLUSH_INTERVAL = config.WRITE_BEHIND_FLUSH_INTERVAL
+DEFAULT_PUT_TIMEOUT = config.WRITE_BEHIND_PUT_TIMEOUT
+
+# Record kind -> statement in db.STATEMENTS
+INSIGHT = "insert_insight"
+CHAT_LOG = "insert_chat_log"
+
+
+class WriteBehindQueue:
+    """
+    Buffers ai_insights and chatbot_logs rows in memory and writes them in
+    batches on a background thread.
+
+    A batch is flushed when `batch_size` records are waiting, when
+    `flush_interval` seconds have passed since the last flush, or when flush()
+    is called, whichever comes first. Each kind of row is written in its own
+    transaction; a batch the database rejects is retried row by row, so one
+    bad row only loses itself. The buffer holds at most `capacity` records;
+    when it is full a producer waits up to `put_timeout` seconds for the
+    writer to catch up and then the record is dropped and counted, so a slow
+    or unreachable database can never stall request threads or grow memory
+    without bound.
+    """
+
+    def __init__(self, pool_factory=db.get_pool, capacity: int = DEFAULT_CAPACITY,
+                 batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 put_timeout: float = DEFAULT_PUT_TIMEOUT):
+        self._pool_factory = pool_factory
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._flush_requested = False
+        self._stopping = False
+        self._thread = None
+
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    # -----------------------------------------------------
+    # Producer side (request threads)
+    # -----------------------------------------------------
+    def enqueue_insight(self, student_id: int, model_name: str, insight_type: str, result_json: str,
+                        confidence: float, input_json: str, processing_time_ms: Optional[int] = None) -> bool:
+        """Queue one ai_insights row; returns False if it had to be dropped"""
+        return self._put(INSIGHT, (student_id, model_name, insight_type, result_json,
+                                   round(confidence, 2), input_json, processing_time_ms))
+
+    def enqueue_chat_log(self, user_id: int, query: str, response: str, model_used: str = "rule-based") -> bool:
+        """Queue one chatbot_logs row; returns False if it had to be dropped"""
+        return self._put(CHAT_LOG, (user_id, query, response, model_used))
+
+    def _put(self, kind: str, params: tuple) -> bool:
+        with self._cond:
+            if self._stopping:
+                self.dropped += 1
+                return False
+            if len(self._buffer) >= self.capacity:
+                self._cond.wait_for(lambda: len(self._buffer) < self.capacity, timeout=self.put_timeout)
+                if len(self._buffer) >= self.capacity:
+                    self.dropped += 1
+                    return False
+            self._buffer.append((kind, params))
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+        self._ensure_started()
+        return True
+
+    # -----------------------------------------------------
+    # Consumer side (background writer)
+    # -----------------------------------------------------
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None and not self._stopping:
+                    self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._thread.start()
+
+    def _take_batch(self):
+        """Wait for a full batch, the flush interval, flush() or shutdown; then drain one batch"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._stopping or self._flush_requested or len(self._buffer) >= self.batch_size,
+                timeout=self.flush_interval
+            )
+            count = min(len(self._buffer), self.batch_size)
+            batch = [self._buffer.popleft() for _ in range(count)]
+            self._in_flight = count
+            # A flush keeps draining without waiting until the buffer is empty
+            if not self._buffer:
+                self._flush_requested = False
+            # Room was freed for producers waiting on a full buffer
+            self._cond.notify_all()
+            return batch
+
+    def _write(self, batch) -> bool:
+        """
+        Write a batch, one transaction per kind of row, so a rejected
+        chatbot_logs row never takes ai_insights rows with it.
+
+        Returns:
+            False when the database could not be used at all (caller backs off)
+        """
+        rows_by_kind = {}
+        for kind, params in batch:
+            rows_by_kind.setdefault(kind, []).append(params)
+
+        pool = self._pool_factory()
+        reachable = True
+        for kind, rows in rows_by_kind.items():
+            try:
+                with pool.transaction() as conn:
+                    conn.execute_many(kind, rows)
+                self.written += len(rows)
+            except Exception as e:
+                print(f"⚠️ Write-behind {kind} batch failed ({e}); retrying {len(rows)} rows one by one")
+                reachable = self._write_rows(pool, kind, rows) and reachable
+        return reachable
+
+    def _write_rows(self, pool, kind: str, rows) -> bool:
+        """Retry a rejected batch one row per transaction; only rows that fail again are dropped"""
+        remaining = len(rows)
+        try:
+            with pool.connection() as conn:
+                for params in rows:
+                    try:
+                        conn.execute_many(kind, [params])
+                        conn.commit()
+                        self.written += 1
+                    except Exception as e:
+                        conn.rollback()
+                        self.dropped += 1
+                        print(f"⚠️ Write-behind dropped one {kind} row: {e}")
+                    remaining -= 1
+            return True
+        except Exception as e:
+            # No usable connection: the rest of the batch is lost, later batches are still tried
+            self.failed_batches += 1
+            self.dropped += remaining
+            print(f"⚠️ Write-behind flush failed ({remaining} {kind} rows dropped): {e}")
+            return False
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch and not self._write(batch):
+                time.sleep(min(self.flush_interval, 1.0))
+
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+                if self._stopping and not self._buffer:
+                    return
+
+    # -----------------------------------------------------
+    # Control
+    # -----------------------------------------------------
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything queued so far has been written (or timeout)"""
+        if self._thread is None:
+            return not self._buffer
+        with self._cond:
+            if self._buffer:
+                self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._buffer and not self._in_flight, timeout=timeout)
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting records, write what is left, and stop the writer thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._buffer) + self._in_flight
+        return {
+            "pending": pending,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+        }
+
+
+def parse_user_id(value) -> Optional[int]:
+    """
+    chatbot_logs user id from a request body.
+
+    Returns:
+        The id, or None when the value is not an integer (or a string of
+        digits), so the caller skips logging instead of failing the reply
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> WriteBehindQueue:
+    """Return the process-wide write-behind queue; it is flushed at interpreter exit"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WriteBehindQueue()
+                atexit.register(_queue.close)
+    return _queue
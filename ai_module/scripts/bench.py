@@ -0,0 +1,143 @@
+# scripts/bench.py
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Add parent directory (and the insight engine) to path to import modules
+AI_MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(AI_MODULE_DIR)
+sys.path.append(os.path.join(AI_MODULE_DIR, "ollama_integration"))
+
+import insight_engine
+
+# Representative daily snapshot, as the backend sends it to /predict
+SAMPLE_SNAPSHOT = {
+    "daily_progress_score": 82,
+    "narrative_score": 85,
+    "coord_eval_score": 88,
+    "partner_eval_score": 90,
+    "attendance_days_present": 18,
+}
+DEFAULT_BATCH_SIZES = (1, 10, 100, 1000)
+
+
+# =========================================================
+# Timing
+# =========================================================
+def summarize(samples):
+    """Latency percentiles in milliseconds for a list of durations in seconds"""
+    values = np.array(samples) * 1000.0
+    return {
+        "runs": len(values),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+    }
+
+
+def time_calls(fn, iterations, warmup=5):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+# =========================================================
+# Benchmarks
+# =========================================================
+def bench_single(iterations):
+    """One snapshot through build_features_from_snapshot + predict_performance"""
+    def run():
+        insight_engine.predict_performance(insight_engine.build_features_from_snapshot(SAMPLE_SNAPSHOT))
+    return time_calls(run, iterations)
+
+
+def bench_batch(batch_sizes, iterations):
+    """predict_performance_batch on random in-range feature matrices"""
+    rng = np.random.default_rng(42)
+    results = {}
+    for batch_size in batch_sizes:
+        features = rng.uniform(0, 100, size=(batch_size, len(insight_engine.FEATURE_NAMES)))
+        stats = time_calls(lambda: insight_engine.predict_performance_batch(features), iterations)
+        stats["rows_per_second"] = batch_size / (stats["mean_ms"] / 1000.0)
+        results[str(batch_size)] = stats
+    return results
+
+
+def bench_endpoint(iterations):
+    """POST /predict through the Flask test client (routing, JSON, tracing)"""
+    import server
+    client = server.app.test_client()
+
+    def run():
+        response = client.post("/predict", json=SAMPLE_SNAPSHOT)
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict returned {response.status_code}: {response.get_data(as_text=True)}")
+    return time_calls(run, iterations)
+
+
+def run_benchmark(iterations=200, batch_sizes=DEFAULT_BATCH_SIZES, endpoint=True, json_path=None):
+    """
+    Benchmark the prediction path in-process.
+
+    Args:
+        iterations: Timed calls per benchmark
+        batch_sizes: Row counts for the batch benchmark
+        endpoint: Also time /predict through the Flask test client
+        json_path: Optional path for the results
+
+    Returns:
+        dict of results, or None when the models are not loaded
+    """
+    if not insight_engine.MODELS_LOADED:
+        print("❌ Models not loaded. Run 'ojt-ai train' first.")
+        return None
+
+    print(f"⏱️  Benchmarking predictions ({iterations} runs each)...")
+    results = {"iterations": iterations, "single": bench_single(iterations)}
+    print(f"   🔹 predict_performance: p50 {results['single']['p50_ms']:.2f} ms  "
+          f"p95 {results['single']['p95_ms']:.2f} ms  p99 {results['single']['p99_ms']:.2f} ms")
+
+    results["batch"] = bench_batch(batch_sizes, iterations)
+    for batch_size, stats in results["batch"].items():
+        print(f"   🔹 predict_performance_batch[{batch_size:>5}]: p50 {stats['p50_ms']:.2f} ms  "
+              f"({stats['rows_per_second']:,.0f} rows/s)")
+
+    if endpoint:
+        results["endpoint"] = bench_endpoint(iterations)
+        print(f"   🔹 POST /predict: p50 {results['endpoint']['p50_ms']:.2f} ms  "
+              f"p95 {results['endpoint']['p95_ms']:.2f} ms  p99 {results['endpoint']['p99_ms']:.2f} ms")
+
+    if json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Benchmark saved to: {json_path}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark prediction latency in-process")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per benchmark (default: 200)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(DEFAULT_BATCH_SIZES),
+                        help=f"Batch sizes to time (default: {' '.join(map(str, DEFAULT_BATCH_SIZES))})")
+    parser.add_argument("--no-endpoint", action="store_true", help="Skip the /predict test-client benchmark")
+    parser.add_argument("--json", dest="json_path", help="Write the results here")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.iterations, args.batch_sizes, not args.no_endpoint, args.json_path)
+    return 0 if results is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# scripts/calibrate.py
+
+import os
+import sys
+import argparse
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ollama_integration"))
+
+import config
+from scripts.train_model import (
+    EnsembleModel, load_and_preprocess_data, split_for_calibration, fit_serving_calibration,
+    save_serving_artifacts, SERVING_WEIGHTS, CALIBRATION_METHOD
+)
+from scripts.evaluate_model import load_artifact
+from ollama_integration.calibration import CALIBRATION_METHODS
+from ollama_integration.drift import build_reference_stats, save_reference_stats
+
+
+def calibrate_saved_models(models_dir=config.MODELS_DIR, method=CALIBRATION_METHOD, weights=SERVING_WEIGHTS):
+    """
+    Fit models/calibration.pkl and models/risk_policy.pkl, and rebuild the
+    drift reference models/reference_stats.pkl, for already-trained models
+    without retraining.
+
+    Uses train_model.py's split layout: the table and thresholds are fitted
+    on the calibration split, which train_model.py keeps out of model fitting,
+    and the table is only written when it lowers the ECE on the slice of that
+    split it was not fitted on (otherwise calibration.pkl is removed and
+    serving uses raw probabilities). Models trained on the whole training
+    split (before the calibration split existed) have seen the calibration
+    rows; retrain for an unbiased fit.
+    """
+    print("🎚️ CALIBRATING SAVED MODELS")
+    print("="*60)
+    
+    ensemble = EnsembleModel()
+    ensemble.lr_model = load_artifact(os.path.join(models_dir, "logistic_regression.pkl"))
+    ensemble.rf_model = load_artifact(os.path.join(models_dir, "random_forest.pkl"))
+    ensemble.nb_model = load_artifact(os.path.join(models_dir, "naive_bayes.pkl"))
+    ensemble.scaler = load_artifact(os.path.join(models_dir, "scaler.pkl"))
+    ensemble.label_encoder = load_artifact(os.path.join(models_dir, "label_encoder.pkl"))
+    
+    X, y, feature_names, _ = load_and_preprocess_data()
+    
+    # Same split as train_ensemble_model
+    X_train, X_calibration, _, _, y_calibration, _ = split_for_calibration(X, y)
+    
+    calibration, risk_policy = fit_serving_calibration(ensemble, X_calibration, y_calibration,
+                                                       method=method, weights=weights)
+    save_serving_artifacts(models_dir, calibration, risk_policy)
+    if calibration is not None:
+        print(f"💾 Calibration saved to: {os.path.join(models_dir, 'calibration.pkl')}")
+    else:
+        print("💾 Calibration removed (serving raw probabilities)")
+    print(f"💾 Risk policy saved to: {os.path.join(models_dir, 'risk_policy.pkl')}")
+    
+    path = os.path.join(models_dir, "reference_stats.pkl")
+    save_reference_stats(build_reference_stats(np.vstack([X_train, X_calibration]), feature_names), path)
+    print(f"💾 Drift reference statistics saved to: {path}")
+    return calibration, risk_policy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fit probability calibration and risk thresholds for the saved models')
+    parser.add_argument('--method', choices=CALIBRATION_METHODS, default=CALIBRATION_METHOD,
+                        help=f'Calibration method (default: {CALIBRATION_METHOD})')
+    parser.add_argument('--weights', type=float, nargs=3, default=SERVING_WEIGHTS, metavar=('LR', 'RF', 'NB'),
+                        help='Ensemble weights to calibrate (default: the serving weights)')
+    args = parser.parse_args(argv)
+    
+    calibrate_saved_models(method=args.method, weights=tuple(args.weights))
+
+
+if __name__ == "__main__":
+    main()
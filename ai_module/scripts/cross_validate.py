@@ -0,0 +1,206 @@
+# scripts/cross_validate.py
+
+import os
+import sys
+import io
+import json
+import time
+import tempfile
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+import warnings
+warnings.filterwarnings('ignore')
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ollama_integration"))
+
+import config
+from scripts.train_model import EnsembleModel, load_and_preprocess_data, SERVING_WEIGHTS
+from scripts.evaluation_engine import EvaluationEngine
+
+METRICS = ['accuracy', 'precision', 'recall', 'f1_score']
+
+
+# =========================================================
+# Fold Worker
+# =========================================================
+def run_fold(fold, X_path, y_path, classes, train_index, test_index, weights):
+    """
+    Train and evaluate EnsembleModel on one fold.
+
+    The dataset is opened from .npy files with mmap_mode='r', so every worker
+    reads the same pages instead of receiving a pickled copy of the data.
+
+    Args:
+        fold (int): Fold number
+        X_path (str): Path of the feature matrix .npy
+        y_path (str): Path of the encoded label .npy
+        classes (list): Label for each encoded class
+        train_index, test_index (np.ndarray): Row indices of this fold
+        weights (tuple): Ensemble (LR, RF, NB) weights
+
+    Returns:
+        dict: Per-model metrics, per-class report and confusion matrix for the fold
+    """
+    X = np.load(X_path, mmap_mode='r')
+    y = np.asarray(classes, dtype=object)[np.load(y_path, mmap_mode='r')]
+
+    start = time.perf_counter()
+    ensemble = EnsembleModel()
+    # Keep the fit's progress output from interleaving across workers
+    with contextlib.redirect_stdout(io.StringIO()):
+        ensemble.fit(X[train_index], y[train_index], lr_weight=weights[0], rf_weight=weights[1], nb_weight=weights[2])
+    fit_seconds = time.perf_counter() - start
+
+    engine = EvaluationEngine.from_ensemble(ensemble, X[test_index], y[test_index])
+    results = engine.individual_metrics()
+    results['Ensemble'] = engine.ensemble_metrics(ensemble.model_weights)
+
+    return {
+        'fold': fold,
+        'train_samples': int(len(train_index)),
+        'test_samples': int(len(test_index)),
+        'fit_seconds': fit_seconds,
+        'models': {
+            name: {
+                **{metric: float(result[metric]) for metric in METRICS},
+                'classification_report': result['classification_report'],
+                'confusion_matrix': np.asarray(result['confusion_matrix']).tolist()
+            }
+            for name, result in results.items()
+        }
+    }
+
+
+# =========================================================
+# Aggregation
+# =========================================================
+def aggregate_folds(fold_results, classes):
+    """
+    Combine fold results into mean / std per metric and a summed confusion matrix.
+
+    Returns:
+        dict: Model name -> aggregated metrics
+    """
+    summary = {}
+    for name in fold_results[0]['models']:
+        per_fold = [fold['models'][name] for fold in fold_results]
+        entry = {}
+        for metric in METRICS:
+            values = np.array([result[metric] for result in per_fold])
+            entry[metric] = {
+                'mean': float(values.mean()),
+                'std': float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                'folds': values.tolist()
+            }
+        entry['per_class_f1'] = {
+            str(class_name): float(np.mean([result['classification_report'][str(class_name)]['f1-score']
+                                            for result in per_fold]))
+            for class_name in classes
+        }
+        entry['confusion_matrix'] = np.sum([result['confusion_matrix'] for result in per_fold], axis=0).tolist()
+        summary[name] = entry
+    return summary
+
+
+# =========================================================
+# Cross-Validation Runner
+# =========================================================
+def cross_validate(folds=5, jobs=None, weights=SERVING_WEIGHTS, seed=42, report_path=None):
+    """
+    Stratified k-fold training and evaluation of EnsembleModel, one fold per worker.
+
+    Args:
+        folds (int): Number of folds
+        jobs (int): Worker processes (default: min(folds, CPU count))
+        weights (tuple): Ensemble (LR, RF, NB) weights, the serving weights by default
+        seed (int): Shuffle seed for the fold split
+        report_path (str): Optional JSON report path
+
+    Returns:
+        dict: Report with per-fold results and the aggregated summary
+    """
+    print("🚀 STARTING STRATIFIED K-FOLD CROSS-VALIDATION")
+    print("="*60)
+    started = time.perf_counter()
+
+    X, y, feature_names, _ = load_and_preprocess_data()
+    classes, y_encoded = np.unique(y.astype(str), return_inverse=True)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(X, y_encoded))
+    jobs = max(1, min(jobs or os.cpu_count() or 1, folds))
+
+    print(f"\n🔄 Running {folds} folds on {jobs} worker(s)...")
+
+    with tempfile.TemporaryDirectory(prefix="ojt_cv_") as shared_dir:
+        # Share the dataset through memory-mapped files instead of pickling it per task
+        X_path = os.path.join(shared_dir, "X.npy")
+        y_path = os.path.join(shared_dir, "y.npy")
+        np.save(X_path, np.ascontiguousarray(X, dtype=np.float64))
+        np.save(y_path, y_encoded.astype(np.int64))
+
+        args = [(fold, X_path, y_path, classes.tolist(), train_index, test_index, tuple(weights))
+                for fold, (train_index, test_index) in enumerate(splits, 1)]
+
+        if jobs == 1:
+            fold_results = [run_fold(*fold_args) for fold_args in args]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                fold_results = list(executor.map(run_fold, *zip(*args)))
+
+    for fold in fold_results:
+        print(f"   📁 Fold {fold['fold']}: ensemble accuracy {fold['models']['Ensemble']['accuracy']:.4f} "
+              f"(fit {fold['fit_seconds']:.2f}s)")
+
+    summary = aggregate_folds(fold_results, classes)
+
+    print("\n📈 CROSS-VALIDATED PERFORMANCE (mean ± std):")
+    for name, entry in summary.items():
+        print(f"   {name}: accuracy {entry['accuracy']['mean']:.4f} ± {entry['accuracy']['std']:.4f}, "
+              f"F1 {entry['f1_score']['mean']:.4f} ± {entry['f1_score']['std']:.4f}")
+
+    report = {
+        'folds': folds,
+        'jobs': jobs,
+        'seed': seed,
+        'weights': list(weights),
+        'features': list(feature_names),
+        'classes': classes.tolist(),
+        'samples': int(len(y_encoded)),
+        'summary': summary,
+        'fold_results': fold_results,
+        'total_seconds': round(time.perf_counter() - started, 4)
+    }
+
+    if report_path:
+        os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Cross-validation report saved to: {report_path}")
+
+    print(f"\n✅ CROSS-VALIDATION COMPLETED in {report['total_seconds']:.2f}s")
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Stratified k-fold cross-validation of the OJT ensemble')
+    parser.add_argument('--folds', type=int, default=5, help='Number of folds (default: 5)')
+    parser.add_argument('--jobs', type=int, default=config.JOBS or None,
+                        help='Worker processes (default: OJT_JOBS, else one per fold, up to CPU count)')
+    parser.add_argument('--seed', type=int, default=42, help='Fold shuffle seed (default: 42)')
+    parser.add_argument('--weights', type=float, nargs=3, default=SERVING_WEIGHTS, metavar=('LR', 'RF', 'NB'),
+                        help='Ensemble weights (default: %(default)s, as served by insight_engine)')
+    parser.add_argument('--report', default=os.path.join(config.REPORTS_DIR, 'cv_report.json'),
+                        help=f'JSON report path (default: {config.REPORTS_DIR}/cv_report.json)')
+
+    args = parser.parse_args(argv)
+    cross_validate(folds=args.folds, jobs=args.jobs, weights=args.weights, seed=args.seed, report_path=args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,27 +5,159 @@ import numpy as np
 import pickle
 import os
 import sys
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import (
-    accuracy_score, classification_report, confusion_matrix,
-    precision_score, recall_score, f1_score, roc_auc_score, roc_curve,
-    precision_recall_curve, average_precision_score
-)
-from sklearn.preprocessing import label_binarize
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.metrics import classification_report, confusion_matrix
 import warnings
 warnings.filterwarnings('ignore')
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ollama_integration"))
+
+import config
+from scripts.evaluation_engine import EvaluationEngine, permutation_importance
+from scripts.train_model import SERVING_WEIGHTS
+
+
+# =========================================================
+# Lazy Plotting Imports
+# =========================================================
+def load_plotting(headless=False):
+    """
+    Import matplotlib and seaborn on first use.
+    
+    Metrics-only runs never pay for the plotting stack. Headless runs (and
+    plot workers) use the non-interactive Agg backend, so no display is needed.
+    
+    Returns:
+        tuple: (matplotlib.pyplot, seaborn)
+    """
+    import matplotlib
+    if headless:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
+
+class _ArtifactUnpickler(pickle.Unpickler):
+    """
+    ensemble_model.pkl is written by running train_model.py as a script, so the
+    pickle refers to __main__.EnsembleModel; resolve it from scripts.train_model.
+    """
+    
+    def find_class(self, module, name):
+        if module == "__main__" and name == "EnsembleModel":
+            from scripts.train_model import EnsembleModel
+            return EnsembleModel
+        return super().find_class(module, name)
+
+
+def load_artifact(path):
+    """Load a pickled model artifact"""
+    with open(path, 'rb') as f:
+        return _ArtifactUnpickler(f).load()
+
+
+# =========================================================
+# Plot Workers (module-level so they can run in a process pool)
+# =========================================================
+def render_confusion_matrix(y_true, y_pred, classes, model_name, output_dir=config.PLOTS_DIR, show=False):
+    """Render and save one confusion matrix plot; returns the saved path"""
+    plt, sns = load_plotting(headless=not show)
+    
+    plt.figure(figsize=(8, 6))
+    cm = confusion_matrix(y_true, y_pred, labels=classes)
+    
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
+               xticklabels=classes,
+               yticklabels=classes)
+    
+    plt.title(f'Confusion Matrix - {model_name}')
+    plt.xlabel('Predicted')
+    plt.ylabel('Actual')
+    plt.tight_layout()
+    
+    # Save the plot
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f'confusion_matrix_{model_name.lower().replace(" ", "_")}.png')
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close()
+    return path
+
+
+def render_feature_importance(importance_df, output_dir=config.PLOTS_DIR, show=False):
+    """Render and save the Random Forest feature importance plot; returns the saved path"""
+    plt, _ = load_plotting(headless=not show)
+    
+    plt.figure(figsize=(10, 6))
+    plt.barh(importance_df['feature'], importance_df['importance'])
+    plt.title('Random Forest Feature Importance')
+    plt.xlabel('Importance Score')
+    plt.tight_layout()
+    
+    # Save the plot
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, 'feature_importance.png')
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close()
+    return path
+
+
+def render_model_comparison(models, accuracies, f1_scores, output_dir=config.PLOTS_DIR, show=False):
+    """Render and save the accuracy / F1 comparison plot; returns the saved path"""
+    plt, _ = load_plotting(headless=not show)
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+    
+    # Accuracy comparison
+    bars1 = ax1.bar(models, accuracies, color=['skyblue', 'lightgreen', 'lightcoral', 'gold'])
+    ax1.set_title('Model Accuracy Comparison')
+    ax1.set_ylabel('Accuracy')
+    ax1.set_ylim(0, 1)
+    for bar, accuracy in zip(bars1, accuracies):
+        ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
+                f'{accuracy:.3f}', ha='center', va='bottom')
+    
+    # F1-Score comparison
+    bars2 = ax2.bar(models, f1_scores, color=['skyblue', 'lightgreen', 'lightcoral', 'gold'])
+    ax2.set_title('Model F1-Score Comparison')
+    ax2.set_ylabel('F1-Score')
+    ax2.set_ylim(0, 1)
+    for bar, f1 in zip(bars2, f1_scores):
+        ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
+                f'{f1:.3f}', ha='center', va='bottom')
+    
+    plt.tight_layout()
+    
+    # Save the plot
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, 'model_comparison.png')
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close(fig)
+    return path
+
 
 class ModelEvaluator:
     """
     Comprehensive model evaluation for the ensemble and individual models
     """
     
-    def __init__(self, models_dir="models"):
+    def __init__(self, models_dir=config.MODELS_DIR, jobs=config.JOBS, headless=False, weights=SERVING_WEIGHTS):
         self.models_dir = models_dir
+        self.jobs = max(1, jobs)
+        self.headless = headless
+        # Score the ensemble insight_engine serves (and cross_validate reports), not the
+        # weights stored in ensemble_model.pkl at training time
+        self.weights = np.asarray(weights, dtype=np.float64)
         self.ensemble = None
         self.lr_model = None
         self.rf_model = None
@@ -33,19 +165,21 @@ class ModelEvaluator:
         self.scaler = None
         self.feature_names = None
         self.label_encoder = None
+        self._engine = None
+        self._engine_inputs = (None, None)
         
     def load_models(self):
         """Load all trained models and artifacts"""
         try:
             print("📁 Loading trained models...")
             
-            self.ensemble = pickle.load(open(os.path.join(self.models_dir, "ensemble_model.pkl"), 'rb'))
-            self.lr_model = pickle.load(open(os.path.join(self.models_dir, "logistic_regression.pkl"), 'rb'))
-            self.rf_model = pickle.load(open(os.path.join(self.models_dir, "random_forest.pkl"), 'rb'))
-            self.nb_model = pickle.load(open(os.path.join(self.models_dir, "naive_bayes.pkl"), 'rb'))
-            self.scaler = pickle.load(open(os.path.join(self.models_dir, "scaler.pkl"), 'rb'))
-            self.feature_names = pickle.load(open(os.path.join(self.models_dir, "feature_names.pkl"), 'rb'))
-            self.label_encoder = pickle.load(open(os.path.join(self.models_dir, "label_encoder.pkl"), 'rb'))
+            self.ensemble = load_artifact(os.path.join(self.models_dir, "ensemble_model.pkl"))
+            self.lr_model = load_artifact(os.path.join(self.models_dir, "logistic_regression.pkl"))
+            self.rf_model = load_artifact(os.path.join(self.models_dir, "random_forest.pkl"))
+            self.nb_model = load_artifact(os.path.join(self.models_dir, "naive_bayes.pkl"))
+            self.scaler = load_artifact(os.path.join(self.models_dir, "scaler.pkl"))
+            self.feature_names = load_artifact(os.path.join(self.models_dir, "feature_names.pkl"))
+            self.label_encoder = load_artifact(os.path.join(self.models_dir, "label_encoder.pkl"))
             
             print("✅ All models loaded successfully!")
             return True
@@ -56,23 +190,24 @@ class ModelEvaluator:
     
     def load_test_data(self):
         """Load or create test data for evaluation"""
-        data_path = "data/datasets/ojt_grading_data.csv"
+        data_path = config.DATASET_PATH
         
         if not os.path.exists(data_path):
             print("❌ No test data found. Please run training first or provide test data.")
             return None, None, None
         
         print("📊 Loading test data...")
-        df = pd.read_csv(data_path)
         
-        # Use the same feature detection as training
-        from scripts.train_model import detect_feature_columns, detect_target_column
+        # Use the same (cached) feature detection as training
+        from scripts.train_model import detect_training_schema
+        from data.processing.dataset_cache import load_dataset
         
-        feature_columns = detect_feature_columns(df)
-        target_column = detect_target_column(df)
+        df, schema = load_dataset(data_path, detect_schema=detect_training_schema, schema_key="train_model")
+        feature_columns = schema['features']
+        target_column = schema['target']
         
         X = df[feature_columns].values
-        y = df[target_column].values
+        y = df[target_column].to_numpy()
         
         print(f"🔍 Features: {feature_columns}")
         print(f"🎯 Target: {target_column}")
@@ -80,59 +215,43 @@ class ModelEvaluator:
         
         return X, y, feature_columns
     
-    def evaluate_individual_models(self, X_test, y_test):
-        """Evaluate each individual model"""
-        print("\n" + "="*60)
-        print("📊 INDIVIDUAL MODEL EVALUATION")
-        print("="*60)
-        
-        X_test_scaled = self.scaler.transform(X_test)
-        y_test_encoded = self.label_encoder.transform(y_test)
-        
-        models = {
-            "Logistic Regression": self.lr_model,
-            "Random Forest": self.rf_model,
-            "Naive Bayes": self.nb_model
-        }
-        
-        results = {}
-        
-        for name, model in models.items():
+    
+    def _run_tasks(self, tasks):
+        """
+        Run (function, args) tasks, in a process pool when jobs > 1.
+        
+        Returns:
+            list: Task results in submission order
+        """
+        if self.jobs == 1 or len(tasks) <= 1:
+            return [function(*args) for function, args in tasks]
+        
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(tasks))) as executor:
+            futures = [executor.submit(function, *args) for function, args in tasks]
+            return [future.result() for future in futures]
+    
+    def get_engine(self, X_test, y_test):
+        """
+        Return the single-pass EvaluationEngine for this test set, building it
+        (one scaling pass, one predict_proba per model) only on first use.
+        """
+        if self._engine is None or self._engine_inputs[0] is not X_test or self._engine_inputs[1] is not y_test:
+            self._engine = EvaluationEngine(self.lr_model, self.rf_model, self.nb_model,
+                                            self.scaler, self.label_encoder, X_test, y_test)
+            self._engine_inputs = (X_test, y_test)
+        return self._engine
+    
+    def _print_individual_results(self, results):
+        for name, result in results.items():
             print(f"\n🔍 Evaluating {name}...")
-            
-            if name == "Logistic Regression" or name == "Naive Bayes":
-                predictions = model.predict(X_test_scaled)
-                probabilities = model.predict_proba(X_test_scaled)
-            else:
-                predictions = model.predict(X_test)
-                probabilities = model.predict_proba(X_test)
-            
-            # Convert predictions back to original labels
-            predictions_decoded = self.label_encoder.inverse_transform(predictions)
-            
-            # Calculate metrics
-            accuracy = accuracy_score(y_test, predictions_decoded)
-            precision = precision_score(y_test, predictions_decoded, average='weighted', zero_division=0)
-            recall = recall_score(y_test, predictions_decoded, average='weighted', zero_division=0)
-            f1 = f1_score(y_test, predictions_decoded, average='weighted', zero_division=0)
-            
-            results[name] = {
-                'accuracy': accuracy,
-                'precision': precision,
-                'recall': recall,
-                'f1_score': f1,
-                'predictions': predictions_decoded,
-                'probabilities': probabilities
-            }
-            
-            print(f"   ✅ Accuracy: {accuracy:.4f}")
-            print(f"   ✅ Precision: {precision:.4f}")
-            print(f"   ✅ Recall: {recall:.4f}")
-            print(f"   ✅ F1-Score: {f1:.4f}")
+            print(f"   ✅ Accuracy: {result['accuracy']:.4f}")
+            print(f"   ✅ Precision: {result['precision']:.4f}")
+            print(f"   ✅ Recall: {result['recall']:.4f}")
+            print(f"   ✅ F1-Score: {result['f1_score']:.4f}")
             
             # Detailed classification report
             print(f"\n   📋 Classification Report:")
-            report = classification_report(y_test, predictions_decoded, output_dict=True)
+            report = result['classification_report']
             for class_name in self.label_encoder.classes_:
                 if class_name in report:
                     class_report = report[class_name]
@@ -140,6 +259,25 @@ class ModelEvaluator:
                           f"Precision={class_report['precision']:.3f}, "
                           f"Recall={class_report['recall']:.3f}, "
                           f"F1={class_report['f1-score']:.3f}")
+    
+    def _print_ensemble_results(self, result, y_test):
+        print(f"✅ Ensemble Accuracy: {result['accuracy']:.4f}")
+        print(f"✅ Ensemble Precision: {result['precision']:.4f}")
+        print(f"✅ Ensemble Recall: {result['recall']:.4f}")
+        print(f"✅ Ensemble F1-Score: {result['f1_score']:.4f}")
+        
+        # Detailed classification report
+        print(f"\n📋 Detailed Classification Report:")
+        print(classification_report(y_test, result['predictions'], target_names=self.label_encoder.classes_))
+    
+    def evaluate_individual_models(self, X_test, y_test):
+        """Evaluate each individual model"""
+        print("\n" + "="*60)
+        print("📊 INDIVIDUAL MODEL EVALUATION")
+        print("="*60)
+        
+        results = self.get_engine(X_test, y_test).individual_metrics()
+        self._print_individual_results(results)
         
         return results
     
@@ -149,111 +287,115 @@ class ModelEvaluator:
         print("🔥 ENSEMBLE MODEL EVALUATION")
         print("="*60)
         
-        ensemble_predictions = self.ensemble.predict(X_test)
-        ensemble_probabilities = self.ensemble.predict_proba(X_test)
+        results = self.get_engine(X_test, y_test).ensemble_metrics(self.weights)
+        self._print_ensemble_results(results, y_test)
         
-        # Calculate metrics
-        accuracy = accuracy_score(y_test, ensemble_predictions)
-        precision = precision_score(y_test, ensemble_predictions, average='weighted', zero_division=0)
-        recall = recall_score(y_test, ensemble_predictions, average='weighted', zero_division=0)
-        f1 = f1_score(y_test, ensemble_predictions, average='weighted', zero_division=0)
+        return results
+    
+    def evaluate_all_models(self, X_test, y_test):
+        """
+        Evaluate the individual models and the ensemble from a single
+        inference pass over the test set.
+        
+        Returns:
+            tuple: (individual_results, ensemble_results)
+        """
+        engine = self.get_engine(X_test, y_test)
+        individual_results = engine.individual_metrics()
+        ensemble_results = engine.ensemble_metrics(self.weights)
         
-        print(f"✅ Ensemble Accuracy: {accuracy:.4f}")
-        print(f"✅ Ensemble Precision: {precision:.4f}")
-        print(f"✅ Ensemble Recall: {recall:.4f}")
-        print(f"✅ Ensemble F1-Score: {f1:.4f}")
+        print("\n" + "="*60)
+        print("📊 INDIVIDUAL MODEL EVALUATION")
+        print("="*60)
+        self._print_individual_results(individual_results)
         
-        # Detailed classification report
-        print(f"\n📋 Detailed Classification Report:")
-        print(classification_report(y_test, ensemble_predictions, target_names=self.label_encoder.classes_))
-        
-        results = {
-            'accuracy': accuracy,
-            'precision': precision,
-            'recall': recall,
-            'f1_score': f1,
-            'predictions': ensemble_predictions,
-            'probabilities': ensemble_probabilities
-        }
+        print("\n" + "="*60)
+        print("🔥 ENSEMBLE MODEL EVALUATION")
+        print("="*60)
+        self._print_ensemble_results(ensemble_results, y_test)
         
-        return results
+        return individual_results, ensemble_results
+    
+    def feature_importance(self):
+        """Random Forest feature importance, or None if the model has none"""
+        if not hasattr(self.rf_model, 'feature_importances_'):
+            return None
+        return pd.DataFrame({
+            'feature': self.feature_names,
+            'importance': self.rf_model.feature_importances_
+        }).sort_values('importance', ascending=True)
+    
+    def permutation_importance(self, X_test, y_test, n_repeats=10):
+        """
+        Permutation importance (accuracy drop) for each base model and the
+        weighted ensemble, with repeats split across `jobs` worker processes.
+        """
+        return permutation_importance(
+            self.lr_model, self.rf_model, self.nb_model, self.scaler, self.label_encoder,
+            self.weights, X_test, y_test, self.feature_names,
+            n_repeats=n_repeats, jobs=self.jobs
+        )
     
     def plot_confusion_matrix(self, y_true, y_pred, model_name="Model"):
         """Plot confusion matrix"""
-        plt.figure(figsize=(8, 6))
-        cm = confusion_matrix(y_true, y_pred, labels=self.label_encoder.classes_)
-        
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-                   xticklabels=self.label_encoder.classes_,
-                   yticklabels=self.label_encoder.classes_)
-        
-        plt.title(f'Confusion Matrix - {model_name}')
-        plt.xlabel('Predicted')
-        plt.ylabel('Actual')
-        plt.tight_layout()
-        
-        # Save the plot
-        os.makedirs('evaluation_plots', exist_ok=True)
-        plt.savefig(f'evaluation_plots/confusion_matrix_{model_name.lower().replace(" ", "_")}.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        render_confusion_matrix(y_true, y_pred, self.label_encoder.classes_, model_name, show=not self.headless)
     
     def plot_feature_importance(self):
         """Plot feature importance from Random Forest"""
-        if hasattr(self.rf_model, 'feature_importances_'):
-            plt.figure(figsize=(10, 6))
-            
-            importance_df = pd.DataFrame({
-                'feature': self.feature_names,
-                'importance': self.rf_model.feature_importances_
-            }).sort_values('importance', ascending=True)
-            
-            plt.barh(importance_df['feature'], importance_df['importance'])
-            plt.title('Random Forest Feature Importance')
-            plt.xlabel('Importance Score')
-            plt.tight_layout()
-            
-            # Save the plot
-            os.makedirs('evaluation_plots', exist_ok=True)
-            plt.savefig('evaluation_plots/feature_importance.png', dpi=300, bbox_inches='tight')
-            plt.show()
-            
-            return importance_df
-        return None
+        importance_df = self.feature_importance()
+        if importance_df is not None:
+            render_feature_importance(importance_df, show=not self.headless)
+        return importance_df
     
     def plot_model_comparison(self, individual_results, ensemble_results):
         """Plot comparison of all models"""
         models = list(individual_results.keys()) + ['Ensemble']
         accuracies = [individual_results[model]['accuracy'] for model in individual_results.keys()] + [ensemble_results['accuracy']]
         f1_scores = [individual_results[model]['f1_score'] for model in individual_results.keys()] + [ensemble_results['f1_score']]
+        render_model_comparison(models, accuracies, f1_scores, show=not self.headless)
+    
+    def render_all_plots(self, y_test, individual_results, ensemble_results, importance_df):
+        """
+        Render every evaluation plot. With jobs > 1 each plot is rendered in its
+        own worker process (saved to disk, not shown).
+        
+        Returns:
+            list: Paths of the saved plots
+        """
+        show = self.jobs == 1 and not self.headless
+        if not show:
+            # Import the plotting stack once here so forked workers inherit it
+            load_plotting(headless=True)
+        classes = list(self.label_encoder.classes_)
+        
+        tasks = []
+        for model_name, results in list(individual_results.items()) + [("Ensemble", ensemble_results)]:
+            tasks.append((render_confusion_matrix, (y_test, results['predictions'], classes, model_name, config.PLOTS_DIR, show)))
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Accuracy comparison
-        bars1 = ax1.bar(models, accuracies, color=['skyblue', 'lightgreen', 'lightcoral', 'gold'])
-        ax1.set_title('Model Accuracy Comparison')
-        ax1.set_ylabel('Accuracy')
-        ax1.set_ylim(0, 1)
-        for bar, accuracy in zip(bars1, accuracies):
-            ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
-                    f'{accuracy:.3f}', ha='center', va='bottom')
-        
-        # F1-Score comparison
-        bars2 = ax2.bar(models, f1_scores, color=['skyblue', 'lightgreen', 'lightcoral', 'gold'])
-        ax2.set_title('Model F1-Score Comparison')
-        ax2.set_ylabel('F1-Score')
-        ax2.set_ylim(0, 1)
-        for bar, f1 in zip(bars2, f1_scores):
-            ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
-                    f'{f1:.3f}', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        
-        # Save the plot
-        os.makedirs('evaluation_plots', exist_ok=True)
-        plt.savefig('evaluation_plots/model_comparison.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        if importance_df is not None:
+            tasks.append((render_feature_importance, (importance_df, config.PLOTS_DIR, show)))
+        
+        models = list(individual_results.keys()) + ['Ensemble']
+        accuracies = [results['accuracy'] for results in individual_results.values()] + [ensemble_results['accuracy']]
+        f1_scores = [results['f1_score'] for results in individual_results.values()] + [ensemble_results['f1_score']]
+        tasks.append((render_model_comparison, (models, accuracies, f1_scores, config.PLOTS_DIR, show)))
+        
+        return self._run_tasks(tasks)
+    
+    def bootstrap_intervals(self, X_test, y_test, individual_results, ensemble_results,
+                            n_resamples=1000, confidence=0.95):
+        """
+        Bootstrap confidence intervals for every model, metric and class, plus
+        paired ensemble-vs-model differences, from the cached predictions.
+        """
+        results = dict(individual_results)
+        results['Ensemble'] = ensemble_results
+        return self.get_engine(X_test, y_test).bootstrap(
+            results, n_resamples=n_resamples, confidence=confidence,
+            jobs=self.jobs, reference='Ensemble'
+        )
     
-    def generate_performance_report(self, individual_results, ensemble_results):
+    def generate_performance_report(self, individual_results, ensemble_results, intervals=None):
         """Generate a comprehensive performance report"""
         print("\n" + "="*60)
         print("📈 COMPREHENSIVE PERFORMANCE REPORT")
@@ -289,6 +431,18 @@ class ModelEvaluator:
         print(f"\n🚀 Ensemble Improvement over Best Individual Model: {improvement:.4f} "
               f"({improvement/best_individual_accuracy*100:.2f}%)")
         
+        if intervals:
+            print("\n📏 Bootstrap Confidence Intervals (accuracy / F1):")
+            for model_name in list(individual_results.keys()) + ['Ensemble']:
+                accuracy_ci = intervals[model_name]['accuracy']
+                f1_ci = intervals[model_name]['f1_score']
+                print(f"   {model_name}: {accuracy_ci['lower']:.4f}-{accuracy_ci['upper']:.4f} / "
+                      f"{f1_ci['lower']:.4f}-{f1_ci['upper']:.4f}")
+            for model_name, difference in intervals['differences']['models'].items():
+                accuracy_diff = difference['accuracy']
+                print(f"   Ensemble vs {model_name}: {accuracy_diff['estimate']:+.4f} "
+                      f"[{accuracy_diff['lower']:+.4f}, {accuracy_diff['upper']:+.4f}]")
+        
         # Save report to file
         report_content = f"""
 OJT PREDICTION MODEL EVALUATION REPORT
@@ -315,22 +469,95 @@ INDIVIDUAL MODEL PERFORMANCE:
 IMPROVEMENT:
 - Ensemble vs Best Individual: {improvement:.4f} ({improvement/best_individual_accuracy*100:.2f}%)
 
+{self._format_intervals(intervals)}
 FEATURES USED: {', '.join(self.feature_names)}
 TARGET CLASSES: {', '.join(self.label_encoder.classes_)}
 """
         
-        os.makedirs('evaluation_reports', exist_ok=True)
-        with open('evaluation_reports/performance_report.txt', 'w') as f:
+        os.makedirs(config.REPORTS_DIR, exist_ok=True)
+        report_path = os.path.join(config.REPORTS_DIR, 'performance_report.txt')
+        with open(report_path, 'w') as f:
             f.write(report_content)
         
-        print(f"\n💾 Performance report saved to: evaluation_reports/performance_report.txt")
+        print(f"\n💾 Performance report saved to: {report_path}")
         
         return comparison_df
     
-    def run_complete_evaluation(self, test_size=0.3):
+    def _format_intervals(self, intervals):
+        """Confidence interval section of the text report ('' without intervals)"""
+        if not intervals:
+            return ""
+        
+        lines = ["BOOTSTRAP CONFIDENCE INTERVALS:"]
+        for model_name, model_intervals in intervals.items():
+            if model_name == 'differences':
+                continue
+            lines.append(f"\n{model_name}:")
+            for metric in ('accuracy', 'precision', 'recall', 'f1_score'):
+                ci = model_intervals[metric]
+                lines.append(f"- {metric}: {ci['estimate']:.4f} [{ci['lower']:.4f}, {ci['upper']:.4f}]")
+            for class_name, class_intervals in model_intervals['per_class'].items():
+                ci = class_intervals['f1-score']
+                lines.append(f"  - {class_name} F1: {ci['estimate']:.4f} [{ci['lower']:.4f}, {ci['upper']:.4f}]")
+        
+        lines.append("\nENSEMBLE VS INDIVIDUAL MODELS (accuracy difference):")
+        for model_name, difference in intervals['differences']['models'].items():
+            ci = difference['accuracy']
+            lines.append(f"- vs {model_name}: {ci['estimate']:+.4f} [{ci['lower']:+.4f}, {ci['upper']:+.4f}], "
+                         f"P(not better)={difference['p_not_better']:.3f}")
+        return "\n".join(lines) + "\n"
+    
+    def write_json_report(self, path, individual_results, ensemble_results, importance_df=None, extra=None,
+                          intervals=None):
+        """
+        Save a machine-readable evaluation report (metrics only, no predictions).
+        
+        Args:
+            path (str): Output JSON path
+            individual_results (dict): Results from the individual models
+            ensemble_results (dict): Results from the ensemble
+            importance_df (pd.DataFrame): Optional Random Forest feature importance
+            extra (dict): Optional additional top-level fields (e.g. timings)
+            intervals (dict): Optional bootstrap confidence intervals
+        """
+        def model_entry(results):
+            return {
+                'accuracy': float(results['accuracy']),
+                'precision': float(results['precision']),
+                'recall': float(results['recall']),
+                'f1_score': float(results['f1_score']),
+                'classification_report': results['classification_report'],
+                'confusion_matrix': np.asarray(results['confusion_matrix']).tolist(),
+                'seconds': round(results['seconds'], 4)
+            }
+        
+        best_individual_accuracy = max(results['accuracy'] for results in individual_results.values())
+        report = {
+            'features': list(self.feature_names),
+            'classes': [str(c) for c in self.label_encoder.classes_],
+            'models': {name: model_entry(results) for name, results in individual_results.items()},
+            'ensemble': model_entry(ensemble_results),
+            'ensemble_improvement': float(ensemble_results['accuracy'] - best_individual_accuracy),
+            'feature_importance': (
+                {row['feature']: float(row['importance']) for _, row in importance_df.iterrows()}
+                if importance_df is not None else None
+            ),
+            'confidence_intervals': intervals
+        }
+        report.update(extra or {})
+        
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=float)
+        
+        print(f"💾 JSON report saved to: {path}")
+        return report
+    
+    def run_complete_evaluation(self, test_size=0.3, json_report=None, bootstrap=1000, permutation_repeats=10):
         """Run complete evaluation pipeline"""
         print("🚀 STARTING COMPREHENSIVE MODEL EVALUATION")
         print("="*60)
+        started = time.perf_counter()
         
         # Load models
         if not self.load_models():
@@ -351,49 +578,80 @@ TARGET CLASSES: {', '.join(self.label_encoder.classes_)}
         print(f"   Training samples: {X_train.shape[0]}")
         print(f"   Testing samples: {X_test.shape[0]}")
         
-        # Evaluate individual models
-        individual_results = self.evaluate_individual_models(X_test, y_test)
-        
-        # Evaluate ensemble model
-        ensemble_results = self.evaluate_ensemble(X_test, y_test)
-        
-        # Generate plots
-        print("\n📊 Generating evaluation plots...")
-        
-        # Confusion matrices
-        for model_name, results in individual_results.items():
-            self.plot_confusion_matrix(y_test, results['predictions'], model_name)
-        
-        self.plot_confusion_matrix(y_test, ensemble_results['predictions'], "Ensemble")
+        # Evaluate individual models and the ensemble
+        metrics_started = time.perf_counter()
+        individual_results, ensemble_results = self.evaluate_all_models(X_test, y_test)
+        metrics_seconds = time.perf_counter() - metrics_started
         
-        # Feature importance
-        importance_df = self.plot_feature_importance()
+        importance_df = self.feature_importance()
         if importance_df is not None:
             print("\n🔍 Feature Importance Ranking:")
             for _, row in importance_df.sort_values('importance', ascending=False).iterrows():
                 print(f"   {row['feature']}: {row['importance']:.4f}")
         
-        # Model comparison
-        self.plot_model_comparison(individual_results, ensemble_results)
+        # Permutation importance covers LR, NB and the ensemble, not just the forest
+        permutation_results = None
+        if permutation_repeats:
+            permutation_results = self.permutation_importance(X_test, y_test, n_repeats=permutation_repeats)
+            print("\n🔀 Ensemble Permutation Importance (accuracy drop):")
+            for feature, drop in permutation_results['Ensemble'].items():
+                print(f"   {feature}: {drop['mean']:.4f} ± {drop['std']:.4f}")
+        
+        # Generate plots (skipped entirely in headless mode)
+        plots_seconds = 0.0
+        if not self.headless:
+            print("\n📊 Generating evaluation plots...")
+            plots_started = time.perf_counter()
+            self.render_all_plots(y_test, individual_results, ensemble_results, importance_df)
+            plots_seconds = time.perf_counter() - plots_started
+        
+        # Confidence intervals from resampling the cached predictions
+        intervals = None
+        bootstrap_seconds = 0.0
+        if bootstrap:
+            print(f"\n📏 Bootstrapping {bootstrap} resamples...")
+            bootstrap_started = time.perf_counter()
+            intervals = self.bootstrap_intervals(X_test, y_test, individual_results, ensemble_results,
+                                                 n_resamples=bootstrap)
+            bootstrap_seconds = time.perf_counter() - bootstrap_started
         
         # Generate comprehensive report
-        comparison_df = self.generate_performance_report(individual_results, ensemble_results)
+        comparison_df = self.generate_performance_report(individual_results, ensemble_results, intervals)
+        
+        if json_report:
+            self.write_json_report(json_report, individual_results, ensemble_results, importance_df, extra={
+                'test_size': test_size,
+                'test_samples': int(X_test.shape[0]),
+                'bootstrap_resamples': bootstrap,
+                'permutation_importance': permutation_results,
+                'jobs': self.jobs,
+                'headless': self.headless,
+                'timings': {
+                    'metrics_seconds': round(metrics_seconds, 4),
+                    'plots_seconds': round(plots_seconds, 4),
+                    'bootstrap_seconds': round(bootstrap_seconds, 4),
+                    'total_seconds': round(time.perf_counter() - started, 4)
+                }
+            }, intervals=intervals)
         
         print("\n✅ EVALUATION COMPLETED SUCCESSFULLY!")
         print("📁 Evaluation results saved in:")
-        print("   - evaluation_plots/ (visualizations)")
-        print("   - evaluation_reports/ (performance reports)")
+        if not self.headless:
+            print(f"   - {config.PLOTS_DIR} (visualizations)")
+        print(f"   - {config.REPORTS_DIR} (performance reports)")
         
         return {
             'individual_results': individual_results,
             'ensemble_results': ensemble_results,
             'comparison_df': comparison_df,
-            'feature_importance': importance_df
+            'feature_importance': importance_df,
+            'confidence_intervals': intervals,
+            'permutation_importance': permutation_results
         }
 
 def quick_evaluation():
     """Quick evaluation without plots for fast checking"""
-    evaluator = ModelEvaluator()
+    evaluator = ModelEvaluator(headless=True)
     
     if not evaluator.load_models():
         return
@@ -409,11 +667,8 @@ def quick_evaluation():
     print("🚀 QUICK EVALUATION")
     print("="*50)
     
-    # Individual models
-    individual_results = evaluator.evaluate_individual_models(X_test, y_test)
-    
-    # Ensemble
-    ensemble_results = evaluator.evaluate_ensemble(X_test, y_test)
+    # Individual models and ensemble
+    individual_results, ensemble_results = evaluator.evaluate_all_models(X_test, y_test)
     
     # Quick comparison
     print("\n📈 QUICK COMPARISON:")
@@ -421,17 +676,38 @@ def quick_evaluation():
         print(f"   {model_name}: {results['accuracy']:.4f}")
     print(f"   ENSEMBLE: {ensemble_results['accuracy']:.4f}")
 
-if __name__ == "__main__":
+def main(argv=None):
     import argparse
     
     parser = argparse.ArgumentParser(description='Evaluate OJT Prediction Models')
     parser.add_argument('--quick', action='store_true', help='Run quick evaluation without plots')
     parser.add_argument('--test-size', type=float, default=0.3, help='Test set size ratio (default: 0.3)')
+    parser.add_argument('--headless', action='store_true',
+                        help='Metrics only: skip plots and never import matplotlib/seaborn')
+    parser.add_argument('--jobs', type=int, default=config.JOBS,
+                        help='Worker processes for plot rendering and bootstrap chunks (default: OJT_JOBS, else 1, serial)')
+    parser.add_argument('--bootstrap', type=int, default=1000,
+                        help='Bootstrap resamples for confidence intervals (default: 1000, 0 disables)')
+    parser.add_argument('--permutation-repeats', type=int, default=10,
+                        help='Shuffles per feature for permutation importance (default: 10, 0 disables)')
+    parser.add_argument('--json-report', default=None,
+                        help='Write a machine-readable JSON report to this path '
+                             f'(headless default: {config.REPORTS_DIR}/evaluation_report.json)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if args.quick:
         quick_evaluation()
     else:
-        evaluator = ModelEvaluator()
-        results = evaluator.run_complete_evaluation(test_size=args.test_size)
\ No newline at end of file
+        json_report = args.json_report
+        if json_report is None and args.headless:
+            json_report = os.path.join(config.REPORTS_DIR, 'evaluation_report.json')
+        
+        evaluator = ModelEvaluator(jobs=args.jobs, headless=args.headless)
+        results = evaluator.run_complete_evaluation(test_size=args.test_size, json_report=json_report,
+                                                   bootstrap=args.bootstrap,
+                                                   permutation_repeats=args.permutation_repeats)
+
+
+if __name__ == "__main__":
+    main()
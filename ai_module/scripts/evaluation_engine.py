@@ -0,0 +1,422 @@
+# scripts/evaluation_engine.py
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Model names in ensemble weight order (LR, RF, NB)
+MODEL_NAMES = ["Logistic Regression", "Random Forest", "Naive Bayes"]
+
+
+# =========================================================
+# Metric Helpers (work on one or a stack of confusion matrices)
+# =========================================================
+def scores_from_confusion(cm):
+    """
+    Per-class and weighted scores from confusion matrices of shape (..., k, k).
+
+    Leading dimensions (e.g. bootstrap resamples) are broadcast, so thousands of
+    resamples are scored with a handful of array operations. Division by zero
+    yields 0, like sklearn's zero_division=0.
+
+    Returns:
+        dict: 'precision' / 'recall' / 'f1' / 'support' of shape (..., k) and
+        'accuracy' / 'weighted_precision' / 'weighted_recall' / 'weighted_f1' of shape (...)
+    """
+    cm = np.asarray(cm, dtype=np.float64)
+    true_positives = np.diagonal(cm, axis1=-2, axis2=-1)
+    support = cm.sum(axis=-1)
+    predicted = cm.sum(axis=-2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+        recall = np.where(support > 0, true_positives / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    total = support.sum(axis=-1)
+    weights = support / total[..., None]
+    return {
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'support': support,
+        'accuracy': true_positives.sum(axis=-1) / total,
+        'weighted_precision': (weights * precision).sum(axis=-1),
+        'weighted_recall': (weights * recall).sum(axis=-1),
+        'weighted_f1': (weights * f1).sum(axis=-1),
+    }
+
+
+def bootstrap_confusion(y_encoded, predicted_indices, n_classes, n_resamples, seed, batch_size=256):
+    """
+    Confusion matrices for bootstrap resamples of the test set.
+
+    Each batch draws a (batch, n_samples) index matrix and turns every
+    resample of every model into one offset np.bincount, so no Python loop
+    runs per resample. Module-level so chunks can run in worker processes.
+
+    Args:
+        y_encoded (np.ndarray): Encoded true labels, shape (n_samples,)
+        predicted_indices (np.ndarray): Predicted class indices, shape (n_models, n_samples)
+        n_classes (int): Number of classes
+        n_resamples (int): Resamples to draw in this chunk
+        seed: Seed or SeedSequence for this chunk
+        batch_size (int): Resamples per vectorized batch (bounds memory)
+
+    Returns:
+        np.ndarray: Counts of shape (n_models, n_resamples, n_classes, n_classes)
+    """
+    rng = np.random.default_rng(seed)
+    n_models, n_samples = predicted_indices.shape
+    cells = n_classes * n_classes
+
+    # Confusion cell of every (model, sample) pair
+    codes = (y_encoded[None, :] * n_classes + predicted_indices).astype(np.int64)
+
+    counts = np.empty((n_models, n_resamples, cells), dtype=np.int64)
+    for start in range(0, n_resamples, batch_size):
+        batch = min(batch_size, n_resamples - start)
+        indices = rng.integers(0, n_samples, size=(batch, n_samples))
+        # (n_models, batch, n_samples) cells, offset so each (model, resample) gets its own bins
+        resampled = codes[:, indices]
+        offsets = np.arange(n_models * batch, dtype=np.int64).reshape(n_models, batch, 1) * cells
+        binned = np.bincount((resampled + offsets).ravel(), minlength=n_models * batch * cells)
+        counts[:, start:start + batch] = binned.reshape(n_models, batch, cells)
+
+    return counts.reshape(n_models, n_resamples, n_classes, n_classes)
+
+
+def _interval(samples, estimate, confidence):
+    """Percentile interval summary for one metric's bootstrap samples"""
+    alpha = (1.0 - confidence) / 2.0
+    lower, upper = np.quantile(samples, [alpha, 1.0 - alpha])
+    return {
+        'estimate': float(estimate),
+        'lower': float(lower),
+        'upper': float(upper),
+        'std': float(np.std(samples, ddof=1)) if len(samples) > 1 else 0.0
+    }
+
+
+class EvaluationEngine:
+    """
+    Single-pass evaluation of the three base models and any weighted ensemble.
+
+    The scaled test matrix and each model's probability matrix are computed
+    once in the constructor. Individual, ensemble, per-class and reweighted
+    ensemble metrics are then derived from those cached arrays (predictions
+    are the argmax of the probabilities, metrics come from one confusion
+    matrix), so no model is ever run twice.
+    """
+
+    def __init__(self, lr_model, rf_model, nb_model, scaler, label_encoder, X_test, y_test):
+        """
+        Args:
+            lr_model, rf_model, nb_model: Fitted base models
+            scaler: Fitted StandardScaler used by LR and NB
+            label_encoder: Fitted LabelEncoder
+            X_test (np.ndarray): Unscaled test features
+            y_test (np.ndarray): True (string) labels
+        """
+        self.label_encoder = label_encoder
+        self.classes = np.asarray(label_encoder.classes_)
+        self.y_test = np.asarray(y_test)
+        self.y_encoded = label_encoder.transform(self.y_test)
+
+        # One inference pass: scale once, one predict_proba per model
+        self.seconds = {}
+        start = time.perf_counter()
+        self.X_scaled = scaler.transform(X_test)
+        self.seconds["scaling"] = time.perf_counter() - start
+
+        self.probabilities = {}
+        for name, model, X in ((MODEL_NAMES[0], lr_model, self.X_scaled),
+                               (MODEL_NAMES[1], rf_model, X_test),
+                               (MODEL_NAMES[2], nb_model, self.X_scaled)):
+            start = time.perf_counter()
+            self.probabilities[name] = model.predict_proba(X)
+            self.seconds[name] = time.perf_counter() - start
+
+        # Stacked (n_models, n_samples, n_classes) for reweighting in one product
+        self._stacked = np.stack([self.probabilities[name] for name in MODEL_NAMES])
+
+    @classmethod
+    def from_ensemble(cls, ensemble, X_test, y_test):
+        """Build an engine from a fitted train_model.EnsembleModel"""
+        return cls(ensemble.lr_model, ensemble.rf_model, ensemble.nb_model,
+                   ensemble.scaler, ensemble.label_encoder, X_test, y_test)
+
+    # -----------------------------------------------------
+    # Probabilities
+    # -----------------------------------------------------
+    def ensemble_proba(self, weights):
+        """Weighted average of the cached probabilities (weights in LR, RF, NB order)"""
+        return np.tensordot(np.asarray(weights, dtype=np.float64), self._stacked, axes=1)
+
+    # -----------------------------------------------------
+    # Metrics
+    # -----------------------------------------------------
+    def confusion_matrix(self, predicted_indices):
+        """Confusion matrix (rows: actual, columns: predicted) in label encoder order"""
+        n_classes = len(self.classes)
+        counts = np.bincount(self.y_encoded * n_classes + predicted_indices, minlength=n_classes * n_classes)
+        return counts.reshape(n_classes, n_classes)
+
+    def metrics_from_proba(self, probabilities, name="Model"):
+        """
+        Derive every metric from one probability matrix.
+
+        Matches sklearn's accuracy / weighted precision, recall and F1 and
+        classification_report(output_dict=True) with zero_division=0.
+
+        Returns:
+            dict: Metrics, per-class report, confusion matrix, predictions and probabilities
+        """
+        predicted_indices = np.argmax(probabilities, axis=1)
+        cm = self.confusion_matrix(predicted_indices)
+        scores = scores_from_confusion(cm)
+        precision, recall, f1, support = scores['precision'], scores['recall'], scores['f1'], scores['support']
+        accuracy = scores['accuracy']
+        total = support.sum()
+
+        report = {}
+        for i, class_name in enumerate(self.classes):
+            report[str(class_name)] = {
+                'precision': float(precision[i]),
+                'recall': float(recall[i]),
+                'f1-score': float(f1[i]),
+                'support': float(support[i])
+            }
+        report['accuracy'] = float(accuracy)
+        report['macro avg'] = {
+            'precision': float(precision.mean()),
+            'recall': float(recall.mean()),
+            'f1-score': float(f1.mean()),
+            'support': float(total)
+        }
+        report['weighted avg'] = {
+            'precision': float(scores['weighted_precision']),
+            'recall': float(scores['weighted_recall']),
+            'f1-score': float(scores['weighted_f1']),
+            'support': float(total)
+        }
+
+        return {
+            'name': name,
+            'accuracy': float(accuracy),
+            'precision': report['weighted avg']['precision'],
+            'recall': report['weighted avg']['recall'],
+            'f1_score': report['weighted avg']['f1-score'],
+            'classification_report': report,
+            'confusion_matrix': cm,
+            'predictions': self.classes[predicted_indices],
+            'probabilities': probabilities,
+            'seconds': self.seconds.get(name, 0.0)
+        }
+
+    def model_metrics(self, name):
+        """Metrics for one base model ('Logistic Regression', 'Random Forest' or 'Naive Bayes')"""
+        return self.metrics_from_proba(self.probabilities[name], name)
+
+    def individual_metrics(self):
+        """Metrics for every base model, keyed by model name"""
+        return {name: self.model_metrics(name) for name in MODEL_NAMES}
+
+    def ensemble_metrics(self, weights, name="Ensemble"):
+        """Metrics for the ensemble under the given (LR, RF, NB) weights"""
+        result = self.metrics_from_proba(self.ensemble_proba(weights), name)
+        result['seconds'] = sum(self.seconds.values())
+        return result
+
+    def compare_weights(self, weight_sets):
+        """
+        Score several reweighted ensembles without any further inference.
+
+        Args:
+            weight_sets (dict): Name -> (LR, RF, NB) weights
+
+        Returns:
+            dict: Name -> ensemble metrics
+        """
+        return {name: self.ensemble_metrics(weights, name) for name, weights in weight_sets.items()}
+
+    # -----------------------------------------------------
+    # Bootstrap Confidence Intervals
+    # -----------------------------------------------------
+    def bootstrap(self, results, n_resamples=1000, confidence=0.95, seed=42, jobs=1, reference=None):
+        """
+        Bootstrap confidence intervals for every metric and every class.
+
+        Resamples the cached predictions (no re-inference, no retraining). All
+        models share the same resample indices, so paired differences against
+        `reference` show whether a gap between models is larger than split noise.
+        With jobs > 1 the resamples are split into chunks scored in worker processes.
+
+        Args:
+            results (dict): Name -> metrics dict (from model_metrics / ensemble_metrics)
+            n_resamples (int): Total bootstrap resamples
+            confidence (float): Interval coverage, e.g. 0.95
+            seed (int): Base seed; chunks use independent child seeds
+            jobs (int): Worker processes
+            reference (str): Optional model name to compare every other model against
+
+        Returns:
+            dict: Name -> {'accuracy', 'precision', 'recall', 'f1_score': interval,
+                           'per_class': {class: {'precision', 'recall', 'f1-score': interval}}}
+                  plus 'differences' (name -> accuracy / F1 difference vs reference) when
+                  reference is given
+        """
+        names = list(results)
+        predicted_indices = np.stack([np.searchsorted(self.classes, results[name]['predictions']) for name in names])
+        n_classes = len(self.classes)
+
+        # Independent, reproducible streams per chunk
+        jobs = max(1, min(jobs, n_resamples))
+        chunk_sizes = [len(chunk) for chunk in np.array_split(np.arange(n_resamples), jobs)]
+        seeds = np.random.SeedSequence(seed).spawn(jobs)
+        args = [(self.y_encoded, predicted_indices, n_classes, size, chunk_seed)
+                for size, chunk_seed in zip(chunk_sizes, seeds)]
+
+        if jobs == 1:
+            chunks = [bootstrap_confusion(*args[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                chunks = list(executor.map(bootstrap_confusion, *zip(*args)))
+        scores = scores_from_confusion(np.concatenate(chunks, axis=1))
+
+        intervals = {}
+        for m, name in enumerate(names):
+            result = results[name]
+            report = result['classification_report']
+            per_class = {}
+            for i, class_name in enumerate(self.classes):
+                class_report = report[str(class_name)]
+                per_class[str(class_name)] = {
+                    'precision': _interval(scores['precision'][m, :, i], class_report['precision'], confidence),
+                    'recall': _interval(scores['recall'][m, :, i], class_report['recall'], confidence),
+                    'f1-score': _interval(scores['f1'][m, :, i], class_report['f1-score'], confidence),
+                }
+            intervals[name] = {
+                'accuracy': _interval(scores['accuracy'][m], result['accuracy'], confidence),
+                'precision': _interval(scores['weighted_precision'][m], result['precision'], confidence),
+                'recall': _interval(scores['weighted_recall'][m], result['recall'], confidence),
+                'f1_score': _interval(scores['weighted_f1'][m], result['f1_score'], confidence),
+                'per_class': per_class,
+            }
+
+        if reference is not None:
+            r = names.index(reference)
+            differences = {}
+            for m, name in enumerate(names):
+                if m == r:
+                    continue
+                accuracy_diff = scores['accuracy'][r] - scores['accuracy'][m]
+                f1_diff = scores['weighted_f1'][r] - scores['weighted_f1'][m]
+                differences[name] = {
+                    'accuracy': _interval(accuracy_diff, results[reference]['accuracy'] - results[name]['accuracy'], confidence),
+                    'f1_score': _interval(f1_diff, results[reference]['f1_score'] - results[name]['f1_score'], confidence),
+                    # Share of resamples where the reference is not more accurate
+                    'p_not_better': float(np.mean(accuracy_diff <= 0)),
+                }
+            intervals['differences'] = {'reference': reference, 'models': differences}
+
+        return intervals
+
+
+# =========================================================
+# Permutation Importance
+# =========================================================
+def permutation_scores(lr_model, rf_model, nb_model, scaler, weights, X, y_encoded, n_repeats, seed):
+    """
+    Accuracy of every model and the ensemble with each feature permuted.
+
+    All permuted copies (n_features x n_repeats blocks of the test matrix) are
+    stacked into one large matrix, so each model gets exactly one
+    predict_proba call and the scaler one transform. Module-level so repeat
+    chunks can run in worker processes.
+
+    Returns:
+        np.ndarray: Accuracies of shape (4, n_features, n_repeats) in
+        (LR, RF, NB, Ensemble) order
+    """
+    rng = np.random.default_rng(seed)
+    X = np.asarray(X, dtype=np.float64)
+    n_samples, n_features = X.shape
+
+    # (n_features, n_repeats, n_samples, n_features) copies, column j of block j shuffled
+    permuted = np.broadcast_to(X, (n_features, n_repeats, n_samples, n_features)).copy()
+    for j in range(n_features):
+        orders = rng.permuted(np.broadcast_to(np.arange(n_samples), (n_repeats, n_samples)), axis=1)
+        permuted[j, :, :, j] = X[orders, j]
+    stacked = permuted.reshape(-1, n_features)
+
+    stacked_scaled = scaler.transform(stacked)
+    probabilities = np.stack([
+        lr_model.predict_proba(stacked_scaled),
+        rf_model.predict_proba(stacked),
+        nb_model.predict_proba(stacked_scaled),
+    ])
+    ensemble = np.tensordot(np.asarray(weights, dtype=np.float64), probabilities, axes=1)
+
+    predicted = np.concatenate([probabilities, ensemble[None]]).argmax(axis=-1)
+    correct = predicted.reshape(4, n_features, n_repeats, n_samples) == y_encoded
+    return correct.mean(axis=-1)
+
+
+def permutation_importance(lr_model, rf_model, nb_model, scaler, label_encoder, weights, X_test, y_test,
+                           feature_names, n_repeats=10, seed=42, jobs=1):
+    """
+    Permutation importance (accuracy drop) for each base model and the weighted ensemble.
+
+    Args:
+        lr_model, rf_model, nb_model: Fitted base models
+        scaler: Fitted StandardScaler used by LR and NB
+        label_encoder: Fitted LabelEncoder
+        weights: Ensemble (LR, RF, NB) weights
+        X_test (np.ndarray): Unscaled test features
+        y_test (np.ndarray): True labels
+        feature_names (list): Feature names in column order
+        n_repeats (int): Shuffles per feature
+        seed (int): Base seed; repeat chunks use independent child seeds
+        jobs (int): Worker processes; repeats are split across them
+
+    Returns:
+        dict: Model name ('Logistic Regression', 'Random Forest', 'Naive Bayes', 'Ensemble')
+              -> {feature: {'mean': accuracy drop, 'std': ...}}, sorted by mean drop
+    """
+    X_test = np.asarray(X_test, dtype=np.float64)
+    y_encoded = label_encoder.transform(np.asarray(y_test))
+
+    # Baseline accuracies from the unpermuted matrix
+    X_scaled = scaler.transform(X_test)
+    probabilities = np.stack([
+        lr_model.predict_proba(X_scaled),
+        rf_model.predict_proba(X_test),
+        nb_model.predict_proba(X_scaled),
+    ])
+    ensemble = np.tensordot(np.asarray(weights, dtype=np.float64), probabilities, axes=1)
+    baseline = (np.concatenate([probabilities, ensemble[None]]).argmax(axis=-1) == y_encoded).mean(axis=-1)
+
+    jobs = max(1, min(jobs, n_repeats))
+    chunk_repeats = [len(chunk) for chunk in np.array_split(np.arange(n_repeats), jobs)]
+    seeds = np.random.SeedSequence(seed).spawn(jobs)
+    args = [(lr_model, rf_model, nb_model, scaler, tuple(weights), X_test, y_encoded, repeats, chunk_seed)
+            for repeats, chunk_seed in zip(chunk_repeats, seeds)]
+
+    if jobs == 1:
+        chunks = [permutation_scores(*args[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            chunks = list(executor.map(permutation_scores, *zip(*args)))
+
+    # Accuracy drop per (model, feature, repeat)
+    drops = baseline[:, None, None] - np.concatenate(chunks, axis=-1)
+
+    importances = {}
+    for m, name in enumerate(MODEL_NAMES + ["Ensemble"]):
+        ranked = sorted(range(len(feature_names)), key=lambda j: -drops[m, j].mean())
+        importances[name] = {
+            feature_names[j]: {'mean': float(drops[m, j].mean()), 'std': float(drops[m, j].std())}
+            for j in ranked
+        }
+    return importances
@@ -0,0 +1,199 @@
+# scripts/import_report.py
+
+import os
+import re
+import sys
+import json
+import time
+import subprocess
+
+AI_MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OLLAMA_DIR = os.path.join(AI_MODULE_DIR, "ollama_integration")
+
+# Entry point -> (module imported, directory it is imported from, extra environment)
+ENTRY_POINTS = {
+    "chat-server": ("server", OLLAMA_DIR, {"OJT_SERVICES": "chat"}),
+    "server": ("server", OLLAMA_DIR, {}),
+    "asgi-server": ("asgi_server", OLLAMA_DIR, {}),
+    "chat-asgi": ("asgi_server", OLLAMA_DIR, {"OJT_SERVICES": "chat"}),
+    "grpc-server": ("grpc_service", OLLAMA_DIR, {}),
+    "insight-engine": ("insight_engine", OLLAMA_DIR, {}),
+    "train": ("scripts.train_model", AI_MODULE_DIR, {}),
+    "evaluate": ("scripts.evaluate_model", AI_MODULE_DIR, {}),
+    "calibrate": ("scripts.calibrate", AI_MODULE_DIR, {}),
+    "cross-validate": ("scripts.cross_validate", AI_MODULE_DIR, {}),
+    "score-all": ("scripts.score_all", AI_MODULE_DIR, {}),
+    "cli": ("ojt_ai_cli", AI_MODULE_DIR, {}),
+}
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+# =========================================================
+# Measurement
+# =========================================================
+def parse_importtime(stderr):
+    """
+    Parse `python -X importtime` output.
+
+    Returns:
+        list of dicts: module, self_ms, cumulative_ms, depth (0 = imported
+        directly by the entry point)
+    """
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        modules.append({
+            "module": module,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            # Each nesting level adds two spaces after the leading one
+            "depth": (len(indent) - 1) // 2,
+        })
+    return modules
+
+
+def measure_entry_point(name, module=None, cwd=None, env=None):
+    """
+    Import an entry point in a fresh interpreter under -X importtime.
+
+    Args:
+        name: Key of ENTRY_POINTS, or a label when module/cwd are given
+        module: Module to import (defaults to the entry point's)
+        cwd: Directory to import from
+        env: Extra environment variables
+
+    Returns:
+        dict with wall-clock process time, total import time and per-module rows
+    """
+    if module is None:
+        module, cwd, env = ENTRY_POINTS[name]
+    process_env = dict(os.environ, **(env or {}))
+    # Only the import is measured; the interpreter exits right after it
+    code = f"import sys; sys.path.insert(0, {cwd!r}); import {module}"
+
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, env=process_env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    modules = parse_importtime(completed.stderr)
+    top_level = [row for row in modules if row["depth"] == 0]
+    return {
+        "entry_point": name,
+        "module": module,
+        "ok": completed.returncode == 0,
+        "error": completed.stderr.strip().splitlines()[-1] if completed.returncode != 0 else None,
+        "process_ms": wall_ms,
+        "import_ms": sum(row["cumulative_ms"] for row in top_level),
+        "modules": modules,
+    }
+
+
+# =========================================================
+# Reporting
+# =========================================================
+def top_packages(modules, limit=10):
+    """Heaviest top-level packages by self time summed over their submodules"""
+    totals = {}
+    for row in modules:
+        package = row["module"].split(".")[0]
+        totals[package] = totals.get(package, 0.0) + row["self_ms"]
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def direct_imports(modules, module):
+    """
+    Rows imported directly by `module`. importtime prints children before
+    their parent, so they are the depth-1 rows since the previous top-level row.
+    """
+    for index in range(len(modules) - 1, -1, -1):
+        if modules[index]["depth"] == 0 and modules[index]["module"] == module:
+            break
+    else:
+        return []
+    children = []
+    for row in reversed(modules[:index]):
+        if row["depth"] == 0:
+            break
+        if row["depth"] == 1:
+            children.append(row)
+    return children
+
+
+def print_report(result, limit=10):
+    print(f"\n📦 {result['entry_point']} (import {result['module']})")
+    if not result["ok"]:
+        print(f"   ❌ Import failed: {result['error']}")
+    print(f"   ⏱️  Process: {result['process_ms']:.0f} ms  |  Imports: {result['import_ms']:.0f} ms")
+
+    print(f"   🔝 Heaviest packages (self time):")
+    for package, self_ms in top_packages(result["modules"], limit):
+        print(f"      {package:<30} {self_ms:8.1f} ms")
+
+    direct = sorted(direct_imports(result["modules"], result["module"]),
+                    key=lambda row: row["cumulative_ms"], reverse=True)[:limit]
+    print(f"   🌳 Heaviest imports of {result['module']} (cumulative):")
+    for row in direct:
+        print(f"      {row['module']:<30} {row['cumulative_ms']:8.1f} ms")
+
+
+def run_import_report(entry_points=None, limit=10, json_path=None, max_ms=None):
+    """
+    Measure and print import times for the given entry points.
+
+    Args:
+        entry_points: Names from ENTRY_POINTS (all when empty)
+        limit: Rows per table
+        json_path: Optional path for the full per-module report
+        max_ms: Fail (return False) when an entry point's process time exceeds this
+
+    Returns:
+        bool: True when every entry point imported within budget
+    """
+    entry_points = entry_points or list(ENTRY_POINTS)
+    results = [measure_entry_point(name) for name in entry_points]
+
+    for result in results:
+        print_report(result, limit)
+
+    if json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Import report saved to: {json_path}")
+
+    ok = all(result["ok"] for result in results)
+    if max_ms is not None:
+        over = [result for result in results if result["process_ms"] > max_ms]
+        for result in over:
+            print(f"❌ {result['entry_point']}: {result['process_ms']:.0f} ms exceeds budget of {max_ms:.0f} ms")
+        ok = ok and not over
+    return ok
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report import (cold-start) time per ai_module entry point")
+    parser.add_argument("entry_points", nargs="*", metavar="ENTRY_POINT",
+                        help=f"Entry points to measure (default: all of {', '.join(ENTRY_POINTS)})")
+    parser.add_argument("--top", type=int, default=10, help="Rows per table")
+    parser.add_argument("--json", dest="json_path", help="Write the full per-module report here")
+    parser.add_argument("--max-ms", type=float, help="Exit non-zero if an entry point takes longer to import")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.entry_points if name not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown entry point(s): {', '.join(unknown)}")
+
+    return 0 if run_import_report(args.entry_points, args.top, args.json_path, args.max_ms) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
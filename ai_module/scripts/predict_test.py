@@ -1,33 +1,42 @@
 """Test script for OJT AI Prediction System"""
-import pandas as pd
 import numpy as np
 import os
 import sys
 
+# Add the insight engine to path to import it
+AI_MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(AI_MODULE_DIR)
+sys.path.append(os.path.join(AI_MODULE_DIR, "ollama_integration"))
+
+import insight_engine
+
 
 def check_system_ready():
     """Check if the system is ready for predictions"""
     print("🔍 Checking system status...")
     
     required_files = [
-        "models/ensemble_model.pkl",
-        "models/scaler.pkl", 
-        "models/feature_names.pkl",
-        "models/label_encoder.pkl"
+        "logistic_regression.pkl",
+        "random_forest.pkl",
+        "naive_bayes.pkl",
+        "scaler.pkl",
+        "feature_names.pkl",
+        "label_encoder.pkl"
     ]
     
     status = {}
     for file in required_files:
-        exists = os.path.exists(file)
+        path = os.path.join(insight_engine.MODEL_DIR, file)
+        exists = os.path.exists(path)
         status[file] = exists
         icon = "✅" if exists else "❌"
-        print(f"   {icon} {file}")
+        print(f"   {icon} {path}")
     
-    all_ready = all(status.values())
+    all_ready = all(status.values()) and insight_engine.MODELS_LOADED
     
     if not all_ready:
         print("\n❌ System not ready for predictions.")
-        print("💡 Please run training first: python main.py")
+        print("💡 Please run training first: ojt-ai train")
         return False
     
     print("✅ System is ready for predictions!")
@@ -46,7 +55,8 @@ def test_sample_predictions():
                 'weekly_progress': 45,
                 'narrative_report': 50, 
                 'coordinator_evaluation': 55,
-                'partner_evaluation': 48
+                'partner_evaluation': 48,
+                'attendance': 14
             },
             'description': 'Low scores across all metrics'
         },
@@ -56,7 +66,8 @@ def test_sample_predictions():
                 'weekly_progress': 68,
                 'narrative_report': 72,
                 'coordinator_evaluation': 65, 
-                'partner_evaluation': 70
+                'partner_evaluation': 70,
+                'attendance': 20
             },
             'description': 'Mixed performance near thresholds'
         },
@@ -66,7 +77,8 @@ def test_sample_predictions():
                 'weekly_progress': 75,
                 'narrative_report': 78,
                 'coordinator_evaluation': 82, 
-                'partner_evaluation': 80
+                'partner_evaluation': 80,
+                'attendance': 23
             },
             'description': 'Meets expectations consistently'
         },
@@ -76,7 +88,8 @@ def test_sample_predictions():
                 'weekly_progress': 92,
                 'narrative_report': 88,
                 'coordinator_evaluation': 95,
-                'partner_evaluation': 94
+                'partner_evaluation': 94,
+                'attendance': 25
             },
             'description': 'Outstanding performance'
         },
@@ -86,7 +99,8 @@ def test_sample_predictions():
                 'weekly_progress': 85,
                 'narrative_report': 60,  # Weak narrative
                 'coordinator_evaluation': 90,
-                'partner_evaluation': 88
+                'partner_evaluation': 88,
+                'attendance': 21
             },
             'description': 'Strong in some areas, weak in others'
         }
@@ -94,42 +108,26 @@ def test_sample_predictions():
     
     results = []
     
-    for student in test_students:
+    # One ensemble pass for every sample student
+    predictions = insight_engine.batch_predict([student['data'] for student in test_students])
+    
+    for student, result in zip(test_students, predictions):
         print(f"\n🎓 {student['name']}")
         print(f"   📝 {student['description']}")
         print(f"   📊 Data: {student['data']}")
         
-        try:
-            # Make prediction
-            result = insight_engine.predict_student_performance(student['data'])
-            
-            if result['status'] == 'success':
-                # Store results for summary
-                results.append({
-                    'name': student['name'],
-                    'prediction': result['prediction'],
-                    'confidence': result['confidence'],
-                    'data': student['data']
-                })
-                
-                # Display results
-                print(f"   🎯 Prediction: {result['prediction']}")
-                print(f"   📈 Confidence: {result['confidence']:.1%}")
-                
-                # Show key insights
-                print(f"   💡 Key Insights:")
-                for insight in result['insights'][:3]:  # Show first 3 insights
-                    print(f"      • {insight}")
-                
-                # Show top recommendation
-                if result['recommendations']:
-                    print(f"   🚀 Recommendation: {result['recommendations'][0]}")
-                
-            else:
-                print(f"   ❌ Prediction failed: {result.get('error', 'Unknown error')}")
-                
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
+        # Store results for summary
+        results.append({
+            'name': student['name'],
+            'prediction': result['predicted_label'],
+            'confidence': result['probability'],
+            'data': student['data']
+        })
+        
+        # Display results
+        print(f"   🎯 Prediction: {result['predicted_label']}")
+        print(f"   📈 Confidence: {result['probability']:.1%}")
+        print(f"   ⚠️  Risk Level: {result['risk_level']}")
     
     return results
 
@@ -181,18 +179,21 @@ def interactive_prediction():
         narrative_report = float(input("📝 Narrative Report: "))
         coordinator_evaluation = float(input("👨‍🏫 Coordinator Evaluation: "))
         partner_evaluation = float(input("🤝 Partner Evaluation: "))
+        attendance = float(input("📅 Attendance (days present out of 25): "))
         
         student_data = {
             'weekly_progress': weekly_progress,
             'narrative_report': narrative_report,
             'coordinator_evaluation': coordinator_evaluation,
-            'partner_evaluation': partner_evaluation
+            'partner_evaluation': partner_evaluation,
+            'attendance': attendance
         }
         
         # Validate inputs
         for key, value in student_data.items():
-            if value < 0 or value > 100:
-                print(f"❌ {key} must be between 0 and 100")
+            limit = 25 if key == 'attendance' else 100
+            if value < 0 or value > limit:
+                print(f"❌ {key} must be between 0 and {limit}")
                 return
         
         print(f"\n🔮 Predicting for student with scores:")
@@ -200,14 +201,11 @@ def interactive_prediction():
         print(f"   Narrative Report: {narrative_report}%")
         print(f"   Coordinator Evaluation: {coordinator_evaluation}%")
         print(f"   Partner Evaluation: {partner_evaluation}%")
+        print(f"   Attendance: {attendance:.0f}/25 days")
         
         # Make prediction
-        result = insight_engine.predict_student_performance(student_data)
-        
-        if result['status'] == 'success':
-            display_detailed_results(result)
-        else:
-            print(f"❌ Prediction failed: {result.get('error', 'Unknown error')}")
+        result = insight_engine.batch_predict([student_data])[0]
+        display_detailed_results(result)
             
     except ValueError:
         print("❌ Please enter valid numbers!")
@@ -222,37 +220,17 @@ def display_detailed_results(result):
     print("🎯 PREDICTION RESULTS")
     print("🎓" * 20)
     
-    print(f"\n📊 PERFORMANCE CATEGORY: {result['prediction']}")
-    print(f"🎯 CONFIDENCE LEVEL: {result['confidence']:.1%}")
+    print(f"\n📊 PERFORMANCE CATEGORY: {result['predicted_label']}")
+    print(f"🎯 CONFIDENCE LEVEL: {result['probability']:.1%}")
     
     # Probability breakdown
     print(f"\n📈 PROBABILITY BREAKDOWN:")
-    for category, prob in result['probabilities'].items():
+    for category, prob in result['class_probabilities'].items():
         bar = "█" * int(prob * 20)
         print(f"   {category:<12} {prob:>6.1%} {bar}")
     
-    # Insights
-    print(f"\n💡 KEY INSIGHTS:")
-    for insight in result['insights']:
-        print(f"   • {insight}")
-    
-    # Recommendations
-    print(f"\n🚀 RECOMMENDATIONS:")
-    for i, recommendation in enumerate(result['recommendations'], 1):
-        print(f"   {i}. {recommendation}")
-    
     # Risk Analysis
-    risk_analysis = result['risk_analysis']
-    print(f"\n⚠️  RISK ANALYSIS:")
-    print(f"   Risk Level: {risk_analysis['risk_level'].upper()}")
-    if risk_analysis['factors']:
-        print(f"   Key Factors:")
-        for factor in risk_analysis['factors']:
-            print(f"     - {factor}")
-    if risk_analysis['mitigation_strategies']:
-        print(f"   Mitigation Strategies:")
-        for strategy in risk_analysis['mitigation_strategies']:
-            print(f"     - {strategy}")
+    print(f"\n⚠️  RISK LEVEL: {result['risk_level']}")
 
 def batch_prediction_demo():
     """Demonstrate batch predictions"""
@@ -261,11 +239,13 @@ def batch_prediction_demo():
     
     # Simulate a batch of students
     batch_students = [
-        {'weekly_progress': 85, 'narrative_report': 78, 'coordinator_evaluation': 92, 'partner_evaluation': 88},
-        {'weekly_progress': 65, 'narrative_report': 72, 'coordinator_evaluation': 68, 'partner_evaluation': 70},
-        {'weekly_progress': 95, 'narrative_report': 88, 'coordinator_evaluation': 92, 'partner_evaluation': 94},
-        {'weekly_progress': 55, 'narrative_report': 60, 'coordinator_evaluation': 58, 'partner_evaluation': 62},
-        {'weekly_progress': 75, 'narrative_report': 82, 'coordinator_evaluation': 78, 'partner_evaluation': 80}
+        {'weekly_progress': 85, 'narrative_report': 78, 'coordinator_evaluation': 92, 'partner_evaluation': 88, 'attendance': 24},
+        {'weekly_progress': 65, 'narrative_report': 72, 'coordinator_evaluation': 68, 'partner_evaluation': 70, 'attendance': 19},
+        {'weekly_progress': 95, 'narrative_report': 88, 'coordinator_evaluation': 92, 'partner_evaluation': 94, 'attendance': 25},
+        {'weekly_progress': 55, 'narrative_report': 60, 'coordinator_evaluation': 58, 'partner_evaluation': 62, 'attendance': 15},
+        # Backend snapshot keys work too
+        {'daily_progress_score': 75, 'narrative_score': 82, 'coord_eval_score': 78, 'partner_eval_score': 80,
+         'attendance_days_present': 22}
     ]
     
     print(f"📦 Processing {len(batch_students)} students...")
@@ -277,14 +257,11 @@ def batch_prediction_demo():
     
     predictions_summary = {}
     for i, result in enumerate(results, 1):
-        if result['status'] == 'success':
-            pred = result['prediction']
-            predictions_summary[pred] = predictions_summary.get(pred, 0) + 1
-            
-            status_icon = "✅" if pred != "At Risk" else "⚠️"
-            print(f"   Student {i}: {status_icon} {pred} ({result['confidence']:.1%})")
-        else:
-            print(f"   Student {i}: ❌ Failed")
+        pred = result['predicted_label']
+        predictions_summary[pred] = predictions_summary.get(pred, 0) + 1
+        
+        status_icon = "⚠️" if result['risk_level'] == "HIGH" else "✅"
+        print(f"   Student {i}: {status_icon} {pred} ({result['probability']:.1%}, {result['risk_level']} risk)")
     
     print(f"\n📈 BATCH STATISTICS:")
     for pred, count in predictions_summary.items():
@@ -317,7 +294,7 @@ def run_comprehensive_test():
         print("\n💡 Next steps:")
         print("   • Use the insight engine in your application")
         print("   • Integrate with your frontend or chatbot")
-        print("   • Run 'python main.py' to retrain models if needed")
+        print("   • Run 'ojt-ai train' to retrain models if needed")
         
     except Exception as e:
         print(f"❌ Test failed: {e}")
@@ -337,18 +314,17 @@ def quick_test():
         'weekly_progress': 85,
         'narrative_report': 78,
         'coordinator_evaluation': 92,
-        'partner_evaluation': 88
+        'partner_evaluation': 88,
+        'attendance': 24
     }
     
     print(f"\n🔮 Testing prediction for sample student...")
-    result = insight_engine.predict_student_performance(sample_student)
+    result = insight_engine.batch_predict([sample_student])[0]
     
-    if result['status'] == 'success':
-        print(f"✅ Prediction: {result['prediction']}")
-        print(f"✅ Confidence: {result['confidence']:.1%}")
-        print(f"✅ System is working correctly!")
-    else:
-        print(f"❌ Test failed: {result.get('error', 'Unknown error')}")
+    print(f"✅ Prediction: {result['predicted_label']}")
+    print(f"✅ Confidence: {result['probability']:.1%}")
+    print(f"✅ Risk Level: {result['risk_level']}")
+    print(f"✅ System is working correctly!")
 
 if __name__ == "__main__":
     import argparse
@@ -0,0 +1,329 @@
+# scripts/score_all.py
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+# Add parent directory (and the insight engine) to path to import modules
+AI_MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(AI_MODULE_DIR)
+sys.path.append(os.path.join(AI_MODULE_DIR, "ollama_integration"))
+
+import config
+import db
+import insight_engine
+
+# =========================================================
+# Defaults
+# =========================================================
+DEFAULT_CHUNK_SIZE = config.SCORE_CHUNK_SIZE
+
+MODEL_NAME = "Nightly Risk Prediction Ensemble"
+INSIGHT_TYPE = "daily_risk_prediction"
+
+# =========================================================
+# Snapshot Query
+# =========================================================
+# Same aggregates as the backend's GET /api/prediction/daily/:studentId, but
+# for every active student at once. "Active" matches generate_batch_predictions():
+# a Student with an Ongoing OJT record. Written in plain SQL so it runs on both
+# PostgreSQL and the SQLite stand-in. {p} is the driver's parameter placeholder.
+SNAPSHOT_SQL = """
+    SELECT
+        u.user_id AS student_id,
+        COALESCE(coord.avg_score, 0) AS coord_eval_score,
+        COALESCE(narr.avg_score, 0) AS narrative_score,
+        COALESCE(partner.avg_score, 0) AS partner_eval_score,
+        COALESCE(att.days_present, 0) AS attendance_days_present,
+        COALESCE(att.total_hours_completed, 0) AS total_hours_completed
+    FROM users u
+    LEFT JOIN (
+        SELECT e.student_id, AVG(e.total_score) AS avg_score
+        FROM evaluations e
+        JOIN users s ON e.supervisor_id = s.user_id
+        WHERE s.role = 'Coordinator'
+        GROUP BY e.student_id
+    ) coord ON coord.student_id = u.user_id
+    LEFT JOIN (
+        SELECT e.student_id, AVG(e.total_score) AS avg_score
+        FROM evaluations e
+        GROUP BY e.student_id
+    ) narr ON narr.student_id = u.user_id
+    LEFT JOIN (
+        SELECT e.student_id, AVG(e.total_score) AS avg_score
+        FROM evaluations e
+        JOIN users s ON e.supervisor_id = s.user_id
+        WHERE s.role = 'Supervisor'
+        GROUP BY e.student_id
+    ) partner ON partner.student_id = u.user_id
+    LEFT JOIN (
+        SELECT a.student_id,
+               COUNT(DISTINCT a.date) AS days_present,
+               SUM(a.total_hours) AS total_hours_completed
+        FROM attendance a
+        GROUP BY a.student_id
+    ) att ON att.student_id = u.user_id
+    WHERE u.role = 'Student'
+      AND EXISTS (
+          SELECT 1 FROM ojt_records o
+          WHERE o.student_id = u.user_id AND o.status = 'Ongoing'
+      )
+      AND u.user_id > {p}
+    ORDER BY u.user_id
+"""
+
+SNAPSHOT_COLUMNS = [
+    "student_id",
+    "coord_eval_score",
+    "narrative_score",
+    "partner_eval_score",
+    "attendance_days_present",
+    "total_hours_completed",
+]
+
+INSERT_INSIGHT_SQL = """
+    INSERT INTO ai_insights (student_id, model_name, insight_type, result, confidence, input_data)
+    VALUES {values}
+"""
+
+
+# =========================================================
+# Database Connections
+# =========================================================
+def open_connections(dsn):
+    """
+    Open the read and write connections for a scoring run.
+
+    PostgreSQL gets two connections so the server-side cursor keeps streaming
+    while each chunk is committed on the other. SQLite shares one connection,
+    since a second writer would be locked out by the open read.
+
+    Returns:
+        tuple: (read_conn, write_conn, placeholder)
+    """
+    read_conn, is_sqlite = db.connect(dsn)
+    if is_sqlite:
+        return read_conn, read_conn, "?"
+
+    write_conn, _ = db.connect(dsn)
+    return read_conn, write_conn, "%s"
+
+
+# =========================================================
+# Checkpointing
+# =========================================================
+# The checkpoint is a row in ai_scoring_runs, updated in the same transaction
+# as the chunk's ai_insights inserts: either both are committed or neither,
+# so a resumed run never inserts a chunk twice.
+CREATE_RUNS_SQL = """
+    CREATE TABLE IF NOT EXISTS ai_scoring_runs (
+        run_id VARCHAR(20) PRIMARY KEY,
+        last_student_id INTEGER NOT NULL DEFAULT 0,
+        scored INTEGER NOT NULL DEFAULT 0,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP
+    )
+"""
+
+
+def ensure_runs_table(conn):
+    cursor = conn.cursor()
+    cursor.execute(CREATE_RUNS_SQL)
+    cursor.close()
+    conn.commit()
+
+
+def load_checkpoint(conn):
+    """Return the newest unfinished run, or None when there is nothing to resume"""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT run_id, last_student_id, scored FROM ai_scoring_runs "
+        "WHERE completed_at IS NULL ORDER BY run_id DESC LIMIT 1"
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    if row is None:
+        return None
+    return {"run_id": row[0], "last_student_id": int(row[1]), "scored": int(row[2])}
+
+
+def start_run(conn, placeholder, fresh=False):
+    """Register a new run (with fresh=True, unfinished runs are abandoned first)"""
+    cursor = conn.cursor()
+    if fresh:
+        cursor.execute("DELETE FROM ai_scoring_runs WHERE completed_at IS NULL")
+    checkpoint = {"run_id": datetime.now().strftime("%Y%m%d%H%M%S%f"), "last_student_id": 0, "scored": 0}
+    cursor.execute(f"INSERT INTO ai_scoring_runs (run_id) VALUES ({placeholder})", (checkpoint["run_id"],))
+    cursor.close()
+    conn.commit()
+    return checkpoint
+
+
+def save_checkpoint(conn, placeholder, checkpoint):
+    """Record progress; committed by the caller together with the chunk's inserts"""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"UPDATE ai_scoring_runs SET last_student_id = {placeholder}, scored = {placeholder} "
+        f"WHERE run_id = {placeholder}",
+        (checkpoint["last_student_id"], checkpoint["scored"], checkpoint["run_id"])
+    )
+    cursor.close()
+
+
+def finish_run(conn, placeholder, checkpoint):
+    cursor = conn.cursor()
+    cursor.execute(
+        f"UPDATE ai_scoring_runs SET completed_at = CURRENT_TIMESTAMP WHERE run_id = {placeholder}",
+        (checkpoint["run_id"],)
+    )
+    cursor.close()
+    conn.commit()
+
+
+# =========================================================
+# Scoring
+# =========================================================
+def rows_to_snapshots(rows):
+    """
+    Convert fetched snapshot rows into backend-style snapshot dictionaries.
+
+    Daily progress falls back to the narrative score when there is no
+    coordinator evaluation, exactly like the backend's daily route.
+    """
+    snapshots = []
+    for row in rows:
+        snap = {col: float(val or 0) for col, val in zip(SNAPSHOT_COLUMNS[1:], row[1:])}
+        snap["daily_progress_score"] = snap["coord_eval_score"] or snap["narrative_score"]
+        snapshots.append(snap)
+    return snapshots
+
+
+def score_chunk(rows):
+    """
+    Score one chunk of snapshot rows with a single ensemble pass.
+
+    Returns:
+        list: ai_insights parameter tuples, one per student
+    """
+    snapshots = rows_to_snapshots(rows)
+
+    # Snapshots are written straight into one float64 matrix (no per-row dicts)
+    feature_array = insight_engine.snapshot_matrix(snapshots)
+
+    predictions = insight_engine.predict_performance_batch(feature_array)
+
+    generated_at = datetime.now().isoformat()
+    records = []
+    for row, snapshot, prediction in zip(rows, snapshots, predictions):
+        input_data = dict(snapshot, batch_job=True, generated_at=generated_at)
+        records.append((
+            int(row[0]),
+            MODEL_NAME,
+            INSIGHT_TYPE,
+            json.dumps(prediction),
+            round(prediction["probability"], 2),
+            json.dumps(input_data),
+        ))
+    return records
+
+
+def write_insights(conn, placeholder, records):
+    """Bulk-insert ai_insights rows (execute_values on PostgreSQL, executemany on SQLite)"""
+    cursor = conn.cursor()
+    if placeholder == "?":
+        row_placeholders = "(" + ", ".join(["?"] * 6) + ")"
+        cursor.executemany(INSERT_INSIGHT_SQL.format(values=row_placeholders), records)
+    else:
+        from psycopg2.extras import execute_values
+        execute_values(cursor, INSERT_INSIGHT_SQL.format(values="%s"), records, page_size=len(records))
+    cursor.close()
+
+
+def score_all(dsn=None, chunk_size=DEFAULT_CHUNK_SIZE, resume=True):
+    """
+    Score every active student and write the results to ai_insights.
+
+    Snapshots are streamed with one server-side cursor and scored in chunks.
+    Each chunk's inserts are committed in one transaction with the run's
+    checkpoint (last student id, in ai_scoring_runs), so an interrupted run
+    resumes where it stopped without re-inserting a committed chunk.
+
+    Args:
+        dsn (str): PostgreSQL DSN or SQLite path (defaults to the DB_* env vars)
+        chunk_size (int): Students scored and committed per chunk
+        resume (bool): Continue the last unfinished run instead of starting over
+
+    Returns:
+        dict: Summary with the number of students scored and elapsed seconds
+    """
+    if not insight_engine.MODELS_LOADED:
+        raise RuntimeError("❌ Models not loaded. Train the ensemble before scoring.")
+
+    dsn = dsn or db.default_dsn()
+    start = time.time()
+    read_conn, write_conn, placeholder = open_connections(dsn)
+
+    try:
+        ensure_runs_table(write_conn)
+        checkpoint = load_checkpoint(write_conn) if resume else None
+        if checkpoint:
+            print(f"♻️  Resuming run {checkpoint['run_id']} after student {checkpoint['last_student_id']} "
+                  f"({checkpoint['scored']} already scored)")
+        else:
+            checkpoint = start_run(write_conn, placeholder, fresh=not resume)
+
+        if placeholder == "?":
+            cursor = read_conn.cursor()
+        else:
+            # Named cursor = server-side cursor; rows are streamed chunk by chunk
+            cursor = read_conn.cursor(name="score_all_snapshots")
+            cursor.itersize = chunk_size
+
+        cursor.execute(SNAPSHOT_SQL.format(p=placeholder), (checkpoint["last_student_id"],))
+
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+
+            records = score_chunk(rows)
+            progress = dict(checkpoint, last_student_id=int(rows[-1][0]), scored=checkpoint["scored"] + len(rows))
+            write_insights(write_conn, placeholder, records)
+            save_checkpoint(write_conn, placeholder, progress)
+            write_conn.commit()
+            checkpoint = progress
+            print(f"   ✅ Scored {checkpoint['scored']} students (last id {checkpoint['last_student_id']})")
+
+        cursor.close()
+
+        # Run completed; the next run starts from the beginning
+        finish_run(write_conn, placeholder, checkpoint)
+    finally:
+        read_conn.close()
+        if write_conn is not read_conn:
+            write_conn.close()
+
+    elapsed = time.time() - start
+    print(f"🎉 Nightly scoring finished: {checkpoint['scored']} students in {elapsed:.1f}s")
+
+    return {"run_id": checkpoint["run_id"], "scored": checkpoint["scored"], "elapsed_seconds": elapsed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score all active OJT students in bulk')
+    parser.add_argument('--dsn', default=None,
+                        help='PostgreSQL DSN or SQLite file (default: OJT_DB_DSN or the DB_* env vars)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Students scored per chunk (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--fresh', action='store_true', help='Abandon any unfinished run and start over')
+
+    args = parser.parse_args(argv)
+
+    score_all(dsn=args.dsn, chunk_size=args.chunk_size, resume=not args.fresh)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,31 @@
 # scripts/train_model.py
 
-import pandas as pd
+# pandas and sklearn are imported inside the functions that use them, so
+# importing this module (e.g. for EnsembleModel when unpickling) stays cheap
 import numpy as np
 import pickle
 import os
 import sys
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.naive_bayes import GaussianNB
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import warnings
 warnings.filterwarnings('ignore')
 
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ollama_integration"))
+
+import config
+from scripts.evaluation_engine import EvaluationEngine, permutation_importance
+from ollama_integration.calibration import fit_calibration, accept_calibration, save_calibration, apply_calibration
+from ollama_integration.risk_policy import build_risk_policy, save_risk_policy
+from ollama_integration.drift import build_reference_stats, save_reference_stats
+
+# Ensemble weights insight_engine serves with (LR, RF, NB); calibration is fitted for these
+SERVING_WEIGHTS = (0.4, 0.4, 0.2)
+CALIBRATION_METHOD = config.CALIBRATION_METHOD
+# Share of the training split held out of model fitting for calibration / risk thresholds
+CALIBRATION_SIZE = 0.2
+# Share of the calibration split the calibration map is checked on instead of fitted on
+CALIBRATION_CHECK_SIZE = 0.5
 
 class EnsembleModel:
     """
@@ -37,6 +47,11 @@ class EnsembleModel:
         """
         Train all three models and set their weights
         """
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.naive_bayes import GaussianNB
+        from sklearn.preprocessing import StandardScaler, LabelEncoder
+        
         self.feature_names = feature_names
         
         # Encode labels if they're strings
@@ -194,25 +209,37 @@ def detect_target_column(df):
     # Last resort: use the last column
     return df.columns[-1]
 
+def detect_training_schema(df):
+    """
+    Feature/target auto-detection in a form the dataset cache can store
+    """
+    return {
+        'features': detect_feature_columns(df),
+        'target': detect_target_column(df)
+    }
+
 def load_and_preprocess_data():
     """
     Load and preprocess the OJT grading data from CSV
     Automatically detect features and target
     """
-    data_path = "data/datasets/ojt_grading_data.csv"
+    import pandas as pd
+    from data.processing.dataset_cache import load_dataset
+    
+    data_path = config.DATASET_PATH
     
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"❌ Dataset not found at {data_path}")
     
     print("📁 Loading dataset...")
-    df = pd.read_csv(data_path)
+    df, schema = load_dataset(data_path, detect_schema=detect_training_schema, schema_key="train_model")
     
     print(f"📊 Dataset shape: {df.shape}")
     print(f"📋 All columns: {list(df.columns)}")
     
-    # Automatically detect features and target
-    feature_columns = detect_feature_columns(df)
-    target_column = detect_target_column(df)
+    # Automatically detect features and target (cached alongside the dataset)
+    feature_columns = schema['features']
+    target_column = schema['target']
     
     print(f"🔍 Auto-detected features: {feature_columns}")
     print(f"🎯 Auto-detected target: {target_column}")
@@ -236,7 +263,7 @@ def load_and_preprocess_data():
         df = df.dropna(subset=[target_column])
     
     X = df[feature_columns].values
-    y = df[target_column].values
+    y = df[target_column].to_numpy()
     
     print(f"\n🎯 Target distribution:")
     target_counts = pd.Series(y).value_counts()
@@ -253,33 +280,27 @@ def evaluate_model(ensemble, X_test, y_test, feature_names):
     """
     Comprehensive evaluation of the ensemble model
     """
+    import pandas as pd
+    from sklearn.metrics import classification_report
+    
     print("\n" + "="*50)
     print("🎯 MODEL EVALUATION")
     print("="*50)
     
-    # Individual model evaluations
-    X_test_scaled = ensemble.scaler.transform(X_test)
+    # One inference pass; every metric below is derived from the cached probabilities
+    engine = EvaluationEngine.from_ensemble(ensemble, X_test, y_test)
+    individual_results = engine.individual_metrics()
+    ensemble_results = engine.ensemble_metrics(ensemble.model_weights)
     
     print("\n📊 INDIVIDUAL MODEL PERFORMANCE:")
     
-    # Logistic Regression
-    lr_pred = ensemble.lr_model.predict(X_test_scaled)
-    lr_accuracy = accuracy_score(y_test, ensemble.label_encoder.inverse_transform(lr_pred))
-    print(f"   📈 Logistic Regression: {lr_accuracy:.4f}")
-    
-    # Random Forest
-    rf_pred = ensemble.rf_model.predict(X_test)
-    rf_accuracy = accuracy_score(y_test, ensemble.label_encoder.inverse_transform(rf_pred))
-    print(f"   🌲 Random Forest: {rf_accuracy:.4f}")
-    
-    # Naive Bayes
-    nb_pred = ensemble.nb_model.predict(X_test_scaled)
-    nb_accuracy = accuracy_score(y_test, ensemble.label_encoder.inverse_transform(nb_pred))
-    print(f"   🎯 Naive Bayes: {nb_accuracy:.4f}")
+    print(f"   📈 Logistic Regression: {individual_results['Logistic Regression']['accuracy']:.4f}")
+    print(f"   🌲 Random Forest: {individual_results['Random Forest']['accuracy']:.4f}")
+    print(f"   🎯 Naive Bayes: {individual_results['Naive Bayes']['accuracy']:.4f}")
     
     # Ensemble performance
-    ensemble_pred = ensemble.predict(X_test)
-    ensemble_accuracy = accuracy_score(y_test, ensemble_pred)
+    ensemble_pred = ensemble_results['predictions']
+    ensemble_accuracy = ensemble_results['accuracy']
     
     print(f"\n🔥 ENSEMBLE MODEL: {ensemble_accuracy:.4f}")
     
@@ -298,13 +319,105 @@ def evaluate_model(ensemble, X_test, y_test, feature_names):
         for _, row in feature_importance.iterrows():
             print(f"   {row['feature']}: {row['importance']:.4f}")
     
+    # Permutation importance of the whole weighted ensemble
+    print("\n🔀 ENSEMBLE PERMUTATION IMPORTANCE (accuracy drop):")
+    importances = permutation_importance(
+        ensemble.lr_model, ensemble.rf_model, ensemble.nb_model, ensemble.scaler, ensemble.label_encoder,
+        ensemble.model_weights, X_test, y_test, feature_names
+    )
+    for feature, drop in importances['Ensemble'].items():
+        print(f"   {feature}: {drop['mean']:.4f} ± {drop['std']:.4f}")
+    
     return ensemble_accuracy
 
-def save_training_artifacts(ensemble, feature_names):
+def split_for_calibration(X, y):
+    """
+    The training split layout: 20% test, then CALIBRATION_SIZE of the rest
+    held out of model fitting for calibration and risk thresholds
+    
+    Returns:
+        tuple: (X_fit, X_calibration, X_test, y_fit, y_calibration, y_test)
+    """
+    from sklearn.model_selection import train_test_split
+    
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_fit, X_calibration, y_fit, y_calibration = train_test_split(
+        X_train, y_train, test_size=CALIBRATION_SIZE, random_state=42, stratify=y_train
+    )
+    return X_fit, X_calibration, X_test, y_fit, y_calibration, y_test
+
+def fit_serving_calibration(ensemble, X_calibration, y_calibration,
+                            method=CALIBRATION_METHOD, weights=SERVING_WEIGHTS):
+    """
+    Fit the probability calibration table and the risk policy on the
+    calibration split for the serving ensemble weights
+    
+    The table is fitted on part of the calibration split and only kept when
+    it lowers the ECE on the rest (CALIBRATION_CHECK_SIZE); otherwise serving
+    uses the raw probabilities and the risk policy is fitted on those. The
+    test split is never consulted, so its metrics stay unbiased.
+    
+    Returns:
+        tuple: (calibration or None, risk_policy)
+    """
+    from sklearn.model_selection import train_test_split
+    
+    engine = EvaluationEngine.from_ensemble(ensemble, X_calibration, y_calibration)
+    ensemble_proba = engine.ensemble_proba(weights)
+    fit_index, check_index = train_test_split(
+        np.arange(len(y_calibration)), test_size=CALIBRATION_CHECK_SIZE, random_state=42, stratify=y_calibration
+    )
+    calibration = fit_calibration(ensemble_proba[fit_index], engine.y_encoded[fit_index],
+                                  method=method, weights=weights)
+    accepted = accept_calibration(calibration, ensemble_proba[check_index], engine.y_encoded[check_index])
+    
+    metrics = calibration['metrics']
+    print(f"\n🎚️ CALIBRATION ({method}, {calibration['n_samples']} calibration samples):")
+    if calibration['temperature'] is not None:
+        print(f"   Temperature: {calibration['temperature']:.4f}")
+    print(f"   NLL: {metrics['nll_before']:.4f} → {metrics['nll_after']:.4f}")
+    print(f"   ECE: {metrics['ece_before']:.4f} → {metrics['ece_after']:.4f}")
+    print(f"   Check-slice ECE ({metrics['holdout_samples']} samples): "
+          f"{metrics['holdout_ece_identity']:.4f} → {metrics['holdout_ece_calibrated']:.4f}")
+    if not accepted:
+        print("   ⚠️ Calibration does not beat identity on the check slice; serving raw probabilities")
+        calibration = None
+    
+    # Risk levels: label mapping plus thresholds on the (served) high-risk probability
+    risk_policy = build_risk_policy(ensemble.label_encoder.classes_,
+                                    apply_calibration(ensemble_proba, calibration), engine.y_encoded,
+                                    calibrated=calibration is not None)
+    print(f"\n🚦 RISK POLICY:")
+    for label, code in zip(risk_policy.classes, risk_policy.label_risk):
+        print(f"   {label} → {['LOW', 'MEDIUM', 'HIGH'][code]}")
+    if risk_policy.uses_thresholds:
+        print(f"   Thresholds on P(high-risk class): MEDIUM ≥ {risk_policy.medium_threshold:.4f}, "
+              f"HIGH ≥ {risk_policy.high_threshold:.4f}")
+        print(f"   Calibration-split assignment: {risk_policy.metrics['assigned']}")
+    elif 'rejected' in risk_policy.metrics:
+        print(f"   ⚠️ Fitted thresholds rejected ({risk_policy.metrics['rejected']}); using the label mapping")
+    
+    return calibration, risk_policy
+
+def save_serving_artifacts(models_dir, calibration, risk_policy):
+    """
+    Write calibration.pkl and risk_policy.pkl; a rejected calibration removes
+    any previous table so serving falls back to identity
+    """
+    calibration_path = os.path.join(models_dir, "calibration.pkl")
+    if calibration is not None:
+        save_calibration(calibration, calibration_path)
+    elif os.path.exists(calibration_path):
+        os.remove(calibration_path)
+    
+    if risk_policy is not None:
+        save_risk_policy(risk_policy, os.path.join(models_dir, "risk_policy.pkl"))
+
+def save_training_artifacts(ensemble, feature_names, calibration=None, risk_policy=None, reference_stats=None):
     """
     Save all trained models and artifacts
     """
-    models_dir = "models"
+    models_dir = config.MODELS_DIR
     os.makedirs(models_dir, exist_ok=True)
     
     # Save individual models
@@ -331,6 +444,11 @@ def save_training_artifacts(ensemble, feature_names):
     with open(os.path.join(models_dir, "label_encoder.pkl"), 'wb') as f:
         pickle.dump(ensemble.label_encoder, f)
     
+    save_serving_artifacts(models_dir, calibration, risk_policy)
+    
+    if reference_stats is not None:
+        save_reference_stats(reference_stats, os.path.join(models_dir, "reference_stats.pkl"))
+    
     print("💾 All model artifacts saved successfully!")
 
 def train_ensemble_model():
@@ -344,26 +462,34 @@ def train_ensemble_model():
         # Load and preprocess data
         X, y, feature_names, df = load_and_preprocess_data()
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
+        # Split data (the calibration split is never used to fit the models)
+        X_train, X_calibration, X_test, y_train, y_calibration, y_test = split_for_calibration(X, y)
         
         print(f"\n📊 DATA SPLIT:")
         print(f"   Training samples: {X_train.shape[0]}")
+        print(f"   Calibration samples: {X_calibration.shape[0]}")
         print(f"   Testing samples: {X_test.shape[0]}")
         print(f"   Features: {X_train.shape[1]}")
         
         # Train ensemble model
         print("\n🔄 TRAINING ENSEMBLE MODEL...")
         ensemble = EnsembleModel()
-        ensemble.fit(X_train, y_train, feature_names=feature_names)
+        lr_weight, rf_weight, nb_weight = SERVING_WEIGHTS
+        ensemble.fit(X_train, y_train, feature_names=feature_names,
+                     lr_weight=lr_weight, rf_weight=rf_weight, nb_weight=nb_weight)
         
         # Evaluate model
         accuracy = evaluate_model(ensemble, X_test, y_test, feature_names)
         
+        # Calibrate the served probabilities and fit risk thresholds on the calibration
+        # split; the calibration is only kept if it helps on a slice it was not fitted on
+        calibration, risk_policy = fit_serving_calibration(ensemble, X_calibration, y_calibration)
+        
+        # Training distribution the server's drift monitor compares live traffic against
+        reference_stats = build_reference_stats(np.vstack([X_train, X_calibration]), feature_names)
+        
         # Save models
-        save_training_artifacts(ensemble, feature_names)
+        save_training_artifacts(ensemble, feature_names, calibration, risk_policy, reference_stats)
         
         # Test with sample predictions
         print("\n🧪 SAMPLE PREDICTIONS:")
@@ -405,17 +531,27 @@ def train_ensemble_model():
         traceback.print_exc()
         return None
 
-if __name__ == "__main__":
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the OJT ensemble model")
+    parser.parse_args(argv)
+
     # Train the model
     trained_ensemble = train_ensemble_model()
     
     if trained_ensemble:
         print("\n🎉 Ensemble model is ready for use!")
-        print("📁 Models saved in 'models/' directory")
+        print(f"📁 Models saved in '{config.MODELS_DIR}'")
         print("🔮 You can now use the model for predictions")
         print("\n💡 Next steps:")
-        print("   1. Run 'python scripts/predict_test.py' to test predictions")
+        print("   1. Run 'ojt-ai evaluate' to score the held-out split")
         print("   2. Use the model in your Insight Engine")
         print("   3. Integrate with your chatbot system")
-    else:
-        print("\n💥 Training failed. Please check your data file and try again.")
\ No newline at end of file
+        return 0
+    print("\n💥 Training failed. Please check your data file and try again.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Same import layout as ojt_ai_cli.py: ai_module/ (scripts.*) and the flat ollama_integration modules
+AI_MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AI_MODULE_DIR)
+sys.path.insert(1, os.path.join(AI_MODULE_DIR, "ollama_integration"))
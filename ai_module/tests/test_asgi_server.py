@@ -0,0 +1,195 @@
+# tests/test_asgi_server.py
+
+import json
+import asyncio
+import threading
+
+import pytest
+
+import asgi_server
+
+
+async def call(app, path, body, deadline_ms=None):
+    """One HTTP request through the raw ASGI app; returns (status, headers, payload)"""
+    headers = [(b"x-request-deadline-ms", str(deadline_ms).encode())] if deadline_ms is not None else []
+    scope = {"type": "http", "path": path, "method": "POST", "headers": headers}
+    messages = [{"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent[0]["status"], dict(sent[0]["headers"]), json.loads(sent[1]["body"])
+
+
+@pytest.fixture
+def release(monkeypatch):
+    """Jobs block until the returned event is set"""
+    event = threading.Event()
+
+    def blocked_predict(data):
+        event.wait(5)
+        return 200, {"echo": data}
+
+    def blocked_chat(message):
+        event.wait(5)
+        return f"re: {message}"
+
+    monkeypatch.setattr(asgi_server, "predict_job", blocked_predict)
+    monkeypatch.setattr(asgi_server, "chat_job", blocked_chat)
+    monkeypatch.setattr(asgi_server, "_warm_worker", lambda: None)
+    yield event
+    event.set()
+
+
+def make_app(max_queue=1):
+    return asgi_server.PredictionApp("thread", limits={"chat": 1, "predict": 1}, max_queue=max_queue)
+
+
+def test_full_queue_gets_429_with_retry_after(release):
+    async def scenario():
+        app = make_app(max_queue=1)
+        running = asyncio.create_task(call(app, "/predict", {"n": 1}))
+        await asyncio.sleep(0.05)
+        queued = asyncio.create_task(call(app, "/predict", {"n": 2}))
+        await asyncio.sleep(0.05)
+
+        status, headers, payload = await call(app, "/predict", {"n": 3})
+        assert status == 429
+        assert int(headers[b"retry-after"]) >= 1
+
+        release.set()
+        assert [(await task)[0] for task in (running, queued)] == [200, 200]
+        stats = app.admission["predict"].stats()
+        assert (stats["admitted"], stats["rejected"], stats["in_flight"]) == (2, 1, 0)
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_past_its_deadline_gets_504(release):
+    async def scenario():
+        app = make_app()
+        running = asyncio.create_task(call(app, "/predict", {"n": 1}))
+        await asyncio.sleep(0.05)
+
+        status, _, payload = await call(app, "/predict", {"n": 2}, deadline_ms=50)
+        assert status == 504
+        assert payload["message"] == "Request expired while queued"
+
+        release.set()
+        assert (await running)[0] == 200
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_job_keeps_its_slot_until_it_ends(release):
+    async def scenario():
+        app = make_app()
+        status, _, payload = await call(app, "/predict", {"n": 1}, deadline_ms=50)
+        assert status == 504
+        assert payload["message"] == "Request did not finish in time"
+        assert app.admission["predict"].in_flight == 1
+
+        release.set()
+        await asyncio.sleep(0.1)
+        assert app.admission["predict"].in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_chat_burst_does_not_take_predict_slots(release, monkeypatch):
+    monkeypatch.setattr(asgi_server, "predict_job", lambda data: (200, {"echo": data}))
+
+    async def scenario():
+        app = make_app(max_queue=0)
+        chat = asyncio.create_task(call(app, "/chat", {"message": "hi"}))
+        await asyncio.sleep(0.05)
+
+        assert (await call(app, "/chat", {"message": "again"}))[0] == 429
+        status, _, payload = await call(app, "/predict", {"n": 1})
+        assert (status, payload) == (200, {"echo": {"n": 1}})
+        release.set()
+        assert (await chat)[2] == {"response": "re: hi"}
+
+    asyncio.run(scenario())
+
+
+def test_predict_job_matches_the_flask_route():
+    insight_engine = pytest.importorskip("insight_engine")
+    if not insight_engine.MODELS_LOADED:
+        pytest.skip("models not trained")
+    from server import app as flask_app
+
+    snapshot = {"daily_progress_score": 82, "narrative_score": 78, "coord_eval_score": 85,
+                "partner_eval_score": 80, "attendance_days_present": 20}
+    response = flask_app.test_client().post("/predict", json=snapshot)
+    assert asgi_server.predict_job(snapshot) == (response.status_code, response.get_json())
+
+    response = flask_app.test_client().post("/predict", json={"daily_progress_score": "n/a"})
+    assert asgi_server.predict_job({"daily_progress_score": "n/a"}) == (response.status_code, response.get_json())
+
+
+def test_chat_log_skips_bad_user_id_and_runs_off_the_loop(release, monkeypatch):
+    release.set()
+    logged = []
+    monkeypatch.setattr(asgi_server, "log_chat",
+                        lambda *args: logged.append((args, threading.current_thread())))
+
+    async def scenario():
+        app = make_app()
+        assert (await call(app, "/chat", {"message": "hi", "user_id": "abc"}))[2] == {"response": "re: hi"}
+        assert (await call(app, "/chat", {"message": "hi", "user_id": 5}))[2] == {"response": "re: hi"}
+        await asyncio.sleep(0.1)
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(scenario())
+    assert [args for args, _ in logged] == [(5, "hi", "re: hi")]
+    assert logged[0][1] is not loop_thread
+
+
+def test_process_workers_hand_side_effects_back(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    effects = [("drift", {"coord": 80.0}), ("insight", 7, "model", "type", "{}", 0.9, "{}", 3)]
+    applied = []
+    monkeypatch.setattr(asgi_server, "predict_job_deferred", lambda data: (200, {"ok": True}, effects))
+    monkeypatch.setattr(asgi_server, "apply_effects", applied.append)
+
+    async def scenario():
+        app = make_app()
+        app.executor_kind = "process"
+        app.executor = ThreadPoolExecutor(max_workers=2)
+        status, _, payload = await call(app, "/predict", {"student_id": 7, "save": True})
+        await asyncio.sleep(0.1)
+        app.shutdown()
+        return status, payload
+
+    assert asyncio.run(scenario()) == (200, {"ok": True})
+    assert applied == [effects]
+
+
+def test_deferred_prediction_leaves_the_worker_queue_alone(monkeypatch):
+    insight_engine = pytest.importorskip("insight_engine")
+    if not insight_engine.MODELS_LOADED:
+        pytest.skip("models not trained")
+    import prediction_api
+    import write_behind
+
+    def no_queue():
+        raise AssertionError("a process worker must not queue rows itself")
+
+    monkeypatch.setattr(write_behind, "get_queue", no_queue)
+    snapshot = {"student_id": 7, "save": True, "daily_progress_score": 82, "narrative_score": 78,
+                "coord_eval_score": 85, "partner_eval_score": 80, "attendance_days_present": 20}
+
+    status, payload, effects = prediction_api.predict_body_deferred(snapshot)
+    assert status == 200
+    kinds = [effect[0] for effect in effects]
+    assert kinds.count("drift") == 1 and kinds.count("insight") == 1
+    insight = next(effect for effect in effects if effect[0] == "insight")
+    assert insight[1] == 7 and insight[5] == payload["prediction"]["probability"]
+    assert prediction_api._deferred is None
@@ -0,0 +1,88 @@
+# tests/test_batch_formats.py
+
+import json
+
+import numpy as np
+import pytest
+
+import batch_formats
+
+CLASSES = ["A", "B", "C", "D", "F"]
+
+
+@pytest.fixture
+def results():
+    rng = np.random.default_rng(0)
+    probabilities = rng.dirichlet(np.ones(len(CLASSES)), size=7)
+    return probabilities, probabilities.argmax(axis=1), rng.integers(0, 3, size=7)
+
+
+def test_npy_round_trip_is_a_view_of_the_body():
+    features = np.arange(12, dtype=np.float64).reshape(4, 3)
+    body = batch_formats.encode_npy(features)
+
+    array, columns = batch_formats.decode_npy(body, ["a", "b", "c"])
+    assert columns is None
+    np.testing.assert_array_equal(array, features)
+    assert not array.flags.owndata
+
+
+def test_npy_named_columns_and_sanitizing():
+    features = np.array([[1.0, np.nan], [np.inf, 4.0]])
+    body = batch_formats.encode_npy(features)
+
+    _, columns = batch_formats.decode_npy(body, ["a", "b"], column_names=["b", "a"])
+    np.testing.assert_array_equal(columns["b"], [1.0, np.inf])
+    array, _ = batch_formats.decode_npy(body, ["a", "b"])
+    np.testing.assert_array_equal(array, [[1.0, 0.0], [0.0, 4.0]])
+
+    with pytest.raises(ValueError, match="Truncated"):
+        batch_formats.decode_npy(body[:-8], ["a", "b"])
+
+
+def test_npy_results_round_trip(results):
+    body = batch_formats.encode_results("npy", *results, CLASSES)
+    array, _ = batch_formats.decode_npy(body, CLASSES)
+    np.testing.assert_array_equal(array, results[0])
+
+
+def test_arrow_round_trip(results):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    table = pa.table({"coord": [80.0, None, 90.0], "partner": pa.array([70, 75, 85], pa.int32())})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    columns, n_rows = batch_formats.decode_arrow(sink.getvalue().to_pybytes())
+    assert n_rows == 3
+    np.testing.assert_array_equal(columns.get("coord"), [80.0, np.nan, 90.0])
+    np.testing.assert_array_equal(columns.get("partner"), [70.0, 75.0, 85.0])
+    assert columns.get("missing") is None
+
+    probabilities, predicted, risk = results
+    body = batch_formats.encode_results("arrow", probabilities, predicted, risk, CLASSES)
+    decoded = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    assert json.loads(decoded.schema.metadata[b"class_labels"]) == CLASSES
+    assert decoded.column("predicted_label").to_pylist() == [CLASSES[i] for i in predicted]
+    np.testing.assert_allclose(decoded.column("probability").to_numpy(), probabilities.max(axis=1))
+    flat = decoded.column("class_probabilities").combine_chunks().flatten().to_numpy()
+    np.testing.assert_array_equal(flat.reshape(probabilities.shape), probabilities)
+
+
+def test_binary_batch_route_matches_predict_arrays():
+    insight_engine = pytest.importorskip("insight_engine")
+    if not insight_engine.MODELS_LOADED:
+        pytest.skip("models not trained")
+    from server import app as flask_app
+
+    rng = np.random.default_rng(1)
+    features = rng.uniform(50, 100, size=(20, len(insight_engine.FEATURE_NAMES)))
+    response = flask_app.test_client().post("/predict/batch", data=batch_formats.encode_npy(features),
+                                            content_type=batch_formats.NPY_MIMETYPE)
+    assert response.status_code == 200
+
+    class_labels = json.loads(response.headers[batch_formats.CLASS_LABELS_HEADER])
+    probabilities, _ = batch_formats.decode_npy(response.get_data(), class_labels)
+    np.testing.assert_allclose(probabilities, insight_engine.predict_arrays(features)[0])
@@ -0,0 +1,52 @@
+# tests/test_calibration.py
+
+import numpy as np
+
+from calibration import fit_calibration, accept_calibration, apply_calibration, expected_calibration_error
+
+
+def sample_labels(probabilities, rng):
+    """Labels drawn from the probabilities, so identity is calibrated"""
+    cumulative = probabilities.cumsum(axis=1)
+    return (rng.random((len(probabilities), 1)) > cumulative).sum(axis=1)
+
+
+def test_temperature_rows_sum_to_one_and_keep_the_ranking():
+    rng = np.random.default_rng(0)
+    probabilities = rng.dirichlet(np.ones(5), size=300)
+    # Labels always the top class: the fitted map sharpens
+    calibration = fit_calibration(probabilities, probabilities.argmax(axis=1), method="temperature")
+    assert calibration["temperature"] < 1.0
+
+    calibrated = apply_calibration(probabilities, calibration)
+    np.testing.assert_allclose(calibrated.sum(axis=1), 1.0)
+    np.testing.assert_array_equal(calibrated.argmax(axis=1), probabilities.argmax(axis=1))
+    assert calibration["metrics"]["nll_after"] < calibration["metrics"]["nll_before"]
+
+
+def test_isotonic_table_is_monotone():
+    rng = np.random.default_rng(1)
+    probabilities = rng.dirichlet(np.ones(4), size=400)
+    calibration = fit_calibration(probabilities, sample_labels(probabilities, rng), method="isotonic")
+
+    assert (np.diff(calibration["table"], axis=1) >= 0).all()
+    np.testing.assert_allclose(apply_calibration(probabilities, calibration).sum(axis=1), 1.0)
+
+
+def test_map_worse_than_identity_is_rejected():
+    rng = np.random.default_rng(2)
+    fit_probabilities = rng.dirichlet(np.ones(5), size=300)
+    overconfident = fit_calibration(fit_probabilities, fit_probabilities.argmax(axis=1))
+
+    # Check data whose raw probabilities are already calibrated
+    check_probabilities = rng.dirichlet(np.ones(5), size=2000)
+    check_labels = sample_labels(check_probabilities, rng)
+    assert not accept_calibration(overconfident, check_probabilities, check_labels)
+    metrics = overconfident["metrics"]
+    assert metrics["holdout_ece_calibrated"] > metrics["holdout_ece_identity"]
+    assert metrics["holdout_ece_identity"] == expected_calibration_error(check_probabilities, check_labels)
+
+
+def test_identity_passes_through():
+    probabilities = np.array([[0.2, 0.8]])
+    assert apply_calibration(probabilities, None) is probabilities
@@ -0,0 +1,36 @@
+# tests/test_cli.py
+
+import ojt_ai_cli as cli
+
+
+def test_every_alias_names_a_command():
+    for alias, command in cli.ALIASES.items():
+        assert alias not in cli.COMMANDS
+        assert command in cli.COMMANDS
+
+
+def test_cv_parses_as_cross_validate():
+    args = cli.build_parser().parse_args(["cv", "--folds", "3"])
+    assert cli.ALIASES.get(args.command, args.command) == "cross-validate"
+    assert args.args == ["--folds", "3"]
+
+
+def test_cross_validate_defaults_to_serving_weights():
+    from scripts.cross_validate import cross_validate
+    from scripts.train_model import SERVING_WEIGHTS
+
+    assert cross_validate.__defaults__[2] == SERVING_WEIGHTS
+
+
+def test_evaluate_scores_the_served_ensemble():
+    import insight_engine
+    from scripts.evaluate_model import ModelEvaluator
+    from scripts.train_model import SERVING_WEIGHTS
+
+    assert ModelEvaluator().weights.tolist() == list(SERVING_WEIGHTS) == insight_engine.MODEL_WEIGHTS.tolist()
+
+
+def test_install_without_the_source_tree_fails_clearly(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(cli, "AI_MODULE_DIR", str(tmp_path))
+    assert cli.main(["bench"]) == 2
+    assert "pip install -e ai_module" in capsys.readouterr().out
@@ -0,0 +1,45 @@
+# tests/test_dataset_cache.py
+
+import os
+
+from data.processing import dataset_cache
+
+
+def write_csv(path, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("a,b\n" + "".join(f"{a},{b}\n" for a, b in rows))
+
+
+def test_same_named_csvs_do_not_share_a_cache(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = str(tmp_path / "one" / "data.csv")
+    second = str(tmp_path / "two" / "data.csv")
+    write_csv(first, [(1, 2)])
+    write_csv(second, [(3, 4), (5, 6)])
+
+    for _ in range(2):
+        df_first, _ = dataset_cache.load_dataset(first, cache_dir=cache_dir)
+        df_second, _ = dataset_cache.load_dataset(second, cache_dir=cache_dir)
+        assert df_first["a"].tolist() == [1]
+        assert df_second["a"].tolist() == [3, 5]
+
+    names = os.listdir(cache_dir)
+    assert len([name for name in names if name.endswith(".meta.json")]) == 2
+    assert not [name for name in names if name.endswith(".tmp")]
+
+
+def test_schema_is_detected_once(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    csv_path = str(tmp_path / "data.csv")
+    write_csv(csv_path, [(1, 2)])
+    calls = []
+
+    def detect(df):
+        calls.append(1)
+        return {"target": "b"}
+
+    for _ in range(2):
+        _, schema = dataset_cache.load_dataset(csv_path, detect, "test", cache_dir=cache_dir)
+        assert schema == {"target": "b"}
+    assert len(calls) == 1
@@ -0,0 +1,53 @@
+# tests/test_db_pool.py
+
+import sqlite3
+
+import pytest
+
+import db
+
+
+@pytest.fixture
+def pool(tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    conn.close()
+    pool = db.ConnectionPool(path, max_size=1, acquire_timeout=0.5)
+    yield pool
+    pool.close()
+
+
+def count_rows(pool):
+    with pool.connection() as conn:
+        return conn.raw.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+
+def test_uncommitted_work_is_rolled_back_on_checkin(pool):
+    with pool.connection() as conn:
+        conn.raw.execute("INSERT INTO t VALUES (1)")
+        raw = conn.raw
+    assert not raw.in_transaction
+    assert count_rows(pool) == 0
+
+
+def test_transaction_commits(pool):
+    with pool.transaction() as conn:
+        conn.raw.execute("INSERT INTO t VALUES (1)")
+    assert count_rows(pool) == 1
+
+
+def test_connection_that_cannot_roll_back_is_discarded(pool):
+    class FailingRollback(db.PooledConnection):
+        def rollback(self):
+            raise RuntimeError("server gone")
+
+    raw, is_sqlite = db.connect(pool.dsn)
+    broken = FailingRollback(raw, is_sqlite)
+    pool._slots.acquire()
+    pool._checkin(broken)
+    assert pool._idle.empty()
+    # The slot was released, so the pool can still hand out a connection
+    with pool.connection() as conn:
+        assert conn is not broken
@@ -0,0 +1,60 @@
+# tests/test_drift.py
+
+import numpy as np
+import pytest
+
+from drift import DriftMonitor, build_reference_stats
+
+FEATURE_NAMES = ["coord", "partner"]
+
+
+@pytest.fixture
+def reference():
+    rng = np.random.default_rng(0)
+    return build_reference_stats(rng.normal(75, 10, size=(2000, 2)), FEATURE_NAMES)
+
+
+def alert_types(snapshot, feature):
+    return {alert["type"] for alert in snapshot["alerts"] if alert["feature"] == feature}
+
+
+def test_shifted_stream_alerts_once_enough_samples(reference):
+    monitor = DriftMonitor(reference, half_life=1000, min_samples=100)
+    rng = np.random.default_rng(1)
+
+    # Coordinator scores jump by four training standard deviations
+    first_alert = None
+    for n in range(1, 301):
+        monitor.observe(np.array([rng.normal(115, 10), rng.normal(75, 10)]))
+        if first_alert is None and "mean_shift" in alert_types(monitor.snapshot(), "coord"):
+            first_alert = n
+    assert first_alert is not None and first_alert <= 110
+
+    snapshot = monitor.snapshot()
+    assert snapshot["features"]["coord"]["mean"] == pytest.approx(115, abs=2)
+    assert snapshot["features"]["coord"]["std"] == pytest.approx(10, abs=2)
+    assert "psi" in alert_types(snapshot, "coord")
+    assert not alert_types(snapshot, "partner")
+
+
+def test_training_distribution_does_not_alert(reference):
+    monitor = DriftMonitor(reference, half_life=1000, min_samples=100)
+    rng = np.random.default_rng(2)
+    for x in rng.normal(75, 10, size=(1000, 2)):
+        monitor.observe(x)
+
+    snapshot = monitor.snapshot()
+    assert snapshot["alerts"] == []
+    assert snapshot["effective_samples"] == pytest.approx(1000, rel=0.5)
+
+
+def test_values_on_edges_bin_like_the_reference():
+    # Discrete scores sit exactly on the decile edges
+    X = np.repeat([60.0, 70.0, 80.0, 90.0, 100.0], 40)[:, None]
+    reference = build_reference_stats(X, ["score"])
+    assert np.isin(reference["psi_edges"][0], X).any()
+    monitor = DriftMonitor(reference, half_life=1e9, min_samples=1)
+    for value in X[:, 0]:
+        monitor.observe(np.array([value]))
+
+    assert monitor.snapshot()["features"]["score"]["psi"] == pytest.approx(0.0, abs=1e-9)
@@ -0,0 +1,90 @@
+# tests/test_evaluation_engine.py
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, precision_recall_fscore_support
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from scripts.evaluation_engine import MODEL_NAMES, EvaluationEngine, bootstrap_confusion, scores_from_confusion
+
+CLASSES = np.array(["A", "B", "C", "D", "F"])
+
+
+@pytest.fixture(scope="module")
+def engine():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(600, 5))
+    # Grades follow the mean score with noise, so every class occurs
+    y = CLASSES[np.clip(((100 - X.mean(axis=1)) / 8 + rng.normal(0, 1, 600)).astype(int), 0, 4)]
+    X_train, X_test, y_train, y_test = X[:400], X[400:], y[:400], y[400:]
+
+    scaler = StandardScaler().fit(X_train)
+    label_encoder = LabelEncoder().fit(y)
+    y_encoded = label_encoder.transform(y_train)
+    lr = LogisticRegression(max_iter=500).fit(scaler.transform(X_train), y_encoded)
+    rf = RandomForestClassifier(n_estimators=20, random_state=0).fit(X_train, y_encoded)
+    nb = GaussianNB().fit(scaler.transform(X_train), y_encoded)
+    return EvaluationEngine(lr, rf, nb, scaler, label_encoder, X_test, y_test)
+
+
+@pytest.mark.parametrize("name", MODEL_NAMES)
+def test_model_metrics_match_sklearn(engine, name):
+    result = engine.model_metrics(name)
+    y_pred = result["predictions"]
+
+    assert result["accuracy"] == pytest.approx(accuracy_score(engine.y_test, y_pred))
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        engine.y_test, y_pred, average="weighted", zero_division=0)
+    assert result["precision"] == pytest.approx(precision)
+    assert result["recall"] == pytest.approx(recall)
+    assert result["f1_score"] == pytest.approx(f1)
+    np.testing.assert_array_equal(result["confusion_matrix"],
+                                  confusion_matrix(engine.y_test, y_pred, labels=engine.classes))
+
+    expected = classification_report(engine.y_test, y_pred, labels=engine.classes,
+                                     output_dict=True, zero_division=0)
+    for key in list(engine.classes) + ["macro avg", "weighted avg"]:
+        for metric in ("precision", "recall", "f1-score", "support"):
+            assert result["classification_report"][str(key)][metric] == pytest.approx(expected[str(key)][metric])
+
+
+def test_ensemble_is_weighted_average_of_cached_probabilities(engine):
+    weights = (0.4, 0.4, 0.2)
+    expected = sum(w * engine.probabilities[name] for w, name in zip(weights, MODEL_NAMES))
+    result = engine.ensemble_metrics(weights)
+    np.testing.assert_allclose(result["probabilities"], expected)
+    assert result["accuracy"] == pytest.approx(accuracy_score(engine.y_test, engine.classes[expected.argmax(axis=1)]))
+
+
+def test_scores_zero_division_is_zero():
+    # Class 2 is never predicted and class 1 never occurs
+    cm = np.array([[3, 1, 0],
+                   [0, 0, 0],
+                   [1, 1, 0]])
+    scores = scores_from_confusion(cm)
+    assert scores["precision"][2] == 0.0
+    assert scores["recall"][1] == 0.0
+    assert np.isfinite(scores["weighted_f1"])
+
+
+def test_bootstrap_confusion_counts_every_sample():
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 5, 50)
+    predicted = np.stack([y, rng.integers(0, 5, 50)])
+    counts = bootstrap_confusion(y, predicted, 5, n_resamples=30, seed=7, batch_size=8)
+    assert counts.shape == (2, 30, 5, 5)
+    assert (counts.sum(axis=(-2, -1)) == 50).all()
+    # A perfect model stays perfect under any resample
+    assert (np.trace(counts[0], axis1=-2, axis2=-1) == 50).all()
+
+
+def test_bootstrap_interval_brackets_estimate(engine):
+    results = {name: engine.model_metrics(name) for name in MODEL_NAMES}
+    intervals = engine.bootstrap(results, n_resamples=200, seed=3, reference=MODEL_NAMES[0])
+    for name in MODEL_NAMES:
+        accuracy = intervals[name]["accuracy"]
+        assert accuracy["lower"] <= accuracy["estimate"] <= accuracy["upper"]
+    assert set(intervals["differences"]["models"]) == set(MODEL_NAMES[1:])
@@ -0,0 +1,79 @@
+# tests/test_explainer.py
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from explainer import Explainer
+
+FEATURE_NAMES = ["weekly", "narrative", "coord", "partner", "attendance"]
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(50, 100, size=(300, len(FEATURE_NAMES)))
+    y = np.digitize(X.mean(axis=1) + rng.normal(0, 3, 300), [65, 72, 80, 88])
+    label_encoder = LabelEncoder().fit(np.array(["F", "D", "C", "B", "A"])[y])
+    y_encoded = label_encoder.transform(np.array(["F", "D", "C", "B", "A"])[y])
+
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    models = {
+        "lr_model": LogisticRegression(max_iter=1000).fit(X_scaled, y_encoded),
+        "rf_model": RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y_encoded),
+        "nb_model": GaussianNB().fit(X_scaled, y_encoded),
+    }
+    explainer = Explainer(scaler=scaler, label_encoder=label_encoder, feature_names=FEATURE_NAMES,
+                          weights=[0.4, 0.4, 0.2], cache_size=4, **models)
+    return explainer, models, scaler, rng.uniform(50, 100, size=(25, len(FEATURE_NAMES)))
+
+
+def reconstructed(explainer, X, name):
+    base, contributions = explainer.contributions(X)[name]
+    return base + contributions.sum(axis=1)
+
+
+def centered(values):
+    return values - values.mean(axis=1, keepdims=True)
+
+
+def test_random_forest_contributions_add_up_to_predict_proba(fitted):
+    explainer, models, _, X = fitted
+    np.testing.assert_allclose(reconstructed(explainer, X, "Random Forest"),
+                               models["rf_model"].predict_proba(X), atol=1e-12)
+
+
+def test_logistic_contributions_add_up_to_centered_logit(fitted):
+    explainer, models, scaler, X = fitted
+    logits = models["lr_model"].decision_function(scaler.transform(X))
+    np.testing.assert_allclose(reconstructed(explainer, X, "Logistic Regression"), centered(logits), atol=1e-12)
+
+
+def test_naive_bayes_contributions_add_up_to_centered_joint_log_likelihood(fitted):
+    explainer, models, scaler, X = fitted
+    joint = models["nb_model"].predict_joint_log_proba(scaler.transform(X))
+    np.testing.assert_allclose(reconstructed(explainer, X, "Naive Bayes"), centered(joint), atol=1e-9)
+
+
+def test_cached_rows_are_not_recomputed(fitted, monkeypatch):
+    explainer, _, _, X = fitted
+    explainer._cache.clear()
+    first = explainer.explain_batch(X[:3], [0, 1, 2])
+
+    computed = []
+    original = explainer._explain_rows
+    monkeypatch.setattr(explainer, "_explain_rows", lambda rows, classes: computed.append(len(rows)) or
+                        original(rows, classes))
+
+    again = explainer.explain_batch(X[:4], [0, 1, 2, 3])
+    assert all(a is b for a, b in zip(again[:3], first))
+    assert computed == [1]
+
+    # A different class for the same row is its own entry; the oldest is evicted at capacity
+    explainer.explain_batch(X[:1], [4])
+    assert explainer.cache_info() == {"size": 4, "capacity": 4}
+    assert explainer.explain_batch(X[:1], [0])[0] is not first[0]
@@ -0,0 +1,81 @@
+# tests/test_feature_store.py
+
+from datetime import date, timedelta
+
+import pytest
+
+import feature_store
+
+FEATURE_NAMES = [
+    "Practicum Narrative Report (Score)",
+    "Practicum Coordinator Evaluation (Score)",
+    "Attendance (Days Present out of 25)",
+]
+
+
+def attendance(attendance_id, day, hours, **extra):
+    return {"type": "attendance", "attendance_id": attendance_id, "student_id": 7,
+            "date": day, "hours": hours, **extra}
+
+
+def evaluation(eval_id, score, role="Coordinator", **extra):
+    return {"type": "evaluation", "eval_id": eval_id, "student_id": 7,
+            "score": score, "evaluator_role": role, **extra}
+
+
+@pytest.fixture
+def store():
+    return feature_store.FeatureStore(feature_names=FEATURE_NAMES)
+
+
+def test_out_of_order_days_are_all_counted(store):
+    store.apply_events([attendance(2, "2025-01-16", 8), attendance(1, "2025-01-15", 6)])
+
+    snapshot = store.get_snapshot(7)
+    assert snapshot["attendance_days_present"] == 2
+    assert snapshot["total_hours_completed"] == 14
+
+
+def test_replayed_and_edited_events_replace_the_row(store):
+    store.apply_events([attendance(1, "2025-01-15", 4), evaluation(1, 80)])
+    store.apply_events([attendance(1, "2025-01-15", 4), evaluation(1, 80)])
+    store.apply_events([attendance(1, "2025-01-15", 8), evaluation(1, 90), evaluation(2, 70, "Supervisor")])
+
+    snapshot = store.get_snapshot(7)
+    assert snapshot["attendance_days_present"] == 1
+    assert snapshot["total_hours_completed"] == 8
+    assert snapshot["coord_eval_score"] == 90
+    assert snapshot["partner_eval_score"] == 70
+    assert snapshot["narrative_score"] == 80
+    assert store.get_features(7).tolist() == [80, 90, 1]
+
+
+def test_deleted_rows_are_taken_out(store):
+    store.apply_events([attendance(1, "2025-01-15", 8), attendance(2, "2025-01-15", 2), evaluation(1, 80)])
+    store.apply_events([attendance(2, "2025-01-15", 2, deleted=True), evaluation(1, 80, deleted=True)])
+
+    snapshot = store.get_snapshot(7)
+    assert snapshot["attendance_days_present"] == 1
+    assert snapshot["total_hours_completed"] == 8
+    assert snapshot["narrative_score"] == 0
+
+
+def test_day_rolls_on_read(store):
+    today = date.today()
+    store.apply_events([attendance(1, today.isoformat(), 5)])
+    assert store.get_snapshot(7)["attendance_today_hours"] == 5
+
+    # Yesterday's view of the store: today's row is not "today" yet, and no
+    # write arrives after midnight; the next read must still pick it up
+    store._today = (today - timedelta(days=1)).toordinal()
+    store._aggregates[store._row_of[7], feature_store.TODAY_HOURS] = 0.0
+    assert store.get_snapshot(7)["attendance_today_hours"] == 5
+
+    store._today = (today - timedelta(days=1)).toordinal()
+    store._days[7] = {}
+    assert store.get_snapshot(7)["attendance_today_hours"] == 0
+
+
+def test_unknown_event_type_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.apply_events([{"type": "report", "student_id": 7}])
@@ -0,0 +1,68 @@
+# tests/test_grpc_service.py
+
+import queue
+import threading
+
+import grpc_service
+
+
+def echo_predict(snapshots):
+    return [{"n": snapshot["n"]} for snapshot in snapshots]
+
+
+def filled(*items, maxsize=0):
+    pending = queue.Queue(maxsize=maxsize)
+    for item in items:
+        pending.put(item)
+    return pending
+
+
+def test_next_batch_takes_what_arrived_up_to_max_batch():
+    pending = filled(1, 2, 3, 4, 5, grpc_service._END)
+
+    assert grpc_service.next_batch(pending, max_batch=3, linger=0) == ([1, 2, 3], False)
+    assert grpc_service.next_batch(pending, max_batch=3, linger=0) == ([4, 5], True)
+
+
+def test_next_batch_lingers_for_late_messages():
+    pending = filled(1)
+    threading.Timer(0.02, pending.put, args=(2,)).start()
+
+    assert grpc_service.next_batch(pending, max_batch=10, linger=0.5) == ([1, 2], False)
+    assert grpc_service.next_batch(filled(grpc_service._END), 10, 0) == ([], True)
+
+
+def test_score_messages_keeps_order_around_bad_messages(monkeypatch):
+    monkeypatch.setattr(grpc_service.insight_engine, "batch_predict", echo_predict)
+    messages = [{"id": "a", "n": 0}, None, {"id": "b", "n": 2}, [1], {"id": "c", "n": 4}]
+
+    responses = grpc_service.score_messages(messages, first_seq=10)
+    assert [response["seq"] for response in responses] == [10, 11, 12, 13, 14]
+    assert [response.get("id") for response in responses] == ["a", None, "b", None, "c"]
+    assert [response["prediction"]["n"] for response in responses if "prediction" in response] == [0, 2, 4]
+    assert "error" in responses[1] and "error" in responses[3]
+
+
+def test_score_messages_reports_a_failed_batch_per_message(monkeypatch):
+    def failing_predict(snapshots):
+        raise ValueError("Models not loaded")
+
+    monkeypatch.setattr(grpc_service.insight_engine, "batch_predict", failing_predict)
+    responses = grpc_service.score_messages([{"id": "a"}, {"id": "b"}])
+    assert [(response["seq"], response["error"]) for response in responses] == \
+        [(0, "Models not loaded"), (1, "Models not loaded")]
+
+
+class ActiveContext:
+    def is_active(self):
+        return True
+
+
+def test_stream_responses_follow_request_order(monkeypatch):
+    monkeypatch.setattr(grpc_service.insight_engine, "batch_predict", echo_predict)
+    service = grpc_service.PredictionService(max_batch=4, linger_ms=1, stream_buffer=2)
+
+    requests = ({"id": n, "n": n} for n in range(25))
+    responses = list(service.predict_stream(requests, ActiveContext()))
+    assert [response["seq"] for response in responses] == list(range(25))
+    assert [response["prediction"]["n"] for response in responses] == list(range(25))
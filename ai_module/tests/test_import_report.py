@@ -0,0 +1,13 @@
+# tests/test_import_report.py
+
+import importlib
+
+import pytest
+
+from scripts.import_report import ENTRY_POINTS
+
+
+@pytest.mark.parametrize("name", list(ENTRY_POINTS))
+def test_entry_point_module_exists(name):
+    module, _, _ = ENTRY_POINTS[name]
+    importlib.import_module(module)
@@ -0,0 +1,73 @@
+# tests/test_insight_engine.py
+
+import numpy as np
+import pytest
+
+import insight_engine
+from insight_engine import SNAPSHOT_FIELD_ALIASES, SNAPSHOT_FIELD_BY_FEATURE, compile_snapshot_columns
+
+needs_models = pytest.mark.skipif(not insight_engine.MODELS_LOADED, reason="models not trained")
+
+FEATURES = list(SNAPSHOT_FIELD_BY_FEATURE)
+BACKEND = {"daily_progress_score": 82, "narrative_score": 78, "coord_eval_score": 85,
+           "partner_eval_score": 80, "attendance_days_present": 20}
+FIELD_ALIAS = {field: alias for alias, field in SNAPSHOT_FIELD_ALIASES.items()}
+
+
+def test_columns_accept_the_backend_field_then_its_aliases():
+    # Reversed order and a feature without a snapshot field
+    order = ["Unrelated"] + FEATURES[::-1]
+    columns = dict(compile_snapshot_columns(order))
+    assert 0 not in columns
+    for column, feature in enumerate(order[1:], start=1):
+        field = SNAPSHOT_FIELD_BY_FEATURE[feature]
+        assert columns[column] == (field, FIELD_ALIAS[field])
+
+
+@needs_models
+def test_alias_keys_match_backend_keys():
+    aliased = {FIELD_ALIAS[field]: value for field, value in BACKEND.items()}
+    matrix = insight_engine.snapshot_matrix([BACKEND, aliased])
+    np.testing.assert_array_equal(matrix[0], matrix[1])
+    assert matrix[0].tolist() == [BACKEND[SNAPSHOT_FIELD_BY_FEATURE[name]]
+                                  for name in insight_engine.FEATURE_NAMES]
+
+
+@needs_models
+def test_missing_and_invalid_values_become_zero():
+    column = {SNAPSHOT_FIELD_BY_FEATURE[name]: i for i, name in enumerate(insight_engine.FEATURE_NAMES)}
+    snapshot = dict(BACKEND, daily_progress_score=None, narrative_score="nan", coord_eval_score="n/a",
+                    partner_eval_score=float("inf"), attendance_days_present="19")
+    row = insight_engine.snapshot_matrix([snapshot])[0]
+
+    assert row[column["daily_progress_score"]] == 0.0
+    assert row[column["narrative_score"]] == 0.0
+    assert row[column["coord_eval_score"]] == 0.0
+    assert row[column["partner_eval_score"]] == 0.0
+    assert row[column["attendance_days_present"]] == 19.0
+
+    # None falls through to the alias
+    fallback = insight_engine.snapshot_matrix([{"daily_progress_score": None, "weekly_progress": 70}])[0]
+    assert fallback[column["daily_progress_score"]] == 70.0
+
+
+@needs_models
+def test_batch_predict_matches_per_row_predict_arrays():
+    rng = np.random.default_rng(0)
+    snapshots = [{field: float(value) for field, value in zip(BACKEND, rng.uniform(50, 100, len(BACKEND)))}
+                 for _ in range(40)]
+    # Mix the key schemas within one batch
+    for snapshot in snapshots[::3]:
+        for field in list(snapshot):
+            snapshot[FIELD_ALIAS[field]] = snapshot.pop(field)
+
+    batch = insight_engine.batch_predict(snapshots)
+    assert len(batch) == len(snapshots)
+    for snapshot, result in zip(snapshots, batch):
+        row = insight_engine.snapshot_vector(snapshot)
+        expected = insight_engine.PRIMARY_BUNDLE.results_from_arrays(*insight_engine.predict_arrays(row))[0]
+        assert result["predicted_label"] == expected["predicted_label"]
+        assert result["risk_level"] == expected["risk_level"]
+        assert result["probability"] == pytest.approx(expected["probability"])
+
+    assert insight_engine.batch_predict([]) == []
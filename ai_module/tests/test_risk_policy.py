@@ -0,0 +1,60 @@
+# tests/test_risk_policy.py
+
+import numpy as np
+
+import risk_policy
+from risk_policy import RiskPolicy, build_risk_policy, LOW, MEDIUM, HIGH
+
+CLASSES = ["A", "B", "C", "D", "F"]
+
+
+def test_label_mapping():
+    policy = build_risk_policy(CLASSES)
+    assert policy.label_risk.tolist() == [LOW, LOW, MEDIUM, HIGH, HIGH]
+    assert not policy.uses_thresholds
+
+
+def test_confident_a_is_never_high():
+    # Thresholds so low that any high-risk mass would be HIGH without the cap
+    policy = RiskPolicy(CLASSES, build_risk_policy(CLASSES).label_risk, 0.01, 0.02)
+    probabilities = np.array([[0.90, 0.02, 0.02, 0.03, 0.03]])
+    assert policy.assign(probabilities).tolist() == [LOW]
+
+
+def test_thresholds_only_lower_the_label_level():
+    policy = RiskPolicy(CLASSES, build_risk_policy(CLASSES).label_risk, 0.3, 0.6)
+    rng = np.random.default_rng(0)
+    probabilities = rng.dirichlet(np.ones(len(CLASSES)), size=500)
+    predicted = probabilities.argmax(axis=1)
+
+    codes = policy.assign(probabilities, predicted)
+    assert (codes <= policy.label_risk[predicted]).all()
+
+    # Monotone in the high-risk mass for a fixed predicted label
+    d_rows = np.flatnonzero(predicted == CLASSES.index("D"))
+    order = d_rows[np.argsort(policy.risk_scores(probabilities[d_rows]))]
+    assert (np.diff(codes[order]) >= 0).all()
+
+
+def test_noise_thresholds_are_rejected():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, len(CLASSES), size=400)
+    probabilities = rng.dirichlet(np.ones(len(CLASSES)), size=400)
+
+    policy = build_risk_policy(CLASSES, probabilities, y)
+    assert not policy.uses_thresholds
+    assert "rejected" in policy.metrics
+
+
+def test_separating_thresholds_are_kept():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, len(CLASSES), size=400)
+    high = np.isin(y, [3, 4])
+    # High-risk students carry most of their mass on D/F, others little
+    mass = np.where(high, rng.uniform(0.6, 0.9, 400), rng.uniform(0.0, 0.3, 400))
+    probabilities = np.column_stack([(1 - mass) / 3] * 3 + [mass / 2] * 2)
+
+    policy = build_risk_policy(CLASSES, probabilities, y)
+    assert policy.uses_thresholds
+    assert policy.metrics["high_youden_j"] >= risk_policy.MIN_YOUDEN_J
+    assert policy.high_threshold - policy.medium_threshold >= risk_policy.MIN_BAND_WIDTH
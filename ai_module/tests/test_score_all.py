@@ -0,0 +1,71 @@
+# tests/test_score_all.py
+
+import sqlite3
+
+import pytest
+
+import insight_engine
+from scripts import score_all
+
+pytestmark = pytest.mark.skipif(not insight_engine.MODELS_LOADED, reason="models not trained")
+
+SCHEMA = """
+    CREATE TABLE users (user_id INTEGER PRIMARY KEY, role TEXT);
+    CREATE TABLE ojt_records (student_id INTEGER, status TEXT);
+    CREATE TABLE evaluations (student_id INTEGER, supervisor_id INTEGER, total_score REAL);
+    CREATE TABLE attendance (student_id INTEGER, date TEXT, total_hours REAL);
+    CREATE TABLE ai_insights (
+        insight_id INTEGER PRIMARY KEY AUTOINCREMENT, student_id INTEGER, model_name TEXT,
+        insight_type TEXT, result TEXT, confidence REAL, input_data TEXT
+    );
+"""
+N_STUDENTS = 10
+
+
+@pytest.fixture
+def dsn(tmp_path):
+    path = str(tmp_path / "ojt.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute("INSERT INTO users VALUES (1000, 'Coordinator')")
+    for student_id in range(1, N_STUDENTS + 1):
+        conn.execute("INSERT INTO users VALUES (?, 'Student')", (student_id,))
+        conn.execute("INSERT INTO ojt_records VALUES (?, 'Ongoing')", (student_id,))
+        conn.execute("INSERT INTO evaluations VALUES (?, 1000, ?)", (student_id, 60 + 3 * student_id))
+        conn.execute("INSERT INTO attendance VALUES (?, '2024-01-01', 8)", (student_id,))
+    conn.commit()
+    conn.close()
+    return path
+
+
+def insight_student_ids(dsn):
+    conn = sqlite3.connect(dsn)
+    ids = [row[0] for row in conn.execute("SELECT student_id FROM ai_insights ORDER BY student_id")]
+    conn.close()
+    return ids
+
+
+def test_resume_after_crash_scores_each_student_once(dsn, monkeypatch):
+    real_write = score_all.write_insights
+    calls = []
+
+    def crash_on_third_chunk(conn, placeholder, records):
+        calls.append(len(records))
+        real_write(conn, placeholder, records)
+        if len(calls) == 3:
+            # Dies after the inserts, before the chunk is committed
+            raise RuntimeError("killed")
+
+    monkeypatch.setattr(score_all, "write_insights", crash_on_third_chunk)
+    with pytest.raises(RuntimeError):
+        score_all.score_all(dsn=dsn, chunk_size=3)
+    assert insight_student_ids(dsn) == list(range(1, 7))
+
+    monkeypatch.setattr(score_all, "write_insights", real_write)
+    summary = score_all.score_all(dsn=dsn, chunk_size=3)
+    assert summary["scored"] == N_STUDENTS
+    assert insight_student_ids(dsn) == list(range(1, N_STUDENTS + 1))
+
+    # Finished runs are not resumed; the next run starts from the beginning
+    score_all.score_all(dsn=dsn, chunk_size=3)
+    assert len(insight_student_ids(dsn)) == 2 * N_STUDENTS
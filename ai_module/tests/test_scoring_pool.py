@@ -0,0 +1,75 @@
+# tests/test_scoring_pool.py
+
+import os
+import signal
+
+import numpy as np
+import pytest
+
+import insight_engine
+import scoring_pool
+
+pytestmark = pytest.mark.skipif(not insight_engine.MODELS_LOADED, reason="models not trained")
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = scoring_pool.ScoringPool(model_dir=insight_engine.MODEL_DIR, workers=2, shard_rows=50)
+    pool.warm_up()
+    yield pool
+    pool.shutdown(wait=False)
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(0)
+    return rng.uniform(50, 100, size=(301, len(insight_engine.FEATURE_NAMES)))
+
+
+def assert_same_results(actual, expected):
+    np.testing.assert_allclose(actual[0], expected[0])
+    np.testing.assert_array_equal(actual[1], expected[1])
+    np.testing.assert_array_equal(actual[2], expected[2])
+
+
+def test_shards_cover_rows_in_order(pool):
+    shards = pool.shards(301)
+    assert shards[0][0] == 0 and shards[-1][1] == 301
+    assert all(stop == start for (_, stop), (start, _) in zip(shards, shards[1:]))
+
+
+def test_pool_keeps_row_order(pool, features):
+    expected = insight_engine.PRIMARY_BUNDLE.predict_arrays(features)
+    actual = pool.predict_arrays(features, len(insight_engine.PRIMARY_BUNDLE.risk_policy.classes))
+    assert_same_results(actual, expected)
+
+
+def test_dead_worker_falls_back_inline_and_restarts(monkeypatch, features):
+    broken = scoring_pool.ScoringPool(model_dir=insight_engine.MODEL_DIR, workers=1, shard_rows=50)
+    broken.warm_up()
+    for process in list(broken.executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+    monkeypatch.setattr(scoring_pool, "_pool", broken)
+    bundle = insight_engine.PRIMARY_BUNDLE
+
+    # The batch in flight is scored in this process and the broken pool is dropped
+    assert_same_results(scoring_pool.predict_arrays(features, bundle), bundle.predict_arrays(features))
+    assert scoring_pool._pool is None
+
+    # The next batch asks for a fresh pool instead of failing on the broken one
+    restarted = []
+    monkeypatch.setattr(scoring_pool, "ScoringPool", lambda: restarted.append(1) or FakePool())
+    scoring_pool.predict_arrays(features, bundle)
+    assert restarted == [1]
+
+
+class FakePool:
+    def warm_up(self):
+        pass
+
+    def shutdown(self, wait=True):
+        pass
+
+    def predict_arrays(self, feature_array, n_classes):
+        return insight_engine.PRIMARY_BUNDLE.predict_arrays(feature_array)
@@ -0,0 +1,66 @@
+# tests/test_shadow.py
+
+import os
+import time
+import signal
+
+import pytest
+
+import insight_engine
+import shadow
+
+pytestmark = pytest.mark.skipif(not insight_engine.MODELS_LOADED, reason="models not trained")
+
+FEATURES = {
+    "Weekly Progress Report (Score)": 82.0,
+    "Practicum Narrative Report (Score)": 78.0,
+    "Practicum Coordinator Evaluation (Score)": 85.0,
+    "Practicum Partner Supervisor Evaluation (Score)": 80.0,
+    "Attendance (Days Present out of 25)": 90.0,
+}
+
+
+def wait_for(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def evaluator():
+    evaluator = shadow.ShadowEvaluator(insight_engine.MODEL_DIR, sample_rate=1.0)
+    yield evaluator
+    evaluator.shutdown(wait=False)
+
+
+def primary_result():
+    bundle = insight_engine.PRIMARY_BUNDLE
+    return bundle.predict_performance_batch(bundle.feature_vector(FEATURES))[0]
+
+
+def test_candidate_scores_in_a_worker_process(evaluator):
+    assert evaluator.submit(FEATURES, primary_result(), 0.001)
+    wait_for(lambda: evaluator.stats()["compared"] == 1)
+
+    stats = evaluator.stats()
+    # Same models on both sides
+    assert stats["label_agreement"] == 1.0
+    assert stats["mean_total_variation"] == pytest.approx(0.0, abs=1e-9)
+    assert stats["candidate_latency"]["p50_ms"] > 0
+    worker_pids = [process.pid for process in evaluator._executor._processes.values()]
+    assert worker_pids and os.getpid() not in worker_pids
+
+
+def test_dead_worker_is_replaced(evaluator):
+    for process in list(evaluator._executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+    # Samples during the restart are counted as errors, never raised to the request
+    evaluator.submit(FEATURES, primary_result())
+    wait_for(lambda: evaluator.stats()["errors"] >= 1 and not evaluator._restarting)
+
+    assert evaluator.submit(FEATURES, primary_result())
+    wait_for(lambda: evaluator.stats()["compared"] == 1)
+    assert evaluator.stats()["pending"] == 0
@@ -0,0 +1,79 @@
+# tests/test_tracing.py
+
+import json
+
+import pytest
+from flask import Flask
+
+import tracing
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def test_parse_traceparent():
+    assert tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert tracing.parse_traceparent(f"00-{TRACE_ID.upper()}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+    for header in (None, "", "garbage", f"ff-{TRACE_ID}-{PARENT_ID}-01",
+                   f"00-{'0' * 32}-{PARENT_ID}-01", f"00-{TRACE_ID}-{'0' * 16}-01", f"00-{TRACE_ID}-{PARENT_ID}"):
+        assert tracing.parse_traceparent(header) is None
+
+
+def test_malformed_header_starts_a_new_trace():
+    trace = tracing.Trace("GET /", "00-not-a-trace-01")
+    assert trace.parent_span_id is None and trace.sampled
+    assert trace.trace_id != TRACE_ID and len(trace.trace_id) == 32
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    tracing.install(app)
+
+    @app.route("/work")
+    def work():
+        with tracing.span("features"):
+            with tracing.span("predict"):
+                pass
+        return "ok"
+
+    return app.test_client()
+
+
+def test_request_continues_the_callers_trace(client):
+    response = client.get("/work", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+    version, trace_id, span_id, flags = response.headers["traceresponse"].split("-")
+    assert (version, trace_id, flags) == ("00", TRACE_ID, "01")
+    assert span_id != PARENT_ID
+
+    fresh = client.get("/work", headers={"traceparent": "nonsense"}).headers["traceresponse"]
+    assert fresh.split("-")[1] != TRACE_ID
+
+
+def test_server_timing_lists_stages_and_total(client):
+    header = client.get("/work").headers["Server-Timing"]
+    names = [metric.split(";")[0] for metric in header.split(", ")]
+    assert names == ["predict", "features", "total"]
+    assert all(";dur=" in metric for metric in header.split(", "))
+
+
+def test_file_exporter_writes_one_json_line_per_span(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    exporter = tracing.SpanExporter("file", path=str(path))
+
+    trace = tracing.start_trace("POST /predict", f"00-{TRACE_ID}-{PARENT_ID}-01")
+    with tracing.span("parse"):
+        with tracing.span("predict", rows=1):
+            pass
+    tracing.end_trace(trace)
+    assert exporter.export(trace)
+    exporter.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["name"] for record in records] == ["POST /predict", "predict", "parse"]
+    assert {record["trace_id"] for record in records} == {TRACE_ID}
+    root, predict, parse = records
+    assert root["parent_span_id"] == PARENT_ID
+    assert parse["parent_span_id"] == root["span_id"] and predict["parent_span_id"] == parse["span_id"]
+    assert predict["attributes"] == {"rows": 1}
+    assert all("root" not in record for record in records)
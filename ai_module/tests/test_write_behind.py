@@ -0,0 +1,127 @@
+# tests/test_write_behind.py
+
+import time
+from contextlib import contextmanager
+
+import write_behind
+
+
+class FakeConnection:
+    """Stages rows until commit; rejects chat logs for unknown users like the foreign key would"""
+
+    def __init__(self, db):
+        self.db = db
+        self.staged = []
+
+    def execute_many(self, kind, rows):
+        for params in rows:
+            if kind == write_behind.CHAT_LOG and params[0] < 0:
+                raise ValueError("violates foreign key constraint chatbot_logs_user_id_fkey")
+            self.staged.append((kind, params))
+
+    def commit(self):
+        self.db.committed.extend(self.staged)
+        self.db.commits += 1
+        self.staged = []
+
+    def rollback(self):
+        self.staged = []
+
+
+class FakePool:
+    def __init__(self, reachable=True):
+        self.committed = []
+        self.commits = 0
+        self.reachable = reachable
+
+    @contextmanager
+    def connection(self):
+        if not self.reachable:
+            raise ConnectionError("database unreachable")
+        conn = FakeConnection(self)
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            yield conn
+            conn.commit()
+
+
+def make_queue(pool, **kwargs):
+    kwargs.setdefault("flush_interval", 5.0)
+    return write_behind.WriteBehindQueue(pool_factory=lambda: pool, **kwargs)
+
+
+def test_bad_chat_log_does_not_drop_insights():
+    pool = FakePool()
+    queue = make_queue(pool, batch_size=100)
+    for student_id in range(5):
+        queue.enqueue_insight(student_id, "model", "daily_risk_prediction", "{}", 0.5, "{}", 3)
+    queue.enqueue_chat_log(-1, "hi", "hello")
+    queue.enqueue_chat_log(7, "hi", "hello")
+    assert queue.flush(timeout=2.0)
+    queue.close()
+
+    kinds = [kind for kind, _ in pool.committed]
+    assert kinds.count(write_behind.INSIGHT) == 5
+    assert [params[0] for kind, params in pool.committed if kind == write_behind.CHAT_LOG] == [7]
+    assert queue.stats()["written"] == 6
+    assert queue.stats()["dropped"] == 1
+
+
+def test_flush_does_not_wait_for_flush_interval():
+    pool = FakePool()
+    queue = make_queue(pool, batch_size=100, flush_interval=30.0)
+    queue.enqueue_chat_log(1, "hi", "hello")
+    start = time.monotonic()
+    assert queue.flush(timeout=5.0)
+    assert time.monotonic() - start < 1.0
+    assert len(pool.committed) == 1
+    queue.close()
+
+
+def test_unreachable_database_drops_batch_and_keeps_writer_alive():
+    pool = FakePool(reachable=False)
+    queue = make_queue(pool, batch_size=100, flush_interval=0.05)
+    queue.enqueue_chat_log(1, "hi", "hello")
+    assert queue.flush(timeout=2.0)
+    assert queue.stats()["dropped"] == 1
+    assert queue.stats()["failed_batches"] == 1
+
+    pool.reachable = True
+    queue.enqueue_chat_log(2, "hi", "hello")
+    assert queue.flush(timeout=3.0)
+    assert [params[0] for _, params in pool.committed] == [2]
+    queue.close()
+
+
+def test_parse_user_id():
+    assert write_behind.parse_user_id(7) == 7
+    assert write_behind.parse_user_id("12") == 12
+    for value in (None, "abc", "1.5", 2.0, True, [], ""):
+        assert write_behind.parse_user_id(value) is None
+
+
+def test_chat_reply_survives_a_bad_user_id(monkeypatch):
+    import server
+
+    logged = []
+
+    class Queue:
+        def enqueue_chat_log(self, *args):
+            logged.append(args)
+
+    monkeypatch.setattr(server, "chatbot_response", lambda message: f"re: {message}")
+    monkeypatch.setattr(write_behind, "get_queue", Queue)
+    client = server.app.test_client()
+
+    response = client.post("/chat", json={"message": "hi", "user_id": "not-a-number"})
+    assert response.get_json() == {"response": "re: hi"}
+    assert logged == []
+
+    client.post("/chat", json={"message": "hi", "user_id": "5"})
+    assert logged == [(5, "hi", "re: hi")]
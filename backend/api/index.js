@@ -1,6 +1,7 @@
 const express = require('express');
 const cors = require('cors');
 const bodyParser = require('body-parser');
+const crypto = require('crypto');
 require('dotenv').config({ path: './config/env/.env' });
 
 const app = express();
@@ -38,19 +39,38 @@ const corsOptions = {
   },
   credentials: true,
   methods: ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-  allowedHeaders: ['Content-Type', 'Authorization', 'X-Requested-With'],
+  allowedHeaders: ['Content-Type', 'Authorization', 'X-Requested-With', 'traceparent'],
+  exposedHeaders: ['traceresponse', 'Server-Timing'],
 };
 
 app.use(cors(corsOptions));
 app.use(bodyParser.json());
 app.use(bodyParser.urlencoded({ extended: true }));
 
+// W3C Trace Context: continue the caller's trace or start one, so calls to the
+// Flask AI module (traceparent header) can be correlated with this request
+const TRACEPARENT_PATTERN = /^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$/;
+
+app.use('/api', (req, res, next) => {
+  const incoming = TRACEPARENT_PATTERN.exec((req.headers.traceparent || '').trim().toLowerCase());
+  req.trace = {
+    traceId: incoming ? incoming[1] : crypto.randomBytes(16).toString('hex'),
+    spanId: crypto.randomBytes(8).toString('hex'),
+    flags: incoming ? incoming[3] : '01',
+  };
+  // traceparent for an outgoing call: a fresh child span of this request
+  req.trace.childTraceparent = () =>
+    `00-${req.trace.traceId}-${crypto.randomBytes(8).toString('hex')}-${req.trace.flags}`;
+  res.setHeader('traceresponse', `00-${req.trace.traceId}-${req.trace.spanId}-${req.trace.flags}`);
+  next();
+});
+
 // API Response Time Logging Middleware
 app.use('/api', (req, res, next) => {
   const start = Date.now();
   
   // Log request
-  console.log(`[${new Date().toISOString()}] ${req.method} ${req.originalUrl}`);
+  console.log(`[${new Date().toISOString()}] ${req.method} ${req.originalUrl} trace=${req.trace.traceId}`);
   
   // Capture response finish event
   res.on('finish', () => {
@@ -59,7 +79,7 @@ app.use('/api', (req, res, next) => {
                        res.statusCode >= 400 ? '🟡' : '🟢';
     
     console.log(
-      `${statusColor} [API] ${req.method} ${req.originalUrl} -> ${res.statusCode} (${duration}ms)`
+      `${statusColor} [API] ${req.method} ${req.originalUrl} -> ${res.statusCode} (${duration}ms) trace=${req.trace.traceId}`
     );
   });
   
@@ -1,6 +1,7 @@
 const express = require('express');
 const router = express.Router();
 const { query } = require('../../config/db');
+const { publishAttendance } = require('../../config/featureEvents');
 
 // Get all attendance records
 router.get('/', async (req, res) => {
@@ -201,6 +202,8 @@ router.post('/time-in', async (req, res) => {
       [attendanceId]
     );
     
+    publishAttendance(attendanceId, req.trace);
+
     res.status(201).json({
       message: 'Time in recorded successfully',
       attendance: attendanceResult.rows[0].attendance
@@ -335,6 +338,8 @@ router.put('/time-out', async (req, res) => {
       [attendanceId]
     );
     
+    publishAttendance(attendanceId, req.trace);
+
     res.json({
       message: 'Time out recorded successfully',
       attendance: attendanceResult.rows[0].attendance
@@ -1,6 +1,7 @@
 const express = require('express');
 const router = express.Router();
 const { query } = require('../../config/db');
+const { publishEvaluation } = require('../../config/featureEvents');
 
 // Get all evaluations
 router.get('/', async (req, res) => {
@@ -66,6 +67,8 @@ router.post('/', async (req, res) => {
         [response.eval_id]
       );
       
+      publishEvaluation(response.eval_id, req.trace);
+
       res.status(201).json({
         message: 'Evaluation created successfully',
         evaluation: evalResult.rows[0].evaluation
@@ -108,6 +111,8 @@ router.put('/:id', async (req, res) => {
         [id]
       );
       
+      publishEvaluation(id, req.trace);
+
       res.json({
         message: 'Evaluation updated successfully',
         evaluation: evalResult.rows[0].evaluation
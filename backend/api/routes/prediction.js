@@ -250,13 +250,21 @@ router.get('/daily/:studentId', async (req, res) => {
     const flaskUrl = process.env.FLASK_AI_URL || 'http://localhost:5000';
     
     let aiRes;
+    const aiStart = Date.now();
     try {
       aiRes = await axios.post(`${flaskUrl}/predict`, payload, {
         timeout: 10000, // 10 second timeout
         headers: {
-          'Content-Type': 'application/json'
+          'Content-Type': 'application/json',
+          // Propagate the trace so the AI module's spans join this request
+          ...(req.trace ? { traceparent: req.trace.childTraceparent() } : {})
         }
       });
+      // Per-stage AI timings (parse, features, lr, rf, nb, ...) next to the hop's own latency
+      console.log(
+        `[AI] /predict ${Date.now() - aiStart}ms trace=${req.trace ? req.trace.traceId : '-'} ` +
+        `server-timing="${aiRes.headers['server-timing'] || ''}"`
+      );
     } catch (axiosError) {
       console.error('Flask AI service error:', axiosError.message);
       if (axiosError.code === 'ECONNREFUSED' || axiosError.code === 'ETIMEDOUT') {
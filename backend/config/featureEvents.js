@@ -0,0 +1,61 @@
+const axios = require('axios');
+const { query } = require('./db');
+
+// Keeps the AI module's feature store (OJT_FEATURE_STORE=1) in step with DTR and
+// evaluation writes. Each event carries the row's current state keyed by its id,
+// so resending after every write (or replaying) is safe. Enable with
+// AI_FEATURE_EVENTS=true; failures are logged and never fail the request.
+const enabled = () => process.env.AI_FEATURE_EVENTS === 'true';
+
+const postEvents = async (events, trace) => {
+  const flaskUrl = process.env.FLASK_AI_URL || 'http://localhost:5000';
+  await axios.post(`${flaskUrl}/features/events`, { events }, {
+    timeout: 5000,
+    headers: {
+      'Content-Type': 'application/json',
+      ...(trace ? { traceparent: trace.childTraceparent() } : {})
+    }
+  });
+};
+
+const publish = (loadEvents, trace) => {
+  if (!enabled()) return;
+  loadEvents()
+    .then((events) => (events.length ? postEvents(events, trace) : null))
+    .catch((error) => console.warn('Failed to publish feature events:', error.message));
+};
+
+// Current state of one attendance row
+const publishAttendance = (attendanceId, trace) => publish(async () => {
+  const result = await query(
+    `SELECT attendance_id, student_id, date::text AS date, COALESCE(total_hours, 0) AS hours
+     FROM attendance WHERE attendance_id = $1`,
+    [attendanceId]
+  );
+  return result.rows.map((row) => ({
+    type: 'attendance',
+    attendance_id: row.attendance_id,
+    student_id: row.student_id,
+    date: row.date,
+    hours: parseFloat(row.hours)
+  }));
+}, trace);
+
+// Current state of one evaluation row, with the evaluator's role
+const publishEvaluation = (evalId, trace) => publish(async () => {
+  const result = await query(
+    `SELECT e.eval_id, e.student_id, e.total_score, s.role
+     FROM evaluations e JOIN users s ON e.supervisor_id = s.user_id
+     WHERE e.eval_id = $1`,
+    [evalId]
+  );
+  return result.rows.map((row) => ({
+    type: 'evaluation',
+    eval_id: row.eval_id,
+    student_id: row.student_id,
+    score: row.total_score === null ? null : parseFloat(row.total_score),
+    evaluator_role: row.role
+  }));
+}, trace);
+
+module.exports = { publishAttendance, publishEvaluation };
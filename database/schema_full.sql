@@ -96,6 +96,16 @@ CREATE TABLE IF NOT EXISTS ai_insights (
     processing_time_ms INTEGER
 );
 
+-- Nightly scoring runs (ai_module/scripts/score_all.py); the checkpoint is
+-- committed with each chunk of ai_insights rows so a resumed run never duplicates them
+CREATE TABLE IF NOT EXISTS ai_scoring_runs (
+    run_id VARCHAR(20) PRIMARY KEY,
+    last_student_id INTEGER NOT NULL DEFAULT 0,
+    scored INTEGER NOT NULL DEFAULT 0,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP
+);
+
 -- ========== CHATBOT LOGS ==========
 CREATE TABLE IF NOT EXISTS chatbot_logs (
     chat_id SERIAL PRIMARY KEY,